@@ -1,4 +1,4 @@
 @echo off
 cd /d "%~dp0"
-python claude_code_recall.py
+python -m claude_code_recall
 pause
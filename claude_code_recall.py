@@ -9,19 +9,62 @@ License: MIT
 
 from __future__ import annotations
 
+import argparse
+import base64
+import bisect
+import functools
+import heapq
+import itertools
 import json
 import locale
 import logging
+import math
+import mmap
 import os
-import shutil
-import subprocess
+import queue
+import re
+import select
+import stat
+import struct
 import sys
-import tempfile
-import tkinter as tk
+import threading
+import time
+import unicodedata
+import zlib
+from array import array
+from collections import Counter, defaultdict
+from concurrent.futures import BrokenExecutor, Executor, as_completed
+from contextlib import closing
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from tkinter import messagebox, ttk
-from typing import Any, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Container,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+
+try:
+    import sqlite3
+except ImportError:  # sqlite3 を含まないビルドの Python
+    sqlite3 = None  # type: ignore[assignment]
+
+# tkinter は GUI を起動するときに _load_tkinter() で読み込む（コマンドライン
+# モードでは読み込まないため、tkinter や画面のない環境でも使える）
+if TYPE_CHECKING:
+    import tkinter as tk
+    from tkinter import messagebox, ttk
+else:
+    tk = ttk = messagebox = None
+
+# 起動時に使わない重いモジュール（multiprocessing, subprocess, tempfile, shutil,
+# ctypes）は、起動を速くするため使う関数の中で import する
 
 # ============================================================================
 # 定数
@@ -31,6 +74,48 @@ APP_NAME = "Claude Code Recall"
 APP_VERSION = "1.1.0"
 DEFAULT_WINDOW_SIZE = "1200x800"
 
+# 起動からウィンドウを表示するまでの目標時間（ミリ秒、--startup-profile で確認する）
+STARTUP_BUDGET_MS = 150
+# 初回の描画が通知されない場合（最小化して起動したなど）に、残りのUIの構築と
+# 読み込みを始めるまでの時間（ミリ秒）
+FIRST_PAINT_TIMEOUT_MS = 500
+
+# バックグラウンド読み込み結果のポーリング間隔（ミリ秒）
+LOAD_POLL_INTERVAL_MS = 50
+
+# ファイル変更通知のポーリング間隔（ミリ秒）
+WATCH_POLL_INTERVAL_MS = 500
+
+# 検索語の入力が止まってから絞り込みを始めるまでの時間と、結果のポーリング間隔（ミリ秒）
+SEARCH_DEBOUNCE_MS = 150
+SEARCH_POLL_INTERVAL_MS = 20
+
+# 会話表示で一度に描画するメッセージ数・文字数の上限と、描画しておく
+# 最大メッセージ数（超えた分は表示位置から遠い側を捨てる）
+CONVERSATION_BATCH_MESSAGES = 30
+CONVERSATION_BATCH_CHARS = 20000
+CONVERSATION_WINDOW_MESSAGES = 300
+
+# 会話表示の続きを描画する間隔（ミリ秒）と、続きを描画し始める表示位置
+# （描画済みの範囲の端からの割合）
+CONVERSATION_FILL_INTERVAL_MS = 1
+CONVERSATION_FILL_EDGE = 0.1
+
+# 棒グラフの大きさが変わってから描き直すまでの時間（ミリ秒）
+CHART_REDRAW_DELAY_MS = 50
+
+# セッションインデックス（パース結果の永続キャッシュ）
+SESSION_INDEX_VERSION = 6
+SESSION_INDEX_FILENAME = "session_index.json"
+
+# 全文検索インデックス
+SEARCH_INDEX_VERSION = 1
+SEARCH_INDEX_FILENAME = "search_index.bin"
+SEARCH_STORE_VERSION = 1
+SEARCH_STORE_FILENAME = "search_index.sqlite3"
+
+logger = logging.getLogger(__name__)
+
 # ============================================================================
 # 多言語対応（i18n）
 # ============================================================================
@@ -41,6 +126,9 @@ TRANSLATIONS = {
         "search": "検索:",
         "filter_system": "システムセッション除外",
         "filter_slash": "スラッシュコマンド除外",
+        "sort_order": "並び順:",
+        "sort_newest": "新しい順",
+        "sort_relevance": "関連度順",
         "session_count": "セッション数: {displayed} / {total}",
         "col_project": "プロジェクト",
         "col_date": "日時",
@@ -60,15 +148,26 @@ TRANSLATIONS = {
         "slash_command_only": "(スラッシュコマンドのみ)",
         "user_label": "👤 User",
         "assistant_label": "🤖 Assistant",
-        "chart_title": "過去30日間のプロンプト数",
+        "chart_title": "プロンプト数",
         "chart_prompts": "{count}件",
+        "chart_view_30d": "30日",
+        "chart_view_90d": "90日",
+        "chart_view_1y": "1年",
+        "chart_view_heatmap": "曜日×時刻",
+        "chart_week": "{date}の週",
+        "chart_weekdays": "月,火,水,木,金,土,日",
         "last_updated": "最終更新: {time}",
+        "loading": "読み込み中...",
+        "loading_progress": "読み込み中... {percent}% (残り約{eta}秒)",
     },
     "en": {
         "app_title": "Claude Code Recall - Session History Viewer",
         "search": "Search:",
         "filter_system": "Exclude system sessions",
         "filter_slash": "Exclude slash commands",
+        "sort_order": "Sort:",
+        "sort_newest": "Newest",
+        "sort_relevance": "Relevance",
         "session_count": "Sessions: {displayed} / {total}",
         "col_project": "Project",
         "col_date": "Date",
@@ -88,15 +187,26 @@ TRANSLATIONS = {
         "slash_command_only": "(Slash commands only)",
         "user_label": "👤 User",
         "assistant_label": "🤖 Assistant",
-        "chart_title": "Prompts in the last 30 days",
+        "chart_title": "Prompts",
         "chart_prompts": "{count}",
+        "chart_view_30d": "30 days",
+        "chart_view_90d": "90 days",
+        "chart_view_1y": "1 year",
+        "chart_view_heatmap": "Weekday × hour",
+        "chart_week": "Week of {date}",
+        "chart_weekdays": "Mon,Tue,Wed,Thu,Fri,Sat,Sun",
         "last_updated": "Last updated: {time}",
+        "loading": "Loading...",
+        "loading_progress": "Loading... {percent}% (about {eta}s left)",
     },
     "ko": {
         "app_title": "Claude Code Recall - 세션 기록 뷰어",
         "search": "검색:",
         "filter_system": "시스템 세션 제외",
         "filter_slash": "슬래시 명령어 제외",
+        "sort_order": "정렬:",
+        "sort_newest": "최신순",
+        "sort_relevance": "관련도순",
         "session_count": "세션 수: {displayed} / {total}",
         "col_project": "프로젝트",
         "col_date": "날짜",
@@ -116,15 +226,26 @@ TRANSLATIONS = {
         "slash_command_only": "(슬래시 명령어만)",
         "user_label": "👤 사용자",
         "assistant_label": "🤖 어시스턴트",
-        "chart_title": "최근 30일간 프롬프트 수",
+        "chart_title": "프롬프트 수",
         "chart_prompts": "{count}건",
+        "chart_view_30d": "30일",
+        "chart_view_90d": "90일",
+        "chart_view_1y": "1년",
+        "chart_view_heatmap": "요일×시간",
+        "chart_week": "{date} 주",
+        "chart_weekdays": "월,화,수,목,금,토,일",
         "last_updated": "마지막 업데이트: {time}",
+        "loading": "불러오는 중...",
+        "loading_progress": "불러오는 중... {percent}% (약 {eta}초 남음)",
     },
     "de": {
         "app_title": "Claude Code Recall - Sitzungsverlauf",
         "search": "Suche:",
         "filter_system": "Systemsitzungen ausblenden",
         "filter_slash": "Slash-Befehle ausblenden",
+        "sort_order": "Sortierung:",
+        "sort_newest": "Neueste",
+        "sort_relevance": "Relevanz",
         "session_count": "Sitzungen: {displayed} / {total}",
         "col_project": "Projekt",
         "col_date": "Datum",
@@ -144,15 +265,26 @@ TRANSLATIONS = {
         "slash_command_only": "(Nur Slash-Befehle)",
         "user_label": "👤 Benutzer",
         "assistant_label": "🤖 Assistent",
-        "chart_title": "Prompts der letzten 30 Tage",
+        "chart_title": "Prompts",
         "chart_prompts": "{count}",
+        "chart_view_30d": "30 Tage",
+        "chart_view_90d": "90 Tage",
+        "chart_view_1y": "1 Jahr",
+        "chart_view_heatmap": "Wochentag × Stunde",
+        "chart_week": "Woche ab {date}",
+        "chart_weekdays": "Mo,Di,Mi,Do,Fr,Sa,So",
         "last_updated": "Zuletzt aktualisiert: {time}",
+        "loading": "Wird geladen...",
+        "loading_progress": "Wird geladen... {percent}% (noch ca. {eta} s)",
     },
     "fr": {
         "app_title": "Claude Code Recall - Historique des sessions",
         "search": "Rechercher :",
         "filter_system": "Exclure les sessions système",
         "filter_slash": "Exclure les commandes slash",
+        "sort_order": "Tri :",
+        "sort_newest": "Plus récentes",
+        "sort_relevance": "Pertinence",
         "session_count": "Sessions : {displayed} / {total}",
         "col_project": "Projet",
         "col_date": "Date",
@@ -172,15 +304,26 @@ TRANSLATIONS = {
         "slash_command_only": "(Commandes slash uniquement)",
         "user_label": "👤 Utilisateur",
         "assistant_label": "🤖 Assistant",
-        "chart_title": "Prompts des 30 derniers jours",
+        "chart_title": "Prompts",
         "chart_prompts": "{count}",
+        "chart_view_30d": "30 jours",
+        "chart_view_90d": "90 jours",
+        "chart_view_1y": "1 an",
+        "chart_view_heatmap": "Jour × heure",
+        "chart_week": "Semaine du {date}",
+        "chart_weekdays": "lun,mar,mer,jeu,ven,sam,dim",
         "last_updated": "Dernière mise à jour : {time}",
+        "loading": "Chargement...",
+        "loading_progress": "Chargement... {percent}% (environ {eta} s restantes)",
     },
     "pt-BR": {
         "app_title": "Claude Code Recall - Visualizador de Histórico de Sessões",
         "search": "Pesquisar:",
         "filter_system": "Excluir sessões do sistema",
         "filter_slash": "Excluir comandos slash",
+        "sort_order": "Ordenar:",
+        "sort_newest": "Mais recentes",
+        "sort_relevance": "Relevância",
         "session_count": "Sessões: {displayed} / {total}",
         "col_project": "Projeto",
         "col_date": "Data",
@@ -200,15 +343,26 @@ TRANSLATIONS = {
         "slash_command_only": "(Apenas comandos slash)",
         "user_label": "👤 Usuário",
         "assistant_label": "🤖 Assistente",
-        "chart_title": "Prompts nos últimos 30 dias",
+        "chart_title": "Prompts",
         "chart_prompts": "{count}",
+        "chart_view_30d": "30 dias",
+        "chart_view_90d": "90 dias",
+        "chart_view_1y": "1 ano",
+        "chart_view_heatmap": "Dia × hora",
+        "chart_week": "Semana de {date}",
+        "chart_weekdays": "seg,ter,qua,qui,sex,sáb,dom",
         "last_updated": "Última atualização: {time}",
+        "loading": "Carregando...",
+        "loading_progress": "Carregando... {percent}% (cerca de {eta}s restantes)",
     },
     "es": {
         "app_title": "Claude Code Recall - Visor de Historial de Sesiones",
         "search": "Buscar:",
         "filter_system": "Excluir sesiones del sistema",
         "filter_slash": "Excluir comandos slash",
+        "sort_order": "Ordenar:",
+        "sort_newest": "Más recientes",
+        "sort_relevance": "Relevancia",
         "session_count": "Sesiones: {displayed} / {total}",
         "col_project": "Proyecto",
         "col_date": "Fecha",
@@ -228,9 +382,17 @@ TRANSLATIONS = {
         "slash_command_only": "(Solo comandos slash)",
         "user_label": "👤 Usuario",
         "assistant_label": "🤖 Asistente",
-        "chart_title": "Prompts en los últimos 30 días",
+        "chart_title": "Prompts",
         "chart_prompts": "{count}",
+        "chart_view_30d": "30 días",
+        "chart_view_90d": "90 días",
+        "chart_view_1y": "1 año",
+        "chart_view_heatmap": "Día × hora",
+        "chart_week": "Semana del {date}",
+        "chart_weekdays": "lun,mar,mié,jue,vie,sáb,dom",
         "last_updated": "Última actualización: {time}",
+        "loading": "Cargando...",
+        "loading_progress": "Cargando... {percent}% (quedan unos {eta}s)",
     },
 }
 
@@ -371,6 +533,17 @@ def set_language(lang: str) -> None:
 # ユーティリティ関数
 # ============================================================================
 
+def _load_tkinter() -> None:
+    """GUI で使う tkinter を読み込む。
+
+    Raises:
+        ImportError: tkinter を使えない場合
+    """
+    global tk, ttk, messagebox
+    import tkinter as tk
+    from tkinter import messagebox, ttk
+
+
 def get_claude_projects_dir() -> Path:
     """Claude Codeのプロジェクトディレクトリを取得する。
 
@@ -390,6 +563,30 @@ def get_claude_projects_dir() -> Path:
     return home / ".claude" / "projects"
 
 
+def get_cache_dir() -> Path:
+    """アプリケーションのキャッシュディレクトリを取得する。
+
+    Returns:
+        キャッシュディレクトリのPath
+
+    Note:
+        Windows: %LOCALAPPDATA%\\ClaudeCodeRecall
+        Mac: ~/Library/Caches/ClaudeCodeRecall
+        Linux: $XDG_CACHE_HOME/claude-code-recall (既定: ~/.cache)
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA")
+        if base:
+            return Path(base) / "ClaudeCodeRecall"
+        return get_claude_projects_dir().parent / "claude-code-recall"
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / "ClaudeCodeRecall"
+
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    base_dir = Path(xdg_cache) if xdg_cache else Path.home() / ".cache"
+    return base_dir / "claude-code-recall"
+
+
 def is_safe_path(base_path: Path, target_path: Path) -> bool:
     """パストラバーサル攻撃を防ぐためのパス検証。
 
@@ -445,456 +642,6063 @@ def get_short_project_name(full_path: str, depth: int = 2) -> str:
 
 
 # ============================================================================
-# メインアプリケーション
+# セッション解析
 # ============================================================================
 
-class ClaudeCodeRecall:
-    """Claude Code Recallメインアプリケーションクラス。"""
+# 書き換え検出に使うファイル先頭・末尾のバイト数
+_FINGERPRINT_BYTES = 256
 
-    def __init__(self, root: tk.Tk) -> None:
-        """アプリケーションを初期化する。
+# 一度に読み込むバイト数
+_READ_CHUNK_SIZE = 1024 * 1024
 
-        Args:
-            root: Tkinterのルートウィンドウ
-        """
-        self.root = root
-        self.root.title(get_text("app_title"))
-        self.root.geometry(DEFAULT_WINDOW_SIZE)
 
-        # ディレクトリ設定
-        self.projects_dir = get_claude_projects_dir()
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MS = timedelta(milliseconds=1)
 
-        # データ
-        self.sessions: list[dict[str, Any]] = []
-        self.current_session: Optional[dict[str, Any]] = None
+# "YYYY-MM-DDTHH:MM" -> その分の0秒のエポックミリ秒（不正な場合 None）
+_minute_epoch_cache: dict[str, Optional[int]] = {}
+_MINUTE_EPOCH_CACHE_LIMIT = 65536
 
-        # フィルター設定
-        self.filter_system_sessions = tk.BooleanVar(value=True)
-        self.filter_slash_commands = tk.BooleanVar(value=True)
 
-        # 棒グラフ関連
-        self.chart_canvas: Optional[tk.Canvas] = None
-        self.chart_bars: dict[str, int] = {}  # date_str -> canvas item id
-        self.selected_date: Optional[str] = None
+def _parse_utc_iso_fast(ts: str) -> Optional[int]:
+    """Claude Code が書き出す "YYYY-MM-DDTHH:MM:SS.sssZ" 形式を高速にパースする。
 
-        # 最終更新日時
-        self.last_updated: Optional[datetime] = None
+    同じ分のタイムスタンプは連続して現れるため、分までの部分の変換結果を
+    キャッシュし、秒とミリ秒だけを毎回加算する。
 
-        # UI構築
-        self._setup_ui()
-        self._setup_text_context_menu()
+    Args:
+        ts: タイムスタンプ文字列
 
-        # セッション読み込み
-        self._load_all_sessions()
+    Returns:
+        エポックミリ秒、またはこの形式でない・不正な場合 None
+    """
+    if len(ts) != 24 or ts[16] != ":" or ts[19] != "." or ts[23] != "Z":
+        return None
+    seconds, millis = ts[17:19], ts[20:23]
+    if not (
+        seconds.isdigit() and millis.isdigit() and seconds < "60" and ts.isascii()
+    ):
+        return None
 
-        # ログ設定
-        logging.basicConfig(level=logging.WARNING)
-        self.logger = logging.getLogger(__name__)
+    minute = ts[:16]
+    try:
+        minute_ms = _minute_epoch_cache[minute]
+    except KeyError:
+        minute_ms = _parse_iso(minute + ":00Z")
+        if len(_minute_epoch_cache) >= _MINUTE_EPOCH_CACHE_LIMIT:
+            _minute_epoch_cache.clear()
+        _minute_epoch_cache[minute] = minute_ms
+    if minute_ms is None:
+        return None
+    return minute_ms + int(seconds) * 1000 + int(millis)
 
-        # 自動再読み込みタイマー開始（10分間隔）
-        self._schedule_auto_reload()
 
-    def _setup_ui(self) -> None:
-        """UIを構築する。"""
-        # メインのPanedWindow（左右分割）
-        self.paned = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
-        self.paned.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+def _parse_iso(ts: str) -> Optional[int]:
+    """ISO 8601 形式の文字列をエポックミリ秒に変換する。
 
-        self._setup_left_panel()
-        self._setup_right_panel()
+    Args:
+        ts: タイムスタンプ文字列（タイムゾーンがない場合はローカル時刻）
 
-    def _setup_left_panel(self) -> None:
-        """左パネル（セッションリスト + 棒グラフ）を構築する。"""
-        left_frame = ttk.Frame(self.paned)
-        self.paned.add(left_frame, weight=1)
+    Returns:
+        エポックミリ秒、または変換できない場合 None
+    """
+    try:
+        # ISO format (UTC) -> local timezone
+        dt = datetime.fromisoformat(ts.replace("Z", "+00:00")).astimezone()
+    except (ValueError, OSError, OverflowError):
+        return None
+    return (dt - _EPOCH) // _ONE_MS
 
-        # 上部フレーム（セッションリスト）- 3/4
-        top_frame = ttk.Frame(left_frame)
-        top_frame.pack(fill=tk.BOTH, expand=True)
 
-        # 検索バー
-        search_frame = ttk.Frame(top_frame)
-        search_frame.pack(fill=tk.X, pady=(0, 5))
+def _timestamp_to_epoch_ms(ts: Any) -> Optional[int]:
+    """タイムスタンプ値をエポックミリ秒に変換する。
 
-        ttk.Label(search_frame, text=get_text("search")).pack(side=tk.LEFT)
-        self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", lambda *_: self._filter_sessions())
-        search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
-        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+    Args:
+        ts: ISO 8601 形式の文字列（タイムゾーンがない場合はローカル時刻）、
+            またはエポックミリ秒の数値
 
-        # フィルターオプション
-        filter_frame = ttk.Frame(top_frame)
-        filter_frame.pack(fill=tk.X, pady=(0, 5))
+    Returns:
+        エポックミリ秒、または変換できない場合 None
+    """
+    if isinstance(ts, str):
+        epoch_ms = _parse_utc_iso_fast(ts)
+        if epoch_ms is not None:
+            return epoch_ms
+        return _parse_iso(ts)
+
+    if isinstance(ts, (int, float)):
+        # Unix timestamp in milliseconds (UTC)
+        try:
+            # ローカル時刻に変換できない範囲の値は除外する
+            datetime.fromtimestamp(ts / 1000)
+        except (ValueError, OSError, OverflowError):
+            return None
+        return int(ts)
+    return None
 
-        ttk.Checkbutton(
-            filter_frame,
-            text=get_text("filter_system"),
-            variable=self.filter_system_sessions,
-            command=self._filter_sessions,
-        ).pack(side=tk.LEFT)
 
-        ttk.Checkbutton(
-            filter_frame,
-            text=get_text("filter_slash"),
-            variable=self.filter_slash_commands,
-            command=self._on_slash_filter_change,
-        ).pack(side=tk.LEFT, padx=(10, 0))
+class _LocalOffsetCache:
+    """ローカル時刻のUTCオフセットを、オフセットが変わらない期間ごとにキャッシュする。
 
-        # セッション数・最終更新日時表示
-        status_frame = ttk.Frame(top_frame)
-        status_frame.pack(fill=tk.X)
+    OSへの問い合わせは期間の境界（夏時間の切り替わりなど）を探すときだけ行う。
+    """
 
-        self.count_label = ttk.Label(status_frame, text="")
-        self.count_label.pack(side=tk.LEFT)
+    # 境界を探すときの刻み幅と、1つの期間として調べる最大の長さ（秒）
+    _STEP = 7 * 86400
+    _MAX_SPAN = 366 * 86400
 
-        self.updated_label = ttk.Label(status_frame, text="", foreground="#666666")
-        self.updated_label.pack(side=tk.RIGHT)
+    def __init__(self) -> None:
+        """空のキャッシュを作る。"""
+        # (開始, 終了, オフセット) を開始時刻順に並べたリスト。[開始, 終了) で有効
+        self._periods: list[tuple[int, int, int]] = []
+        self._last: tuple[int, int, int] = (0, 0, 0)
 
-        # セッションリスト（Treeview）
-        list_frame = ttk.Frame(top_frame)
-        list_frame.pack(fill=tk.BOTH, expand=True)
+    def offset(self, seconds: int) -> int:
+        """エポック秒におけるローカル時刻のUTCオフセットを取得する。
 
-        columns = ("project", "date", "first_message")
-        self.session_tree = ttk.Treeview(
-            list_frame, columns=columns, show="headings", selectmode="browse"
-        )
+        Args:
+            seconds: エポック秒
 
-        self.session_tree.heading("project", text=get_text("col_project"))
-        self.session_tree.heading("date", text=get_text("col_date"))
-        self.session_tree.heading("first_message", text=get_text("col_first_message"))
+        Returns:
+            UTCオフセット（秒）
 
-        self.session_tree.column("project", width=150, minwidth=100)
-        self.session_tree.column("date", width=130, minwidth=100)
-        self.session_tree.column("first_message", width=200, minwidth=100)
+        Raises:
+            OverflowError, OSError: ローカル時刻に変換できない場合
+        """
+        start, end, offset = self._last
+        if start <= seconds < end:
+            return offset
 
-        scrollbar = ttk.Scrollbar(
-            list_frame, orient=tk.VERTICAL, command=self.session_tree.yview
-        )
-        self.session_tree.configure(yscrollcommand=scrollbar.set)
+        i = bisect.bisect_right(self._periods, (seconds, float("inf"))) - 1
+        if i >= 0 and seconds < self._periods[i][1]:
+            self._last = self._periods[i]
+            return self._last[2]
 
-        self.session_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        period = self._find_period(seconds)
+        bisect.insort(self._periods, period)
+        self._last = period
+        return period[2]
 
-        self.session_tree.bind("<<TreeviewSelect>>", self._on_session_select)
+    def _find_period(self, seconds: int) -> tuple[int, int, int]:
+        """エポック秒を含む、オフセットが一定の期間を探す。
 
-        # 右クリックメニュー（セッションリスト用）
-        self.session_context_menu = tk.Menu(self.root, tearoff=0)
-        self.session_context_menu.add_command(
-            label=get_text("menu_resume"), command=self._resume_selected_session
-        )
-        self.session_context_menu.add_separator()
-        self.session_context_menu.add_command(
-            label=get_text("menu_delete"), command=self._delete_selected_session
-        )
-        self.session_tree.bind("<Button-3>", self._on_session_right_click)
+        Args:
+            seconds: エポック秒
 
-        # 下部フレーム（棒グラフ）- 1/4
-        self._setup_chart_panel(left_frame)
+        Returns:
+            (開始, 終了, オフセット) のタプル
+        """
+        offset = self._query(seconds)
+        start = self._boundary(seconds, -1, offset)
+        end = self._boundary(seconds, 1, offset)
+        return start, end, offset
 
-    def _setup_chart_panel(self, parent: ttk.Frame) -> None:
-        """棒グラフパネルを構築する。
+    def _boundary(self, seconds: int, direction: int, offset: int) -> int:
+        """オフセットが変わる時刻を探す。
 
         Args:
-            parent: 親フレーム
+            seconds: 探索を始めるエポック秒
+            direction: 1 なら未来方向、-1 なら過去方向
+            offset: seconds におけるオフセット
+
+        Returns:
+            未来方向なら期間の終了（含まない）、過去方向なら期間の開始
         """
-        chart_frame = ttk.LabelFrame(parent, text=get_text("chart_title"))
-        chart_frame.pack(fill=tk.BOTH, pady=(5, 0), ipady=5)
+        same = seconds
+        other: Optional[int] = None
+        while abs(same - seconds) < self._MAX_SPAN:
+            probe = same + direction * self._STEP
+            try:
+                if self._query(probe) != offset:
+                    other = probe
+                    break
+            except (OverflowError, OSError):
+                other = probe
+                break
+            same = probe
+        if other is None:
+            return same + 1 if direction > 0 else same
 
-        # Canvas for chart (height fixed to ~1/4 of typical window)
-        self.chart_canvas = tk.Canvas(
-            chart_frame,
-            height=120,
-            bg="#f8f8f8",
-            highlightthickness=0,
-        )
-        self.chart_canvas.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # 刻み幅の範囲内を二分探索して境界を秒単位で特定する
+        while abs(other - same) > 1:
+            mid = (same + other) // 2
+            try:
+                is_same = self._query(mid) == offset
+            except (OverflowError, OSError):
+                is_same = False
+            if is_same:
+                same = mid
+            else:
+                other = mid
+        return same + 1 if direction > 0 else same
 
-        # Bind resize event
-        self.chart_canvas.bind("<Configure>", lambda e: self._draw_chart())
+    @staticmethod
+    def _query(seconds: int) -> int:
+        """OSにローカル時刻のUTCオフセットを問い合わせる。
 
-    def _get_prompt_counts_by_date(self) -> dict[str, int]:
-        """過去30日間の日別プロンプト数（Userメッセージ数）を取得する。
+        Args:
+            seconds: エポック秒
 
         Returns:
-            日付文字列をキー、プロンプト数を値とする辞書
+            UTCオフセット（秒）
         """
-        counts: dict[str, int] = {}
-        today = datetime.now().date()
-        exclude_slash = self.filter_slash_commands.get()
+        return time.localtime(seconds).tm_gmtoff
 
-        # Initialize all 30 days with 0
-        for i in range(30):
-            date = today - timedelta(days=29 - i)
-            date_str = date.strftime("%Y-%m-%d")
-            counts[date_str] = 0
 
-        # Count user prompts (filtered)
-        filtered = self._get_filtered_sessions()
-        for session in filtered:
-            messages = session.get("messages", [])
-            for msg in messages:
-                # Count only user messages
-                if msg.get("type") != "user":
-                    continue
-                # Exclude slash commands if filter is enabled
-                if exclude_slash and msg.get("is_slash_command", False):
-                    continue
+_local_offsets = _LocalOffsetCache()
 
-                ts = msg.get("timestamp")
-                if ts:
-                    msg_date = self._timestamp_to_date(ts)
-                    if msg_date:
-                        date_str = msg_date.strftime("%Y-%m-%d")
-                        if date_str in counts:
-                            counts[date_str] += 1
 
-        return counts
+def _local_datetime(epoch_ms: int) -> datetime:
+    """エポックミリ秒をローカルタイムゾーンの datetime に変換する。
 
-    def _timestamp_to_date(self, ts: Any) -> Optional[datetime]:
-        """タイムスタンプを日付に変換する。
+    表示用。日時ごとの集計には _local_hour() を使う。
 
-        Args:
-            ts: タイムスタンプ値
+    Args:
+        epoch_ms: エポックミリ秒
 
-        Returns:
-            datetime オブジェクト、または None
-        """
-        try:
-            if isinstance(ts, str):
-                dt_utc = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-                return dt_utc.astimezone().replace(tzinfo=None)
-            elif isinstance(ts, (int, float)):
-                dt_utc = datetime.utcfromtimestamp(ts / 1000)
-                dt_aware = dt_utc.replace(tzinfo=timezone.utc)
-                return dt_aware.astimezone().replace(tzinfo=None)
-        except (ValueError, OSError):
-            pass
-        return None
+    Returns:
+        タイムゾーン情報を持たないローカル時刻
+    """
+    seconds, millis = divmod(epoch_ms, 1000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=millis * 1000)
 
-    def _draw_chart(self) -> None:
-        """棒グラフを描画する。"""
-        if self.chart_canvas is None:
-            return
 
-        self.chart_canvas.delete("all")
-        self.chart_bars = {}
+def _local_hour(epoch_ms: int) -> int:
+    """エポックミリ秒をローカルの時間番号に変換する。
 
-        counts = self._get_prompt_counts_by_date()
-        if not counts:
-            return
+    時間番号はローカル時刻の 1970-01-01 0時からの時間数で、24 で割った商が
+    ローカルの日番号（1970-01-01 からの日数）になる。
 
-        # Canvas dimensions
-        canvas_width = self.chart_canvas.winfo_width()
-        canvas_height = self.chart_canvas.winfo_height()
+    Args:
+        epoch_ms: エポックミリ秒
 
-        if canvas_width <= 1 or canvas_height <= 1:
-            return
+    Returns:
+        ローカルの時間番号
+    """
+    seconds = epoch_ms // 1000
+    try:
+        return (seconds + _local_offsets.offset(seconds)) // 3600
+    except (OverflowError, OSError):
+        delta = _local_datetime(epoch_ms) - datetime(1970, 1, 1)
+        return delta // timedelta(hours=1)
 
-        # Chart margins
-        margin_left = 30
-        margin_right = 10
-        margin_top = 10
-        margin_bottom = 25
 
-        chart_width = canvas_width - margin_left - margin_right
-        chart_height = canvas_height - margin_top - margin_bottom
+class MessageRecord:
+    """会話の1メッセージ。
 
-        if chart_width <= 0 or chart_height <= 0:
-            return
+    真偽値の属性はビットフィールドにまとめ、タイムスタンプはエポックミリ秒で持つ。
+    """
 
-        # Get sorted dates
-        dates = sorted(counts.keys())
-        num_bars = len(dates)
-        max_count = max(counts.values()) if counts.values() else 1
-        max_count = max(max_count, 1)  # Avoid division by zero
+    __slots__ = ("content", "timestamp", "flags")
 
-        # Bar dimensions
-        bar_width = max(2, (chart_width - num_bars) / num_bars)
-        gap = 1
+    # flags のビット
+    ASSISTANT = 1
+    META = 2
+    SLASH_COMMAND = 4
 
-        # Draw Y-axis scale
-        self.chart_canvas.create_text(
-            margin_left - 5,
-            margin_top,
-            text=str(max_count),
-            anchor="e",
-            font=("", 8),
-            fill="#666666",
-        )
-        self.chart_canvas.create_text(
-            margin_left - 5,
-            margin_top + chart_height,
-            text="0",
-            anchor="e",
-            font=("", 8),
-            fill="#666666",
-        )
+    def __init__(self, content: str, timestamp: int, flags: int) -> None:
+        """メッセージを初期化する。
+
+        Args:
+            content: 本文
+            timestamp: エポックミリ秒（不明な場合 0）
+            flags: ASSISTANT / META / SLASH_COMMAND の組み合わせ
+        """
+        self.content = content
+        self.timestamp = timestamp
+        self.flags = flags
 
-        # Draw bars
-        for i, date_str in enumerate(dates):
-            count = counts[date_str]
-            bar_height = (count / max_count) * chart_height if max_count > 0 else 0
+    @property
+    def type(self) -> str:
+        """"user" または "assistant"。"""
+        return "assistant" if self.flags & self.ASSISTANT else "user"
 
-            x1 = margin_left + i * (bar_width + gap)
-            x2 = x1 + bar_width
-            y2 = margin_top + chart_height
-            y1 = y2 - bar_height
+    @property
+    def is_meta(self) -> bool:
+        """メタメッセージかどうか。"""
+        return bool(self.flags & self.META)
 
-            # Determine color
-            if self.selected_date == date_str:
-                fill_color = "#ff6600"  # Highlight color (orange)
-            elif count > 0:
-                fill_color = "#4a90d9"  # Normal bar color (blue)
-            else:
-                fill_color = "#e0e0e0"  # Zero count color (light gray)
+    @property
+    def is_slash_command(self) -> bool:
+        """スラッシュコマンド（とその出力）かどうか。"""
+        return bool(self.flags & self.SLASH_COMMAND)
 
-            bar_id = self.chart_canvas.create_rectangle(
-                x1, y1, x2, y2,
-                fill=fill_color,
-                outline="",
-            )
-            self.chart_bars[date_str] = bar_id
 
-            # Bind tooltip
-            self.chart_canvas.tag_bind(
-                bar_id,
-                "<Enter>",
-                lambda e, d=date_str, c=count: self._show_chart_tooltip(e, d, c),
-            )
-            self.chart_canvas.tag_bind(
-                bar_id, "<Leave>", lambda e: self._hide_chart_tooltip()
-            )
+class SessionRecord:
+    """セッション一覧に常駐させるセッション情報。
 
-        # Draw X-axis labels (show only a few dates)
-        label_interval = max(1, num_bars // 5)
-        for i, date_str in enumerate(dates):
-            if i % label_interval == 0 or i == num_bars - 1:
-                x = margin_left + i * (bar_width + gap) + bar_width / 2
-                y = margin_top + chart_height + 12
-                # Show only month/day
-                label = date_str[5:]  # "MM-DD"
-                self.chart_canvas.create_text(
-                    x, y,
-                    text=label,
-                    font=("", 7),
-                    fill="#666666",
-                )
+    多数のセッションを保持するため __slots__ で属性を固定し、真偽値の属性は
+    ビットフィールドに、タイムスタンプはエポックミリ秒にまとめる。
+    プロジェクト名などセッション間で重複する文字列はインターンして共有する。
+    """
 
-    def _show_chart_tooltip(self, event: tk.Event, date_str: str, count: int) -> None:
-        """棒グラフのツールチップを表示する。
+    __slots__ = (
+        "file_path",
+        "project_name",
+        "session_id",
+        "timestamp",
+        "first_message",
+        "message_count",
+        "prompt_counts",
+        "normal_prompt_counts",
+        "flags",
+    )
+
+    # flags のビット
+    HUMAN_SESSION = 1
+    HAS_NORMAL_MESSAGES = 2
+
+    def __init__(
+        self,
+        file_path: Path,
+        project_name: str,
+        session_id: str,
+        timestamp: int,
+        first_message: str,
+        message_count: int,
+        prompt_counts: dict[int, int],
+        normal_prompt_counts: dict[int, int],
+        flags: int,
+    ) -> None:
+        """セッション情報を初期化する。
 
         Args:
-            event: イベントオブジェクト
-            date_str: 日付文字列
-            count: セッション数
+            file_path: セッションファイルのパス
+            project_name: プロジェクトのパス
+            session_id: セッションID
+            timestamp: 最新メッセージのエポックミリ秒（不明な場合 0）
+            first_message: 最初のユーザーメッセージ（先頭100文字）
+            message_count: メッセージ数
+            prompt_counts: ローカルの時間番号 -> ユーザーメッセージ数
+            normal_prompt_counts: ローカルの時間番号 -> スラッシュコマンドを除くユーザーメッセージ数
+            flags: HUMAN_SESSION / HAS_NORMAL_MESSAGES の組み合わせ
         """
-        if self.chart_canvas is None:
-            return
+        self.file_path = file_path
+        self.project_name = project_name
+        self.session_id = session_id
+        self.timestamp = timestamp
+        self.first_message = first_message
+        self.message_count = message_count
+        self.prompt_counts = prompt_counts
+        self.normal_prompt_counts = normal_prompt_counts
+        self.flags = flags
+
+    @property
+    def is_human_session(self) -> bool:
+        """人間が開始したセッションかどうか。"""
+        return bool(self.flags & self.HUMAN_SESSION)
+
+    @property
+    def has_normal_messages(self) -> bool:
+        """スラッシュコマンド以外のユーザーメッセージを含むかどうか。"""
+        return bool(self.flags & self.HAS_NORMAL_MESSAGES)
+
+
+def _extract_message(data: dict[str, Any]) -> Optional[MessageRecord]:
+    """メッセージデータを抽出する。
 
-        # Remove existing tooltip
-        self.chart_canvas.delete("tooltip")
+    Args:
+        data: JSONデータ
 
-        text = f"{date_str}: {get_text('chart_prompts', count=count)}"
-        x = event.x
-        y = event.y - 20
+    Returns:
+        メッセージ、または None
+    """
+    msg_type = data.get("type")
+    if msg_type not in ("user", "assistant"):
+        return None
 
-        # Background
-        bbox_id = self.chart_canvas.create_rectangle(
-            x - 40, y - 10, x + 40, y + 10,
-            fill="#333333",
-            outline="",
-            tags="tooltip",
-        )
-        text_id = self.chart_canvas.create_text(
-            x, y,
-            text=text,
-            fill="white",
-            font=("", 8),
-            tags="tooltip",
-        )
+    message = data.get("message", {})
+    content = ""
+    is_meta = data.get("isMeta", False)
+
+    if isinstance(message, dict):
+        raw_content = message.get("content", "")
+        if isinstance(raw_content, str):
+            content = raw_content
+        elif isinstance(raw_content, list):
+            for item in raw_content:
+                if isinstance(item, dict) and item.get("type") == "text":
+                    content += item.get("text", "")
+                elif isinstance(item, str):
+                    content += item
+
+    if not content:
+        return None
 
-        # Adjust background size to text
-        bbox = self.chart_canvas.bbox(text_id)
-        if bbox:
-            self.chart_canvas.coords(
-                bbox_id,
-                bbox[0] - 5, bbox[1] - 3, bbox[2] + 5, bbox[3] + 3
-            )
+    flags = MessageRecord.ASSISTANT if msg_type == "assistant" else 0
+    if is_meta:
+        flags |= MessageRecord.META | MessageRecord.SLASH_COMMAND
 
-    def _hide_chart_tooltip(self) -> None:
-        """棒グラフのツールチップを非表示にする。"""
-        if self.chart_canvas is not None:
-            self.chart_canvas.delete("tooltip")
+    # スラッシュコマンドかどうかを判定
+    content_stripped = content.strip()
+    if (
+        content_stripped.startswith("<command-name>")
+        or content_stripped.startswith("<local-command-stdout>")
+        or content_stripped.startswith("<local-command-caveat>")
+    ):
+        flags |= MessageRecord.SLASH_COMMAND
 
-    def _update_chart_highlight(self, session: Optional[dict[str, Any]]) -> None:
-        """選択されたセッションに対応する棒をハイライトする。
+    # コマンドの定型文は何度も現れるため共有する
+    if flags & MessageRecord.SLASH_COMMAND:
+        content = sys.intern(content)
 
-        Args:
-            session: 選択されたセッション（Noneの場合はハイライト解除）
-        """
-        if self.chart_canvas is None:
-            return
+    timestamp = _timestamp_to_epoch_ms(data.get("timestamp"))
+    return MessageRecord(content, timestamp or 0, flags)
 
-        # Get date of selected session
-        new_selected_date: Optional[str] = None
-        if session:
-            ts = session.get("timestamp")
-            if ts and ts != datetime.min:
-                new_selected_date = ts.date().strftime("%Y-%m-%d")
 
-        # Update only if selection changed
-        if new_selected_date == self.selected_date:
-            return
+def _is_human_session(file_path: Path, first_message: str) -> bool:
+    """人間が開始したセッションかどうかを判定する。
 
-        old_date = self.selected_date
-        self.selected_date = new_selected_date
+    Args:
+        file_path: セッションファイルのパス
+        first_message: 最初のユーザーメッセージ
 
-        # Update bar colors
-        counts = self._get_prompt_counts_by_date()
+    Returns:
+        人間が開始したセッションの場合 True
+    """
+    # agent-で始まるファイル名はサブエージェントセッション
+    if file_path.stem.startswith("agent-"):
+        return False
 
-        # Reset old highlight
-        if old_date and old_date in self.chart_bars:
-            bar_id = self.chart_bars[old_date]
-            count = counts.get(old_date, 0)
-            color = "#4a90d9" if count > 0 else "#e0e0e0"
-            self.chart_canvas.itemconfig(bar_id, fill=color)
+    # 最初のメッセージが"Warmup"のものはウォームアップセッション
+    if first_message.strip().lower() == "warmup":
+        return False
 
-        # Set new highlight
-        if new_selected_date and new_selected_date in self.chart_bars:
-            bar_id = self.chart_bars[new_selected_date]
-            self.chart_canvas.itemconfig(bar_id, fill="#ff6600")
+    return True
 
-    def _setup_right_panel(self) -> None:
-        """右パネル（会話表示）を構築する。"""
-        right_frame = ttk.Frame(self.paned)
-        self.paned.add(right_frame, weight=2)
 
-        # セッション情報
-        self.session_info_label = ttk.Label(
-            right_frame, text=get_text("select_session"), font=("", 10, "bold")
-        )
-        self.session_info_label.pack(anchor=tk.W, pady=(0, 5))
+# 部分デコードを使う最小の行サイズ（これ未満は json.loads の方が速い）
+_PARTIAL_DECODE_MIN_BYTES = 64 * 1024
 
-        # 会話表示（Text）
-        text_frame = ttk.Frame(right_frame)
-        text_frame.pack(fill=tk.BOTH, expand=True)
+# 文字列の終端を str.find で探す回数（エスケープされた引用符が多い場合はCのスキャナに任せる）
+_STRING_FIND_ATTEMPTS = 8
 
-        self.conversation_text = tk.Text(
-            text_frame,
-            wrap=tk.WORD,
-            font=("Consolas", 10),
+# 行のトップレベルで参照するキー
+_TOP_LEVEL_KEYS = frozenset(("type", "timestamp", "cwd", "isMeta", "message"))
+
+# 部分デコード用の正規表現
+_WS_RE = re.compile(r"[ \t\n\r]*")
+_KEY_RE = re.compile(r'[ \t\n\r]*"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*')
+_SEPARATOR_RE = re.compile(r"[ \t\n\r]*([,}\]])[ \t\n\r]*")
+_SCALAR_RE = re.compile(r"-?[0-9][0-9.eE+-]*|true|false|null")
+# 短い文字列またはスカラー値を持つメンバーを1回のマッチで読み飛ばす
+_SIMPLE_MEMBER_RE = re.compile(
+    r'[ \t\n\r]*"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*'
+    r'("[^"\\]{0,256}"|-?[0-9][0-9.eE+-]*|true|false|null)'
+    r"[ \t\n\r]*([,}])[ \t\n\r]*"
+)
+_STRUCTURE_CHAR_RE = re.compile(r'["\[\]{}]')
+
+
+class _PartialDecodeError(ValueError):
+    """部分デコードできない行（通常の json.loads にフォールバックする）。"""
+
+
+def _skip_string(s: str, pos: int) -> int:
+    """JSON文字列をデコードせずに読み飛ばす。
+
+    Args:
+        s: 行データ
+        pos: 開き引用符の位置
+
+    Returns:
+        閉じ引用符の直後の位置
+    """
+    end = pos + 1
+    for _ in range(_STRING_FIND_ATTEMPTS):
+        end = s.find('"', end)
+        if end < 0:
+            raise _PartialDecodeError("unterminated string")
+
+        # 直前のバックスラッシュが偶数個なら文字列の終端
+        k = end - 1
+        while s[k] == "\\":
+            k -= 1
+        if (end - 1 - k) % 2 == 0:
+            return end + 1
+        end += 1
+
+    # エスケープされた引用符が多い文字列（ソースコードなど）は読み飛ばしても
+    # json.loads より速くならないため、行全体を通常どおりデコードする
+    raise _PartialDecodeError("too many escaped quotes")
+
+
+def _skip_container(s: str, pos: int) -> int:
+    """オブジェクトまたは配列をデコードせずに読み飛ばす。
+
+    Args:
+        s: 行データ
+        pos: 開き括弧の位置
+
+    Returns:
+        閉じ括弧の直後の位置
+    """
+    depth = 0
+    search = _STRUCTURE_CHAR_RE.search
+    while True:
+        m = search(s, pos)
+        if m is None:
+            raise _PartialDecodeError("unterminated container")
+
+        c = m.group()
+        if c == '"':
+            pos = _skip_string(s, m.start())
+            continue
+
+        pos = m.end()
+        if c == "{" or c == "[":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def _skip_value(s: str, pos: int) -> int:
+    """JSONの値を1つデコードせずに読み飛ばす。
+
+    Args:
+        s: 行データ
+        pos: 値の先頭位置
+
+    Returns:
+        値の直後の位置
+    """
+    c = s[pos : pos + 1]
+    if c == '"':
+        return _skip_string(s, pos)
+    if c == "{" or c == "[":
+        return _skip_container(s, pos)
+
+    m = _SCALAR_RE.match(s, pos)
+    if m is None:
+        raise _PartialDecodeError("invalid value")
+    return m.end()
+
+
+def _scan_object(
+    s: str, pos: int, wanted: frozenset[str]
+) -> tuple[dict[str, tuple[int, int]], int]:
+    """オブジェクトの直下のキーを走査し、必要なキーの値の範囲だけを記録する。
+
+    重複したキーは json.loads と同じく後のものが優先される。
+
+    Args:
+        s: 行データ
+        pos: 開き波括弧の位置
+        wanted: 値の範囲を記録するキー
+
+    Returns:
+        (キー -> (開始位置, 終了位置) の辞書, 閉じ波括弧の直後の位置)
+    """
+    spans: dict[str, tuple[int, int]] = {}
+    pos = _WS_RE.match(s, pos + 1).end()
+    if s[pos : pos + 1] == "}":
+        return spans, pos + 1
+
+    while True:
+        m = _SIMPLE_MEMBER_RE.match(s, pos)
+        if m is not None:
+            key = m.group(1)
+            if key in wanted:
+                spans[key] = m.span(2)
+            if m.group(3) == "}":
+                return spans, m.start(3) + 1
+            pos = m.end()
+            continue
+
+        m = _KEY_RE.match(s, pos)
+        if m is None:
+            # エスケープを含むキーなど、扱えない形式は通常のデコードに任せる
+            raise _PartialDecodeError("unsupported key")
+        key = m.group(1)
+        start = m.end()
+        end = _skip_value(s, start)
+        if key in wanted:
+            spans[key] = (start, end)
+
+        m = _SEPARATOR_RE.match(s, end)
+        if m is None or m.group(1) == "]":
+            raise _PartialDecodeError("invalid separator")
+        if m.group(1) == "}":
+            return spans, m.start(1) + 1
+        pos = m.end()
+
+
+def _decode_content_items(s: str, pos: int) -> list[Any]:
+    """message.content の配列から本文の抽出に必要な部分だけをデコードする。
+
+    テキスト以外の要素（tool_result、tool_use など）の中身は読み飛ばす。
+
+    Args:
+        s: 行データ
+        pos: 開き角括弧の位置
+
+    Returns:
+        _extract_message() が参照する要素のリスト
+    """
+    items: list[Any] = []
+    pos = _WS_RE.match(s, pos + 1).end()
+    if s[pos : pos + 1] == "]":
+        return items
+
+    while True:
+        c = s[pos : pos + 1]
+        if c == "{":
+            spans, end = _scan_object(s, pos, frozenset(("type", "text")))
+            item: dict[str, Any] = {}
+            if "type" in spans:
+                item["type"] = json.loads(s[slice(*spans["type"])])
+            if item.get("type") == "text" and "text" in spans:
+                item["text"] = json.loads(s[slice(*spans["text"])])
+            items.append(item)
+        elif c == '"':
+            end = _skip_string(s, pos)
+            items.append(json.loads(s[pos:end]))
+        else:
+            end = _skip_value(s, pos)
+
+        m = _SEPARATOR_RE.match(s, end)
+        if m is None or m.group(1) == "}":
+            raise _PartialDecodeError("invalid separator")
+        if m.group(1) == "]":
+            return items
+        pos = m.end()
+
+
+def _decode_message(s: str, start: int, end: int) -> Any:
+    """message の値から本文の抽出に必要な部分だけをデコードする。
+
+    Args:
+        s: 行データ
+        start: 値の開始位置
+        end: 値の終了位置
+
+    Returns:
+        _extract_message() が参照する message の値
+    """
+    if s[start] != "{":
+        return json.loads(s[start:end])
+
+    spans, _ = _scan_object(s, start, frozenset(("content",)))
+    if "content" not in spans:
+        return {}
+
+    content_start, content_end = spans["content"]
+    if s[content_start] == "[":
+        return {"content": _decode_content_items(s, content_start)}
+    return {"content": json.loads(s[content_start:content_end])}
+
+
+def _decode_line(line: bytes) -> Any:
+    """JSONLの1行をデコードする。
+
+    大きな行はトップレベルのキーだけを走査し、type・timestamp・cwd・isMeta と
+    （ユーザー/アシスタントの行の場合のみ）message の本文部分だけをデコードする。
+    ツール結果や進捗イベントなど、表示しない巨大な値は読み飛ばす。
+
+    Args:
+        line: 前後の空白を除いた行データ
+
+    Returns:
+        デコード結果（大きな行の場合は必要なキーだけを持つ辞書）
+
+    Raises:
+        ValueError: JSONとして不正な場合
+    """
+    if len(line) < _PARTIAL_DECODE_MIN_BYTES or line[:1] != b"{":
+        return json.loads(line)
+
+    s = line.decode("utf-8")
+    try:
+        spans, end = _scan_object(s, 0, _TOP_LEVEL_KEYS)
+        if end != len(s):
+            raise _PartialDecodeError("extra data")
+
+        data: dict[str, Any] = {}
+        for key in ("type", "timestamp", "cwd", "isMeta"):
+            if key in spans:
+                data[key] = json.loads(s[slice(*spans[key])])
+        if "message" in spans and data.get("type") in ("user", "assistant"):
+            data["message"] = _decode_message(s, *spans["message"])
+        return data
+    except _PartialDecodeError:
+        return json.loads(s)
+
+
+# 行オフセット表に記録するメッセージ種別（添字で保存する）
+_MESSAGE_TYPES = ("user", "assistant")
+
+
+def _encode_array(values: array) -> str:
+    """数値配列をインデックス保存用の文字列に変換する。
+
+    Args:
+        values: 変換する配列
+
+    Returns:
+        ネイティブのバイト列をBase64で表した文字列
+    """
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def _decode_array(typecode: str, text: str) -> array:
+    """_encode_array() で変換した文字列を数値配列に戻す。
+
+    Args:
+        typecode: 配列の型コード
+        text: 変換された文字列
+
+    Returns:
+        復元された配列
+
+    Raises:
+        ValueError: 文字列が不正な場合
+    """
+    values = array(typecode)
+    values.frombytes(base64.b64decode(text, validate=True))
+    return values
+
+
+def _read_fingerprint(f: Any, offset: int) -> list[int]:
+    """パース済み範囲の先頭と末尾のCRCを計算する。
+
+    Args:
+        f: バイナリモードで開いたファイル
+        offset: パース済みのバイトオフセット
+
+    Returns:
+        [先頭のCRC, 末尾のCRC]
+    """
+    f.seek(0)
+    head = f.read(min(offset, _FINGERPRINT_BYTES))
+    tail_start = max(0, offset - _FINGERPRINT_BYTES)
+    f.seek(tail_start)
+    tail = f.read(offset - tail_start)
+    return [zlib.crc32(head), zlib.crc32(tail)]
+
+
+class SessionParser:
+    """セッションファイル（JSONL）の追記対応パーサー。
+
+    最後に読み込んだ完全な行の末尾オフセットと途中経過（cwd、最初のメッセージ、
+    最新タイムスタンプ、日別プロンプト数など）を保持し、追記された部分だけを
+    パースできる。書き込み途中の最終行は完成するまで読み込まない。
+
+    メッセージ本文は保持せず、メッセージになる行の先頭オフセットと種別だけを
+    行オフセット表（line_offsets / line_types）に記録する。本文は SessionReader で
+    必要な行だけを読み出す。
+    """
+
+    def __init__(self, file_path: Path, project_name_fallback: str) -> None:
+        """パーサーを初期化する。
+
+        Args:
+            file_path: セッションファイルのパス
+            project_name_fallback: cwdが取得できない場合のフォールバック名
+        """
+        self.file_path = file_path
+        self.project_name_fallback = project_name_fallback
+        self.offset = 0
+        self.inode: Optional[int] = None
+        self.fingerprint: list[int] = []
+        # N番目のメッセージの行の先頭オフセットと種別（_MESSAGE_TYPES の添字）
+        self.line_offsets = array("Q")
+        self.line_types = array("B")
+        self.message_count = 0
+        # ローカルの時間番号（_local_hour()）-> ユーザーメッセージ数
+        # （全件 / スラッシュコマンド除外）
+        self.prompt_counts: dict[int, int] = {}
+        self.normal_prompt_counts: dict[int, int] = {}
+        self.first_user_message = ""
+        # 最新のタイムスタンプ（エポックミリ秒）
+        self.latest_timestamp: Optional[int] = None
+        self.actual_cwd: Optional[str] = None
+        self.has_normal_messages = False
+        # collect_terms が True の場合、parse() で読んだメッセージの
+        # 全文検索用の語 -> メッセージ番号（昇順）を集める（インデックスには保存しない）
+        self.collect_terms = False
+        self.postings: defaultdict[str, list[int]] = defaultdict(list)
+        self.postings_start = 0
+
+    def parse(self) -> None:
+        """前回の続きからファイルをパースする。
+
+        ファイルが切り詰められた・書き換えられた場合は先頭から再パースする。
+
+        Raises:
+            OSError: ファイルを読み込めない場合
+        """
+        with open(self.file_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if self.offset and not self._can_resume(f, st):
+                self._reset()
+            self.inode = st.st_ino
+
+            # 今回読むメッセージの番号は postings_start から始まる
+            self.postings = defaultdict(list)
+            self.postings_start = self.message_count
+
+            f.seek(self.offset)
+            pending = b""
+            while True:
+                chunk = f.read(_READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    self._feed_line(line)
+                    self.offset += len(line) + 1
+
+            # 改行で終わらない最終行はJSONとして完結している場合のみ読み込む
+            if pending.strip() and self._feed_line(pending):
+                self.offset += len(pending)
+
+            self.fingerprint = _read_fingerprint(f, self.offset)
+
+    def _can_resume(self, f: Any, st: os.stat_result) -> bool:
+        """前回のオフセットから続きを読めるかどうかを判定する。
+
+        Args:
+            f: バイナリモードで開いたファイル
+            st: ファイルのstat結果
+
+        Returns:
+            追記のみと判断できる場合 True
+        """
+        # 追記されていればサイズは必ず増える。サイズが同じで更新された場合は書き換え
+        if st.st_ino != self.inode or st.st_size <= self.offset:
+            return False
+        return _read_fingerprint(f, self.offset) == self.fingerprint
+
+    def _reset(self) -> None:
+        """途中経過を破棄する。"""
+        self.offset = 0
+        self.fingerprint = []
+        self.line_offsets = array("Q")
+        self.line_types = array("B")
+        self.message_count = 0
+        self.prompt_counts = {}
+        self.normal_prompt_counts = {}
+        self.first_user_message = ""
+        self.latest_timestamp = None
+        self.actual_cwd = None
+        self.has_normal_messages = False
+
+    def _feed_line(self, line: bytes) -> bool:
+        """1行分のデータを処理する。
+
+        Args:
+            line: 改行を含まない行データ
+
+        Returns:
+            JSONとしてパースできた場合 True
+        """
+        line = line.strip()
+        if not line:
+            return False
+
+        try:
+            data = _decode_line(line)
+        except ValueError:
+            return False
+
+        if not isinstance(data, dict):
+            return True
+
+        # cwdを取得（最初に見つかったものを使用）
+        if self.actual_cwd is None and "cwd" in data:
+            self.actual_cwd = data["cwd"]
+
+        # メッセージを抽出
+        msg_info = _extract_message(data)
+
+        # タイムスタンプを取得（メッセージの行は変換済みの値を使う）
+        if msg_info is not None:
+            timestamp = msg_info.timestamp or None
+        else:
+            timestamp = _timestamp_to_epoch_ms(data.get("timestamp"))
+        if timestamp is not None and (
+            self.latest_timestamp is None or timestamp > self.latest_timestamp
+        ):
+            self.latest_timestamp = timestamp
+
+        if msg_info:
+            self.message_count += 1
+            # parse() は行の処理後にオフセットを進めるため、ここでは行の先頭を指す
+            self.line_offsets.append(self.offset)
+            self.line_types.append(_MESSAGE_TYPES.index(msg_info.type))
+            if self.collect_terms:
+                self._index_terms(msg_info)
+            if msg_info.type == "user":
+                self._count_prompt(msg_info)
+            if msg_info.type == "user" and not msg_info.is_slash_command:
+                self.has_normal_messages = True
+                if not self.first_user_message:
+                    self.first_user_message = msg_info.content[:100].replace(
+                        "\n", " "
+                    )
+
+        return True
+
+    def _index_terms(self, msg_info: MessageRecord) -> None:
+        """最後に追加したメッセージの本文の語を全文検索用に記録する。
+
+        Args:
+            msg_info: _extract_message() で抽出したメッセージ
+        """
+        index = self.message_count - 1
+        postings = self.postings
+        for term in tokenize(msg_info.content):
+            postings[term].append(index)
+
+    def _count_prompt(self, msg_info: MessageRecord) -> None:
+        """ユーザーメッセージを時間別プロンプト数に加算する。
+
+        Args:
+            msg_info: _extract_message() で抽出したユーザーメッセージ
+        """
+        if not msg_info.timestamp:
+            return
+
+        hour = _local_hour(msg_info.timestamp)
+        self.prompt_counts[hour] = self.prompt_counts.get(hour, 0) + 1
+        if not msg_info.is_slash_command:
+            self.normal_prompt_counts[hour] = (
+                self.normal_prompt_counts.get(hour, 0) + 1
+            )
+
+    def to_session(self) -> Optional[SessionRecord]:
+        """現在の途中経過からセッション情報を組み立てる。
+
+        Returns:
+            セッション情報、またはメッセージがない場合 None
+        """
+        if not self.message_count:
+            return None
+
+        # 同じプロジェクトのセッション間でパス文字列を共有する
+        project_name = self.actual_cwd or self.project_name_fallback
+        if isinstance(project_name, str):
+            project_name = sys.intern(project_name)
+
+        # スラッシュコマンドのないセッションでは2つの集計が同じになるため共有する
+        normal_prompt_counts = self.normal_prompt_counts
+        if normal_prompt_counts == self.prompt_counts:
+            normal_prompt_counts = self.prompt_counts
+
+        flags = 0
+        if _is_human_session(self.file_path, self.first_user_message):
+            flags |= SessionRecord.HUMAN_SESSION
+        if self.has_normal_messages:
+            flags |= SessionRecord.HAS_NORMAL_MESSAGES
+
+        return SessionRecord(
+            file_path=self.file_path,
+            project_name=project_name,
+            session_id=self.file_path.stem,
+            timestamp=self.latest_timestamp or 0,
+            first_message=sys.intern(
+                self.first_user_message or get_text("slash_command_only")
+            ),
+            message_count=self.message_count,
+            prompt_counts=self.prompt_counts,
+            normal_prompt_counts=normal_prompt_counts,
+            flags=flags,
+        )
+
+    def to_state(self) -> dict[str, Any]:
+        """途中経過をインデックス保存用の辞書に変換する。
+
+        Returns:
+            JSONシリアライズ可能な辞書
+        """
+        return {
+            "offset": self.offset,
+            "inode": self.inode,
+            "fingerprint": self.fingerprint,
+            "project_name_fallback": self.project_name_fallback,
+            "cwd": self.actual_cwd,
+            "first_user_message": self.first_user_message,
+            "latest_timestamp": self.latest_timestamp,
+            "message_count": self.message_count,
+            "prompt_counts": self.prompt_counts,
+            "normal_prompt_counts": self.normal_prompt_counts,
+            "has_normal_messages": self.has_normal_messages,
+            "line_offsets": _encode_array(self.line_offsets),
+            "line_types": _encode_array(self.line_types),
+        }
+
+    @classmethod
+    def from_state(cls, file_path: Path, state: dict[str, Any]) -> SessionParser:
+        """インデックスに保存された途中経過からパーサーを復元する。
+
+        Args:
+            file_path: セッションファイルのパス
+            state: to_state() で保存した辞書
+
+        Returns:
+            復元されたパーサー
+        """
+        parser = cls(file_path, state["project_name_fallback"])
+        parser.offset = state["offset"]
+        parser.inode = state["inode"]
+        parser.fingerprint = list(state["fingerprint"])
+        parser.actual_cwd = state["cwd"]
+        parser.first_user_message = state["first_user_message"]
+        parser.latest_timestamp = state["latest_timestamp"]
+        parser.message_count = state["message_count"]
+        # 以前に返したセッションの集計を変更しないようコピーする
+        # （JSON ではキーが文字列になるため整数に戻す）
+        parser.prompt_counts = {
+            int(k): v for k, v in state["prompt_counts"].items()
+        }
+        parser.normal_prompt_counts = {
+            int(k): v for k, v in state["normal_prompt_counts"].items()
+        }
+        parser.has_normal_messages = state["has_normal_messages"]
+        parser.line_offsets = _decode_array("Q", state["line_offsets"])
+        parser.line_types = _decode_array("B", state["line_types"])
+        if not (
+            len(parser.line_offsets) == len(parser.line_types) == parser.message_count
+        ):
+            raise ValueError("line table does not match message count")
+        return parser
+
+
+class SessionReader:
+    """行オフセット表を使ってセッションファイルからメッセージを読み出すリーダー。
+
+    ファイルを mmap で開き、N番目のメッセージはその1行だけを切り出してデコードする。
+    残りの部分は読み込みもコピーもしない。
+    """
+
+    def __init__(
+        self, file_path: Path, line_offsets: array, line_types: array
+    ) -> None:
+        """リーダーを初期化し、ファイルをマップする。
+
+        Args:
+            file_path: セッションファイルのパス
+            line_offsets: メッセージの行の先頭オフセット
+            line_types: メッセージの種別（_MESSAGE_TYPES の添字）
+
+        Raises:
+            OSError: ファイルを開けない場合
+        """
+        self.file_path = file_path
+        self.line_offsets = line_offsets
+        self.line_types = line_types
+        self._map: Optional[mmap.mmap] = None
+        with open(file_path, "rb") as f:
+            # 空のファイルはマップできない
+            if os.fstat(f.fileno()).st_size:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        """メッセージ数を返す。"""
+        return len(self.line_offsets)
+
+    def __enter__(self) -> SessionReader:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """マップを解放する。"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def message_type(self, index: int) -> str:
+        """メッセージの種別を本文を読まずに取得する。
+
+        Args:
+            index: メッセージ番号
+
+        Returns:
+            "user" または "assistant"
+        """
+        return _MESSAGE_TYPES[self.line_types[index]]
+
+    def message(self, index: int) -> Optional[MessageRecord]:
+        """N番目のメッセージを読み出す。
+
+        Args:
+            index: メッセージ番号
+
+        Returns:
+            メッセージ。表の作成後にファイルが書き換えられて読めない場合は None
+        """
+        if self._map is None:
+            return None
+
+        start = self.line_offsets[index]
+        end = self._map.find(b"\n", start)
+        if end < 0:
+            end = len(self._map)
+
+        try:
+            data = _decode_line(self._map[start:end].strip())
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        return _extract_message(data)
+
+    def messages(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> list[MessageRecord]:
+        """範囲内のメッセージを読み出す。
+
+        Args:
+            start: 最初のメッセージ番号
+            stop: 最後のメッセージ番号の次（None で末尾まで）
+
+        Returns:
+            メッセージのリスト（読めないメッセージは除く）
+        """
+        result = []
+        for index in range(*slice(start, stop).indices(len(self))):
+            msg = self.message(index)
+            if msg is not None:
+                result.append(msg)
+        return result
+
+
+def open_session_reader(
+    file_path: Path, entry: Optional[dict[str, Any]]
+) -> SessionReader:
+    """セッションファイルのリーダーを開く。
+
+    インデックスに保存された行オフセット表がファイルの現状と一致すればそのまま使う。
+    追記されている場合は追記部分だけを、それ以外の変更があれば全体をパースし直して
+    表を作る。
+
+    Args:
+        file_path: セッションファイルのパス
+        entry: SessionIndex.get() で取得したインデックスのエントリ（ない場合 None）
+
+    Returns:
+        セッションリーダー
+
+    Raises:
+        OSError: ファイルを読み込めない場合
+    """
+    parser: Optional[SessionParser] = None
+    if entry is not None:
+        try:
+            parser = SessionParser.from_state(file_path, entry["state"])
+        except (KeyError, TypeError, ValueError):
+            parser = None
+
+    if parser is None:
+        parser = SessionParser(file_path, "")
+        parser.parse()
+    elif tuple(entry.get("signature", ())) != file_signature(os.stat(file_path)):
+        parser.parse()
+
+    return SessionReader(file_path, parser.line_offsets, parser.line_types)
+
+
+# ============================================================================
+# 並列パース
+# ============================================================================
+
+# 並列化する最小の合計バイト数（これ未満はプロセス起動コストの方が大きい）
+_PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+# 1バッチあたりの目安バイト数（大きなプロジェクトは複数バッチに分割する）
+_BATCH_TARGET_BYTES = 32 * 1024 * 1024
+
+# WindowsのProcessPoolExecutorで使えるワーカー数の上限
+_WINDOWS_MAX_WORKERS = 61
+
+
+class ParseJob(NamedTuple):
+    """1ファイル分のパース要求。"""
+
+    file_path: str
+    project_name_fallback: str
+    signature: tuple[int, int, int]
+    state: Optional[dict[str, Any]]
+    # 全文検索インデックスに登録する語を集めるかどうか
+    collect_terms: bool = True
+
+
+def resolve_worker_count(workers: Optional[int]) -> int:
+    """パースに使うワーカー数を決定する。
+
+    Args:
+        workers: 指定されたワーカー数（None または 0 以下で自動）
+
+    Returns:
+        実際に使うワーカー数
+    """
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    if sys.platform == "win32":
+        workers = min(workers, _WINDOWS_MAX_WORKERS)
+    return workers
+
+
+class ParseResult(NamedTuple):
+    """1ファイル分のパース結果。
+
+    postings は今回パースしたメッセージ（postings_start 番目以降）の
+    全文検索用の語 -> メッセージ番号。
+    """
+
+    state: dict[str, Any]
+    postings_start: int
+    postings: dict[str, array]
+
+
+def parse_session_job(job: ParseJob) -> Optional[ParseResult]:
+    """1ファイルをパースして途中経過を返す。
+
+    保存済みの途中経過があれば追記部分だけをパースする。
+
+    Args:
+        job: パース要求
+
+    Returns:
+        パース結果、または読み込めない場合 None
+    """
+    file_path = Path(job.file_path)
+    parser: Optional[SessionParser] = None
+    if job.state is not None:
+        try:
+            parser = SessionParser.from_state(file_path, job.state)
+        except (KeyError, TypeError, ValueError):
+            parser = None
+    if parser is None:
+        parser = SessionParser(file_path, job.project_name_fallback)
+    parser.collect_terms = job.collect_terms
+
+    try:
+        parser.parse()
+    except Exception as e:
+        logger.warning(f"Error parsing {file_path}: {e}")
+        return None
+    # 大量の小さなリストはGCの走査対象になり、プロセス間の受け渡しも遅いため
+    # 数値配列に変換して返す
+    postings = {
+        term: array("I", indices) for term, indices in parser.postings.items()
+    }
+    return ParseResult(parser.to_state(), parser.postings_start, postings)
+
+
+def _parse_job_batch(
+    jobs: list[ParseJob],
+) -> list[tuple[ParseJob, Optional[ParseResult]]]:
+    """ワーカープロセスでバッチをパースする。
+
+    Args:
+        jobs: 同じプロジェクトディレクトリのパース要求
+
+    Returns:
+        (パース要求, パース結果) のリスト
+    """
+    return [(job, parse_session_job(job)) for job in jobs]
+
+
+def _batch_jobs(jobs: list[ParseJob]) -> list[list[ParseJob]]:
+    """パース要求をプロジェクトディレクトリ単位のバッチにまとめる。
+
+    大きいバッチから処理されるよう、合計サイズの降順に並べて返す。
+
+    Args:
+        jobs: パース要求のリスト
+
+    Returns:
+        バッチのリスト
+    """
+    by_project: dict[str, list[ParseJob]] = {}
+    for job in jobs:
+        by_project.setdefault(job.project_name_fallback, []).append(job)
+
+    batches: list[tuple[int, list[ParseJob]]] = []
+    for project_jobs in by_project.values():
+        batch: list[ParseJob] = []
+        batch_bytes = 0
+        for job in project_jobs:
+            batch.append(job)
+            batch_bytes += job.signature[1]
+            if batch_bytes >= _BATCH_TARGET_BYTES:
+                batches.append((batch_bytes, batch))
+                batch = []
+                batch_bytes = 0
+        if batch:
+            batches.append((batch_bytes, batch))
+
+    batches.sort(key=lambda b: b[0], reverse=True)
+    return [batch for _, batch in batches]
+
+
+def _create_parse_executor(workers: int) -> Executor:
+    """パース用のExecutorを作成する。
+
+    GILのないフリースレッド版Pythonではスレッドプール、
+    それ以外ではプロセスプールを使う。
+
+    Args:
+        workers: ワーカー数
+
+    Returns:
+        Executor
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    if is_gil_enabled is not None and not is_gil_enabled():
+        return ThreadPoolExecutor(max_workers=workers)
+    # Tkやスレッドを持つプロセスをforkしないよう、全OSでspawnを使う
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def iter_parse_jobs(
+    jobs: list[ParseJob], workers: Optional[int] = None
+) -> Iterator[tuple[ParseJob, Optional[ParseResult]]]:
+    """パース要求を（可能なら並列に）処理し、完了したものから返す。
+
+    結果は完了順に返るため、呼び出し側はファイルパスで対応付けること。
+    並列実行できない環境ではその場で逐次パースする。
+    ジェネレーターを途中で閉じると未着手のバッチはキャンセルされる。
+
+    Args:
+        jobs: パース要求のリスト
+        workers: ワーカー数（None で自動）
+
+    Yields:
+        (パース要求, パース結果) のタプル
+    """
+    workers = resolve_worker_count(workers)
+    batches = _batch_jobs(jobs)
+    total_bytes = sum(job.signature[1] for job in jobs)
+
+    if workers <= 1 or len(batches) <= 1 or total_bytes < _PARALLEL_MIN_BYTES:
+        for job in jobs:
+            yield job, parse_session_job(job)
+        return
+
+    done: set[str] = set()
+    executor: Optional[Executor] = None
+    try:
+        executor = _create_parse_executor(min(workers, len(batches)))
+        futures = [executor.submit(_parse_job_batch, batch) for batch in batches]
+        for future in as_completed(futures):
+            for job, result in future.result():
+                done.add(job.file_path)
+                yield job, result
+    except (OSError, BrokenExecutor) as e:
+        # プロセスを起動できない環境では残りを逐次パースする
+        logger.warning(f"Parallel parsing failed, falling back to serial: {e}")
+        for job in jobs:
+            if job.file_path not in done:
+                yield job, parse_session_job(job)
+    finally:
+        # 途中で打ち切られた場合も未着手のバッチは破棄して即座に戻る
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ============================================================================
+# セッションインデックス
+# ============================================================================
+
+def file_signature(st: os.stat_result) -> tuple[int, int, int]:
+    """ファイルの変更検出用シグネチャを取得する。
+
+    Args:
+        st: os.stat() の結果
+
+    Returns:
+        (mtime_ns, size, inode) のタプル
+    """
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _local_timezone_signature() -> list[Any]:
+    """ローカルタイムゾーン設定を表す値を取得する。
+
+    インデックスにはローカル時刻に変換済みの値を保存するため、
+    タイムゾーンが変わった場合はインデックスを破棄する必要がある。
+
+    Returns:
+        タイムゾーン設定を表すリスト
+    """
+    return [time.timezone, time.altzone, time.daylight, list(time.tzname)]
+
+
+class SessionIndex:
+    """パース済みセッション情報の永続インデックス。
+
+    セッションファイルごとに (mtime, size, inode) のシグネチャとパーサーの途中経過を
+    JSONファイルに保存し、シグネチャが変化したファイルだけを再パースできるようにする。
+    追記されただけのファイルは前回の続きからパースする。
+    """
+
+    def __init__(self, index_path: Path) -> None:
+        """インデックスを初期化する。
+
+        Args:
+            index_path: インデックスファイルのパス
+        """
+        self.index_path = index_path
+        self.entries: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+
+    def load(self) -> None:
+        """インデックスファイルを読み込む。
+
+        ファイルが存在しない・壊れている・バージョンやタイムゾーンが異なる場合は
+        空のインデックスとして扱う。
+        """
+        self.entries = {}
+        self._dirty = False
+
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(data, dict):
+            return
+        if data.get("version") != SESSION_INDEX_VERSION:
+            return
+        if data.get("timezone") != _local_timezone_signature():
+            return
+
+        files = data.get("files")
+        if isinstance(files, dict):
+            self.entries = files
+
+    def save(self) -> None:
+        """変更があればインデックスファイルをアトミックに書き出す。"""
+        if not self._dirty:
+            return
+
+        data = {
+            "version": SESSION_INDEX_VERSION,
+            "timezone": _local_timezone_signature(),
+            "files": self.entries,
+        }
+
+        import tempfile
+
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                mode="w",
+                encoding="utf-8",
+                dir=self.index_path.parent,
+                prefix=self.index_path.name,
+                suffix=".tmp",
+                delete=False,
+            ) as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+                temp_path = f.name
+            os.replace(temp_path, self.index_path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"Failed to save session index {self.index_path}: {e}")
+
+    def lookup(
+        self, file_path: Path, signature: tuple[int, int, int]
+    ) -> tuple[bool, Optional[SessionRecord]]:
+        """シグネチャが一致する保存済みのセッション情報を取得する。
+
+        Args:
+            file_path: セッションファイルのパス
+            signature: 現在のファイルシグネチャ
+
+        Returns:
+            (ヒットしたか, セッション情報) のタプル。
+            セッション情報はメッセージのないファイルの場合 None
+        """
+        entry = self.entries.get(str(file_path))
+        if entry is None or tuple(entry.get("signature", ())) != signature:
+            return False, None
+
+        try:
+            parser = SessionParser.from_state(file_path, entry["state"])
+        except (KeyError, TypeError, ValueError):
+            return False, None
+        return True, parser.to_session()
+
+    def resume_state(
+        self, file_path: Path, project_name_fallback: str
+    ) -> Optional[dict[str, Any]]:
+        """追記部分のパースを再開するための途中経過を取得する。
+
+        Args:
+            file_path: セッションファイルのパス
+            project_name_fallback: cwdが取得できない場合のフォールバック名
+
+        Returns:
+            保存済みの途中経過、または None
+        """
+        entry = self.entries.get(str(file_path))
+        if entry is None:
+            return None
+
+        state = entry.get("state")
+        if (
+            not isinstance(state, dict)
+            or state.get("project_name_fallback") != project_name_fallback
+        ):
+            return None
+        return state
+
+    def update(
+        self,
+        file_path: Path,
+        signature: tuple[int, int, int],
+        state: dict[str, Any],
+    ) -> None:
+        """パーサーの途中経過を登録する。
+
+        Args:
+            file_path: セッションファイルのパス
+            signature: パース前に取得したファイルシグネチャ
+            state: SessionParser.to_state() の結果
+        """
+        self.entries[str(file_path)] = {"signature": list(signature), "state": state}
+        self._dirty = True
+
+    def get(self, file_path: Path) -> Optional[dict[str, Any]]:
+        """ファイルのエントリを取得する。
+
+        Args:
+            file_path: セッションファイルのパス
+
+        Returns:
+            {"signature": ..., "state": ...} の辞書、または登録がない場合 None
+        """
+        return self.entries.get(str(file_path))
+
+    def remove(self, paths: Iterable[str]) -> None:
+        """指定したファイルのエントリを削除する。
+
+        Args:
+            paths: 削除するセッションファイルのパス文字列
+        """
+        for path in paths:
+            if self.entries.pop(path, None) is not None:
+                self._dirty = True
+
+    def prune(self, live_paths: set[str]) -> None:
+        """存在しなくなったファイルのエントリを削除する。
+
+        Args:
+            live_paths: 現在存在するセッションファイルのパス文字列の集合
+        """
+        stale = [path for path in self.entries if path not in live_paths]
+        for path in stale:
+            del self.entries[path]
+        if stale:
+            self._dirty = True
+
+
+# ============================================================================
+# 全文検索
+# ============================================================================
+
+# 漢字・かな・ハングル（単語が空白で区切られないため文字の2-gramで索引する）
+_CJK_CHARS = (
+    "\u1100-\u11ff"  # ハングル字母
+    "\u3040-\u30ff"  # ひらがな・カタカナ
+    "\u3130-\u318f"  # ハングル互換字母
+    "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"  # 漢字
+    "\uac00-\ud7af"  # ハングル音節
+)
+_ASCII_WORD_RE = re.compile("[a-z0-9]+")
+
+# 索引する語の最大長（Base64 などの長い文字列で語彙が膨らむのを防ぐ）
+_MAX_TERM_LENGTH = 40
+
+
+class _TokenPatterns(NamedTuple):
+    """語の分割に使う正規表現。"""
+
+    token: re.Pattern[str]  # 検索語（グループ1が漢字・かな・ハングル、2が英数字）
+    cjk_run: re.Pattern[str]  # 漢字・かな・ハングルの連続
+    word: re.Pattern[str]  # 英数字の語
+
+
+@functools.lru_cache(maxsize=None)
+def _token_patterns() -> _TokenPatterns:
+    """語の分割に使う正規表現を返す。
+
+    漢字・かな・ハングルの文字クラスを含む正規表現はコンパイルに数ミリ秒かかるため、
+    起動時ではなく最初に使うとき（読み込みスレッドや検索時）にコンパイルする。
+
+    Returns:
+        語の分割に使う正規表現
+    """
+    return _TokenPatterns(
+        re.compile(f"([{_CJK_CHARS}]+)|([^\\W_{_CJK_CHARS}]+)"),
+        re.compile(f"[{_CJK_CHARS}]+"),
+        re.compile(f"[^\\W_{_CJK_CHARS}]+"),
+    )
+
+
+def _normalize_for_search(text: str) -> str:
+    """全角英数字や半角カナを揃え、小文字に変換する。
+
+    Args:
+        text: 対象テキスト
+
+    Returns:
+        正規化したテキスト
+    """
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+    return text.lower()
+
+
+def tokenize(text: str) -> set[str]:
+    """本文を全文検索用の語に分割する。
+
+    英数字は連続した部分を1語とする。漢字・かな・ハングルは隣り合う2文字ずつの
+    語（2-gram）と、連続した部分の末尾の1文字にする。
+
+    Args:
+        text: 対象テキスト
+
+    Returns:
+        語の集合
+    """
+    text = _normalize_for_search(text)
+    # 大半を占める英数字だけの本文は正規表現1回で済ませる
+    if text.isascii():
+        terms = set(_ASCII_WORD_RE.findall(text))
+    else:
+        patterns = _token_patterns()
+        terms = set(patterns.word.findall(text))
+        for run in patterns.cjk_run.findall(text):
+            terms.update(run[i : i + 2] for i in range(len(run) - 1))
+            terms.add(run[-1])
+
+    if terms and len(max(terms, key=len)) > _MAX_TERM_LENGTH:
+        terms = {term for term in terms if len(term) <= _MAX_TERM_LENGTH}
+    return terms
+
+
+def _query_terms(query: str) -> list[tuple[str, bool]]:
+    """検索語を索引の語に分割する。
+
+    英数字の語と1文字だけの漢字・かな・ハングルは前方一致で、2文字以上の
+    漢字・かな・ハングルは2-gramの完全一致で検索する。
+
+    Args:
+        query: 検索語
+
+    Returns:
+        (語, 前方一致かどうか) のリスト
+    """
+    terms: list[tuple[str, bool]] = []
+    for cjk, word in _token_patterns().token.findall(_normalize_for_search(query)):
+        if word:
+            # 1文字の前方一致は候補が多すぎるため完全一致にする
+            terms.append((word, len(word) > 1))
+        elif len(cjk) == 1:
+            terms.append((cjk, True))
+        else:
+            terms.extend((cjk[i : i + 2], False) for i in range(len(cjk) - 1))
+    return list(dict.fromkeys(terms))
+
+
+# 検索語の1文字（英数字の語の一部になる文字）
+_WORD_CHAR = f"[^\\W_{_CJK_CHARS}]"
+
+
+@functools.lru_cache(maxsize=32)
+def _match_pattern(terms: tuple[tuple[str, bool], ...]) -> re.Pattern[str]:
+    """検索語の語が本文に現れる位置を探す正規表現を作る。
+
+    英数字の語は語の先頭から（前方一致の場合は語の末尾まで）、漢字・かな・
+    ハングルは2-gramまたは1文字がそのまま現れる位置に一致させる。
+
+    Args:
+        terms: (語, 前方一致かどうか) の組
+
+    Returns:
+        正規化した本文に適用する正規表現（重なった出現も見つけるよう先読みにし、
+        一致した範囲はグループ1に入る）
+    """
+    alternatives = []
+    for term, prefix in terms:
+        escaped = re.escape(term)
+        if _token_patterns().cjk_run.match(term):
+            alternatives.append(escaped)
+        elif prefix:
+            alternatives.append(f"(?<!{_WORD_CHAR}){escaped}{_WORD_CHAR}*")
+        else:
+            alternatives.append(f"(?<!{_WORD_CHAR}){escaped}(?!{_WORD_CHAR})")
+    alternatives.sort(key=len, reverse=True)
+    return re.compile(f"(?=({'|'.join(alternatives)}))")
+
+
+def _normalize_with_positions(
+    text: str,
+) -> tuple[str, Optional[tuple[list[int], list[int]]]]:
+    """本文を正規化し、正規化後の各文字が元の本文のどの範囲に当たるかを求める。
+
+    Args:
+        text: 本文
+
+    Returns:
+        (正規化した本文, (各文字の元の開始位置, 元の終了位置))。
+        文字数が変わらない場合の対応は None
+    """
+    if text.isascii() or unicodedata.is_normalized("NFKC", text):
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return lowered, None
+
+    # 全角・半角の変換や濁点の合成で文字数が変わるため、結合する文字を
+    # 含めたまとまりごとに正規化する
+    parts: list[str] = []
+    starts: list[int] = []
+    ends: list[int] = []
+    i = 0
+    while i < len(text):
+        j = i + 1
+        while j < len(text) and unicodedata.combining(
+            unicodedata.normalize("NFKC", text[j])[:1] or " "
+        ):
+            j += 1
+        normalized = _normalize_for_search(text[i:j])
+        parts.append(normalized)
+        starts.extend([i] * len(normalized))
+        ends.extend([j] * len(normalized))
+        i = j
+    return "".join(parts), (starts, ends)
+
+
+def match_offsets(text: str, terms: list[tuple[str, bool]]) -> list[tuple[int, int]]:
+    """検索語の語が本文に現れる範囲を求める。
+
+    Args:
+        text: 本文
+        terms: 全文検索インデックスの highlight_terms() が返した語
+
+    Returns:
+        (開始位置, 終了位置) のリスト（元の本文の文字位置、昇順で重なりなし）
+    """
+    if not terms or not text:
+        return []
+
+    normalized, positions = _normalize_with_positions(text)
+    spans: list[tuple[int, int]] = []
+    for match in _match_pattern(tuple(terms)).finditer(normalized):
+        start, end = match.span(1)
+        if positions is not None:
+            start, end = positions[0][start], positions[1][end - 1]
+        if spans and start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+        else:
+            spans.append((start, end))
+    return spans
+
+
+# 綴り間違いを許容する語の最小長と、許容する編集距離（語が長いほど多く許容する）
+_FUZZY_MIN_LENGTH = 4
+_FUZZY_LONG_LENGTH = 8
+
+# 綴り間違いとして展開する語の最大数
+_FUZZY_MAX_CANDIDATES = 20
+
+# 前方一致で展開する語の最大数（超えた分は出現の少ない語を除く）
+_PREFIX_MAX_TERMS = 200
+
+# 前方一致の展開と BM25 用の出現数をキャッシュする語の数
+_TERM_CACHE_SIZE = 16
+
+# BM25 のパラメータ
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+def _fuzzy_limit(term: str) -> int:
+    """語に許容する編集距離を返す。
+
+    Args:
+        term: 検索語の語
+
+    Returns:
+        許容する編集距離（綴り間違いを許容しない語は 0）
+    """
+    if len(term) < _FUZZY_MIN_LENGTH or _token_patterns().cjk_run.match(term):
+        return 0
+    return 2 if len(term) >= _FUZZY_LONG_LENGTH else 1
+
+
+def _trigrams(term: str) -> set[str]:
+    """語の前後に境界記号を付けた3-gramを返す。
+
+    Args:
+        term: 語
+
+    Returns:
+        3-gramの集合
+    """
+    padded = f"^{term}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """隣接文字の入れ替えを1操作とする編集距離を求める。
+
+    Args:
+        a: 文字列
+        b: 文字列
+        limit: これを超えたら計算を打ち切る距離
+
+    Returns:
+        編集距離（limit を超える場合は limit + 1）
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous2: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = ca != cb
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class _TermTrigrams:
+    """綴り間違いの候補を探すための、語彙の3-gramインデックス。
+
+    語彙全体を毎回走査しないよう、3-gram -> その3-gramを含む語を持ち、
+    検索語と3-gramを共有する語だけを編集距離で確かめる。
+    """
+
+    def __init__(self, terms: Iterable[str] = ()) -> None:
+        """インデックスを作成する。
+
+        Args:
+            terms: 登録する語
+        """
+        self._terms: set[str] = set()
+        self._by_trigram: defaultdict[str, list[str]] = defaultdict(list)
+        for term in terms:
+            self.add(term)
+
+    def add(self, term: str) -> None:
+        """語を登録する（綴り間違いを許容しない語・登録済みの語は無視する）。
+
+        Args:
+            term: 語
+        """
+        if term in self._terms or not _fuzzy_limit(term):
+            return
+        self._terms.add(term)
+        for trigram in _trigrams(term):
+            self._by_trigram[trigram].append(term)
+
+    def candidates(self, term: str, prefix: bool) -> list[tuple[str, int]]:
+        """綴りの近い語を探す。
+
+        Args:
+            term: 検索語の語
+            prefix: 前方一致の語かどうか（語の先頭部分との距離も見る）
+
+        Returns:
+            (語, 編集距離) のリスト（距離の近い順に最大 _FUZZY_MAX_CANDIDATES 件）
+        """
+        limit = _fuzzy_limit(term)
+        if not limit:
+            return []
+
+        # 1回の編集で失われる3-gramは高々4つ（隣接文字の入れ替えの場合）
+        trigrams = _trigrams(term)
+        shared: defaultdict[str, int] = defaultdict(int)
+        for trigram in trigrams:
+            for candidate in self._by_trigram.get(trigram, ()):
+                shared[candidate] += 1
+        required = max(1, len(trigrams) - 4 * limit)
+
+        found: list[tuple[int, int, str]] = []
+        for candidate, count in shared.items():
+            if count < required:
+                continue
+            distance = _edit_distance(term, candidate, limit)
+            if prefix and distance > limit and len(candidate) > len(term):
+                distance = _edit_distance(term, candidate[: len(term)], limit)
+            if distance <= limit:
+                found.append((distance, -count, candidate))
+        found.sort()
+        return [
+            (candidate, distance)
+            for distance, _, candidate in found[:_FUZZY_MAX_CANDIDATES]
+        ]
+
+
+def _bm25(tf: float, idf: float, length: int, average_length: float) -> float:
+    """BM25 の1語分のスコアを求める。
+
+    Args:
+        tf: 文書中の語の出現数
+        idf: 語の逆文書頻度
+        length: 文書の長さ
+        average_length: 文書の平均の長さ
+
+    Returns:
+        スコア
+    """
+    norm = 1 - _BM25_B + _BM25_B * length / average_length if average_length else 1
+    return idf * tf * (_BM25_K1 + 1) / (tf + _BM25_K1 * norm)
+
+
+def _idf(document_count: int, document_frequency: int) -> float:
+    """BM25 の逆文書頻度を求める。
+
+    Args:
+        document_count: 文書数
+        document_frequency: 語を含む文書数
+
+    Returns:
+        逆文書頻度
+    """
+    return math.log(
+        1 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5)
+    )
+
+
+# 1つのメッセージを (セッション番号 << 32 | メッセージ番号) の整数で表す
+_MESSAGE_BITS = 32
+_MESSAGE_MASK = (1 << _MESSAGE_BITS) - 1
+
+# 削除されたセッションの語がこの割合を超えたら転置リストから取り除く
+_COMPACT_RATIO = 0.25
+
+
+class _IndexedSession:
+    """全文検索インデックスに登録済みのセッション。"""
+
+    __slots__ = ("number", "signature", "message_count", "posting_count")
+
+    def __init__(
+        self,
+        number: int,
+        signature: tuple[int, int, int],
+        message_count: int,
+        posting_count: int,
+    ) -> None:
+        self.number = number
+        self.signature = signature
+        self.message_count = message_count
+        self.posting_count = posting_count
+
+
+class FullTextIndex:
+    """メッセージ本文の転置インデックス。
+
+    語ごとに、その語を含むメッセージを (セッション番号, メッセージ番号) を
+    詰めた64ビット整数の配列で持つ。語はパース時に SessionParser が集め、
+    追記されたセッションは追記分のメッセージだけを追加する。書き換え・削除された
+    セッションは番号を無効にするだけで、無効な分が増えたら compact() で取り除く。
+
+    更新は読み込みスレッドだけが行い、UIスレッドからの検索とはロックで分離する。
+    インデックスは専用のバイナリファイルに保存し、次回起動時に再利用する。
+    """
+
+    def __init__(self, index_path: Path) -> None:
+        """空のインデックスを作成する。
+
+        Args:
+            index_path: インデックスファイルのパス
+        """
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._sessions: dict[str, _IndexedSession] = {}
+        # セッション番号 -> ファイルパス（削除されたセッションは None）
+        self._paths: list[Optional[str]] = []
+        self._postings: dict[str, array] = {}
+        # 前方一致検索用の全語（並べ替えは検索時にまとめて行う）
+        self._vocabulary: list[str] = []
+        self._vocabulary_sorted = True
+        # 版ごとの、前方一致で展開した語と語ごとの BM25 用の出現数のキャッシュ
+        self._cache_version = -1
+        self._prefix_terms_cache: dict[str, tuple[list[str], bool]] = {}
+        self._frequency_cache: dict[tuple[str, bool], dict[int, float]] = {}
+        # 前回の検索の (版, 語, 一致したメッセージ)。語を書き足した検索は
+        # 前回の結果から絞り込む
+        self._last_search: Optional[
+            tuple[int, list[tuple[str, bool]], set[int]]
+        ] = None
+        # 綴り間違いの候補探し用（初めて必要になったときに作る）
+        self._fuzzy: Optional[_TermTrigrams] = None
+        self._total_postings = 0
+        self._dead_postings = 0
+        self._dirty = False
+        self.last_saved = 0.0
+        # 内容が変わるたびに増える版（検索結果のキャッシュの判定用）
+        self.version = 0
+
+    def __len__(self) -> int:
+        """登録済みのセッション数を返す。"""
+        return len(self._sessions)
+
+    def is_current(self, path: str, signature: tuple[int, int, int]) -> bool:
+        """セッションが現在のファイルの内容で登録済みかどうかを判定する。
+
+        Args:
+            path: セッションファイルのパス
+            signature: 現在のファイルシグネチャ
+
+        Returns:
+            登録済みで内容が変わっていない場合 True
+        """
+        session = self._sessions.get(path)
+        return session is not None and session.signature == signature
+
+    def add(
+        self,
+        path: str,
+        signature: tuple[int, int, int],
+        message_count: int,
+        postings_start: int,
+        postings: dict[str, Sequence[int]],
+    ) -> bool:
+        """パースしたメッセージの語を登録する。
+
+        postings_start が 0 の場合はセッション全体を登録し直す。それ以外は
+        登録済みのメッセージの続きとして追加する。
+
+        Args:
+            path: セッションファイルのパス
+            signature: ファイルシグネチャ
+            message_count: パース後のメッセージ数
+            postings_start: postings に含まれる最初のメッセージ番号
+            postings: 語 -> その語を含むメッセージ番号
+
+        Returns:
+            登録できた場合 True。登録済みの内容と続きにならない場合は False
+            （呼び出し側でセッション全体を読み直して登録すること）
+        """
+        session = self._sessions.get(path)
+        if postings_start and (
+            session is None or session.message_count != postings_start
+        ):
+            return False
+
+        with self._lock:
+            if session is None or not postings_start:
+                if session is not None:
+                    self._discard(session)
+                session = _IndexedSession(len(self._paths), signature, 0, 0)
+                self._paths.append(path)
+                self._sessions[path] = session
+
+            pack = (session.number << _MESSAGE_BITS).__or__
+            get_postings = self._postings.get
+            added = 0
+            for term, indices in postings.items():
+                term_postings = get_postings(term)
+                if term_postings is None:
+                    term_postings = self._postings[term] = array("Q")
+                    self._vocabulary.append(term)
+                    self._vocabulary_sorted = False
+                    if self._fuzzy is not None:
+                        self._fuzzy.add(term)
+                term_postings.extend(map(pack, indices))
+                added += len(indices)
+
+            session.signature = signature
+            session.message_count = message_count
+            session.posting_count += added
+            self._total_postings += added
+            self._dirty = True
+            self.version += 1
+        return True
+
+    def remove(self, paths: Iterable[str]) -> None:
+        """セッションを削除する。
+
+        Args:
+            paths: 削除するセッションファイルのパス
+        """
+        with self._lock:
+            for path in paths:
+                session = self._sessions.get(path)
+                if session is not None:
+                    self._discard(session)
+
+    def retain(self, live_paths: set[str]) -> None:
+        """存在しないセッションを削除する。
+
+        Args:
+            live_paths: 現存するセッションファイルのパス
+        """
+        self.remove([path for path in self._sessions if path not in live_paths])
+
+    def _discard(self, session: _IndexedSession) -> None:
+        """セッションの番号を無効にする（ロック取得済みで呼ぶ）。
+
+        Args:
+            session: 削除するセッション
+        """
+        path = self._paths[session.number]
+        self._paths[session.number] = None
+        if path is not None:
+            del self._sessions[path]
+        self._dead_postings += session.posting_count
+        self._dirty = True
+        self.version += 1
+
+    def compact(self) -> None:
+        """無効なセッションの語が増えていれば転置リストから取り除く。
+
+        新しい転置リストはロックの外で作り、差し替えだけをロック内で行う。
+        """
+        if self._dead_postings <= self._total_postings * _COMPACT_RATIO:
+            return
+
+        alive = [path is not None for path in self._paths]
+        postings: dict[str, array] = {}
+        total = 0
+        for term, term_postings in list(self._postings.items()):
+            kept = array(
+                "Q", [p for p in term_postings if alive[p >> _MESSAGE_BITS]]
+            )
+            if kept:
+                postings[term] = kept
+                total += len(kept)
+
+        vocabulary = sorted(postings)
+
+        with self._lock:
+            self._postings = postings
+            self._vocabulary = vocabulary
+            self._vocabulary_sorted = True
+            self._fuzzy = None
+            self.version += 1
+            self._total_postings = total
+            self._dead_postings = 0
+            self._dirty = True
+
+    def search(self, query: str) -> Optional[dict[str, list[int]]]:
+        """すべての語を含むメッセージを検索する。
+
+        Args:
+            query: 検索語
+
+        Returns:
+            ファイルパス -> 一致したメッセージ番号（昇順）。
+            検索語に索引できる語が含まれない場合 None
+        """
+        terms = _query_terms(query)
+        if not terms:
+            return None
+
+        with self._lock:
+            # 各語に該当する転置リストを集める
+            candidates: list[tuple[int, tuple[str, bool], list[array]]] = []
+            for term, prefix in terms:
+                found = [postings for postings, _ in self._expand(term, prefix)]
+                if not found:
+                    return {}
+                candidates.append((sum(map(len, found)), (term, prefix), found))
+            candidates.sort(key=lambda candidate: candidate[0])
+
+            # 語を書き足しただけなら前回の結果を前回になかった語だけで絞り込み、
+            # そうでなければ件数の少ない語から絞り込む
+            last = self._last_search
+            if (
+                last is not None
+                and last[0] == self.version
+                and self._narrows(terms, last[1])
+            ):
+                result: set[int] = last[2]
+                candidates = [c for c in candidates if c[1] not in last[1]]
+            else:
+                result = set()
+                for term_postings in candidates.pop(0)[2]:
+                    result.update(term_postings)
+            for _, _, found in candidates:
+                if not result:
+                    break
+                narrowed: set[int] = set()
+                for term_postings in found:
+                    narrowed |= result.intersection(term_postings)
+                result = narrowed
+            self._last_search = (self.version, terms, result)
+
+            hits: dict[str, list[int]] = {}
+            paths = self._paths
+            for packed in result or ():
+                path = paths[packed >> _MESSAGE_BITS]
+                if path is not None:
+                    hits.setdefault(path, []).append(packed & _MESSAGE_MASK)
+
+        for indices in hits.values():
+            indices.sort()
+        return hits
+
+    def scores(self, query: str) -> dict[str, float]:
+        """セッションを1つの文書とした BM25 で、検索語との関連度を求める。
+
+        語の出現数はその語を含むメッセージ数、文書の長さはセッションの
+        (語, メッセージ) の組の数とする。いずれかの語を含むセッションに点数を付ける。
+
+        Args:
+            query: 検索語
+
+        Returns:
+            ファイルパス -> 点数
+        """
+        terms = _query_terms(query)
+        with self._lock:
+            if not terms or not self._sessions:
+                return {}
+            lengths = {
+                session.number: session.posting_count
+                for session in self._sessions.values()
+            }
+            document_count = len(lengths)
+            average_length = sum(lengths.values()) / document_count
+
+            scores: defaultdict[int, float] = defaultdict(float)
+            for term, prefix in terms:
+                frequencies = self._frequencies(term, prefix)
+                idf = _idf(document_count, len(frequencies))
+                for number, frequency in frequencies.items():
+                    scores[number] += _bm25(
+                        frequency, idf, lengths[number], average_length
+                    )
+
+            paths = self._paths
+            return {paths[number]: score for number, score in scores.items()}
+
+    def _frequencies(self, term: str, prefix: bool) -> dict[int, float]:
+        """検索語の語のセッションごとの出現数を求める（ロック取得済みで呼ぶ）。
+
+        入力中は同じ語で何度も呼ばれるため、版ごとに直近の語の結果を保持する。
+
+        Args:
+            term: 検索語の語
+            prefix: 前方一致かどうか
+
+        Returns:
+            セッション番号 -> 重み付きの出現数
+        """
+        self._sync_caches()
+        key = (term, prefix)
+        cached = self._frequency_cache.get(key)
+        if cached is not None:
+            return cached
+
+        frequencies: defaultdict[int, float] = defaultdict(float)
+        paths = self._paths
+        for term_postings, weight in self._expand(term, prefix):
+            counts = Counter(map(_MESSAGE_BITS.__rrshift__, term_postings))
+            for number, count in counts.items():
+                if paths[number] is not None:
+                    frequencies[number] += count * weight
+        if len(self._frequency_cache) >= _TERM_CACHE_SIZE:
+            del self._frequency_cache[next(iter(self._frequency_cache))]
+        self._frequency_cache[key] = frequencies
+        return frequencies
+
+    def is_fuzzy(self, query: str) -> bool:
+        """検索語に、綴りの近い語で代用する語が含まれるかどうかを判定する。
+
+        Args:
+            query: 検索語
+
+        Returns:
+            該当する語がなく綴りの近い語で代用する語がある場合 True
+        """
+        with self._lock:
+            return any(
+                _fuzzy_limit(term) and not self._has_term(term, prefix)
+                for term, prefix in _query_terms(query)
+            )
+
+    def _has_term(self, term: str, prefix: bool) -> bool:
+        """検索語の語に該当する語があるかどうか（ロック取得済みで呼ぶ）。
+
+        Args:
+            term: 検索語の語
+            prefix: 前方一致かどうか
+
+        Returns:
+            該当する語がある場合 True
+        """
+        if not prefix:
+            return term in self._postings
+        return bool(self._prefix_terms(term)[0])
+
+    def _narrows(
+        self, terms: list[tuple[str, bool]], previous: list[tuple[str, bool]]
+    ) -> bool:
+        """今回の一致が前回の一致に必ず含まれるかを判定する（ロック取得済みで呼ぶ）。
+
+        前回の語は、今回もそのまま残っているか、前方一致の語を書き足して
+        今回のいずれかの語で包含される場合に限る。前方一致でない1文字の語
+        （"a" など）を書き足すと前方一致の語に変わって一致する範囲が広がり、
+        展開数を打ち切った前方一致の語や綴りの近い語で代用する語は書き足した
+        語の展開を含むとは限らないため、いずれも対象外にする。
+
+        Args:
+            terms: 今回の (語, 前方一致かどうか) のリスト
+            previous: 前回の (語, 前方一致かどうか) のリスト
+
+        Returns:
+            前回の結果を絞り込むだけでよい場合 True
+        """
+        for previous_term, previous_prefix in previous:
+            if (previous_term, previous_prefix) in terms:
+                continue
+            if not previous_prefix:
+                return False
+            found, complete = self._prefix_terms(previous_term)
+            if not found or not complete:
+                return False
+            if not any(
+                term.startswith(previous_term) and self._has_term(term, prefix)
+                for term, prefix in terms
+            ):
+                return False
+        return True
+
+    def _prefix_terms(self, term: str) -> tuple[list[str], bool]:
+        """前方一致する語を集める（ロック取得済みで呼ぶ）。
+
+        並べ替えた全語から二分探索で範囲を求める。該当する語が
+        _PREFIX_MAX_TERMS を超える場合は、出現の多い語だけを残す。
+
+        Args:
+            term: 検索語の語
+
+        Returns:
+            (語のリスト, すべての語を含むかどうか)
+        """
+        self._sync_caches()
+        cached = self._prefix_terms_cache.get(term)
+        if cached is not None:
+            return cached
+
+        vocabulary = self._vocabulary
+        if not self._vocabulary_sorted:
+            vocabulary.sort()
+            self._vocabulary_sorted = True
+        start = bisect.bisect_left(vocabulary, term)
+        end = bisect.bisect_left(vocabulary, term + "\U0010ffff", start)
+        terms = vocabulary[start:end]
+        complete = len(terms) <= _PREFIX_MAX_TERMS
+        if not complete:
+            postings = self._postings
+            terms = heapq.nlargest(
+                _PREFIX_MAX_TERMS, terms, key=lambda t: len(postings[t])
+            )
+        if len(self._prefix_terms_cache) >= _TERM_CACHE_SIZE:
+            del self._prefix_terms_cache[next(iter(self._prefix_terms_cache))]
+        self._prefix_terms_cache[term] = (terms, complete)
+        return terms, complete
+
+    def _sync_caches(self) -> None:
+        """版が変わっていれば語ごとのキャッシュを捨てる（ロック取得済みで呼ぶ）。"""
+        if self._cache_version != self.version:
+            self._cache_version = self.version
+            self._prefix_terms_cache.clear()
+            self._frequency_cache.clear()
+
+    def _expand(self, term: str, prefix: bool) -> list[tuple[array, float]]:
+        """検索語の語に該当する転置リストを集める（ロック取得済みで呼ぶ）。
+
+        該当する語がなければ綴りの近い語で代用し、編集距離に応じて重みを下げる。
+
+        Args:
+            term: 検索語の語
+            prefix: 前方一致かどうか
+
+        Returns:
+            (転置リスト, 重み) のリスト
+        """
+        if prefix:
+            found = [(self._postings[t], 1.0) for t in self._prefix_terms(term)[0]]
+        elif term in self._postings:
+            found = [(self._postings[term], 1.0)]
+        else:
+            found = []
+        if found:
+            return found
+        return [
+            (self._postings[candidate], 1 / (1 + distance))
+            for candidate, distance in self._fuzzy_candidates(term, prefix)
+        ]
+
+    def _fuzzy_candidates(self, term: str, prefix: bool) -> list[tuple[str, int]]:
+        """綴りの近い登録済みの語を探す（ロック取得済みで呼ぶ）。
+
+        Args:
+            term: 検索語の語
+            prefix: 前方一致かどうか
+
+        Returns:
+            (語, 編集距離) のリスト
+        """
+        if not _fuzzy_limit(term):
+            return []
+        if self._fuzzy is None:
+            self._fuzzy = _TermTrigrams(self._postings)
+        return [
+            (candidate, distance)
+            for candidate, distance in self._fuzzy.candidates(term, prefix)
+            if candidate in self._postings
+        ]
+
+    def highlight_terms(self, query: str) -> list[tuple[str, bool]]:
+        """本文中で強調表示する語を返す。
+
+        該当する語がない語は、検索で代用した綴りの近い語に置き換える。
+
+        Args:
+            query: 検索語
+
+        Returns:
+            match_offsets() に渡す (語, 前方一致かどうか) のリスト
+        """
+        terms: list[tuple[str, bool]] = []
+        with self._lock:
+            for term, prefix in _query_terms(query):
+                if not _fuzzy_limit(term) or self._has_term(term, prefix):
+                    terms.append((term, prefix))
+                else:
+                    terms.extend(
+                        (candidate, False)
+                        for candidate, _ in self._fuzzy_candidates(term, prefix)
+                    )
+        return terms
+
+    def load(self) -> None:
+        """インデックスファイルを読み込む。
+
+        ファイルがない・壊れている・形式が異なる場合は空のまま始める。
+        """
+        try:
+            with open(self.index_path, "rb") as f:
+                header = json.loads(f.readline())
+                if (
+                    header.get("version") != SEARCH_INDEX_VERSION
+                    or header.get("byteorder") != sys.byteorder
+                ):
+                    return
+                terms_bytes = f.read(header["terms_bytes"])
+                terms = terms_bytes.decode("utf-8").split("\n") if terms_bytes else []
+                lengths = array("I")
+                lengths.fromfile(f, header["term_count"])
+                packed = array("Q")
+                packed.fromfile(f, header["posting_count"])
+
+                sessions: dict[str, _IndexedSession] = {}
+                paths: list[Optional[str]] = [None] * header["next_number"]
+                for path, (number, signature, message_count, count) in header[
+                    "sessions"
+                ].items():
+                    sessions[path] = _IndexedSession(
+                        number, tuple(signature), message_count, count
+                    )
+                    paths[number] = path
+        except (OSError, EOFError, ValueError, KeyError, TypeError, IndexError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Failed to load search index {self.index_path}: {e}")
+            return
+
+        if len(terms) != len(lengths) or sum(lengths) != len(packed):
+            return
+
+        postings: dict[str, array] = {}
+        pos = 0
+        for term, length in zip(terms, lengths):
+            postings[term] = packed[pos : pos + length]
+            pos += length
+
+        with self._lock:
+            self._sessions = sessions
+            self._paths = paths
+            self._postings = postings
+            self._vocabulary = terms
+            self._vocabulary_sorted = False
+            self._fuzzy = None
+            self.version += 1
+            self._total_postings = len(packed)
+            self._dead_postings = len(packed) - sum(
+                session.posting_count for session in sessions.values()
+            )
+            self._dirty = False
+
+    def save(self) -> None:
+        """変更があればインデックスファイルをアトミックに書き出す。"""
+        if not self._dirty:
+            return
+
+        terms = list(self._postings)
+        header = {
+            "version": SEARCH_INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "next_number": len(self._paths),
+            "sessions": {
+                path: [
+                    session.number,
+                    list(session.signature),
+                    session.message_count,
+                    session.posting_count,
+                ]
+                for path, session in self._sessions.items()
+            },
+        }
+        terms_bytes = "\n".join(terms).encode("utf-8")
+        header["terms_bytes"] = len(terms_bytes)
+        header["term_count"] = len(terms)
+        header["posting_count"] = self._total_postings
+
+        import tempfile
+
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                mode="wb",
+                dir=self.index_path.parent,
+                prefix=self.index_path.name,
+                suffix=".tmp",
+                delete=False,
+            ) as f:
+                f.write(json.dumps(header, ensure_ascii=False).encode("utf-8"))
+                f.write(b"\n")
+                f.write(terms_bytes)
+                array("I", [len(self._postings[term]) for term in terms]).tofile(f)
+                for term in terms:
+                    self._postings[term].tofile(f)
+                temp_path = f.name
+            os.replace(temp_path, self.index_path)
+            self._dirty = False
+            self.last_saved = time.monotonic()
+        except OSError as e:
+            logger.warning(f"Failed to save search index {self.index_path}: {e}")
+
+
+def sqlite_fts5_available() -> bool:
+    """sqlite3 モジュールと FTS5 拡張が使えるかどうかを判定する。
+
+    Returns:
+        FTS5 の仮想テーブルを作成できる場合 True
+    """
+    if sqlite3 is None:
+        return False
+    try:
+        with closing(sqlite3.connect(":memory:")) as conn:
+            conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        return True
+    except sqlite3.Error:
+        return False
+
+
+class SqliteSearchIndex:
+    """SQLite の FTS5 に保存するメッセージ本文の全文検索インデックス。
+
+    FullTextIndex と同じ操作を提供し、転置リストをメモリではなく
+    データベースファイルに持つ。メッセージごとに SessionParser が集めた語を
+    空白区切りで1行に格納し、rowid を (セッション番号, メッセージ番号) を詰めた
+    整数にする。語の分割は tokenize() で済ませてあるため、FTS5 側は空白で
+    区切るだけでよい。
+
+    セッション単位の追加・削除はそれぞれ1トランザクションで行うため、途中で
+    終了しても次回起動時に不整合な状態から始まることはない。メモリに持つのは
+    セッションごとの番号とシグネチャだけなので、履歴がメモリより大きくても動作する。
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        """インデックスを作成する（データベースは load() で開く）。
+
+        Args:
+            db_path: データベースファイルのパス
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._sessions: dict[str, _IndexedSession] = {}
+        self._paths: dict[int, str] = {}
+        # 綴り間違いの候補探し用（初めて必要になったときに語彙から作る）
+        self._fuzzy: Optional[_TermTrigrams] = None
+        self.last_saved = 0.0
+        # 内容が変わるたびに増える版（検索結果のキャッシュの判定用）
+        self.version = 0
+
+    def __len__(self) -> int:
+        """登録済みのセッション数を返す。"""
+        return len(self._sessions)
+
+    def is_current(self, path: str, signature: tuple[int, int, int]) -> bool:
+        """セッションが現在のファイルの内容で登録済みかどうかを判定する。
+
+        Args:
+            path: セッションファイルのパス
+            signature: 現在のファイルシグネチャ
+
+        Returns:
+            登録済みで内容が変わっていない場合 True
+        """
+        session = self._sessions.get(path)
+        return session is not None and session.signature == signature
+
+    def add(
+        self,
+        path: str,
+        signature: tuple[int, int, int],
+        message_count: int,
+        postings_start: int,
+        postings: dict[str, Sequence[int]],
+    ) -> bool:
+        """パースしたメッセージの語を登録する。
+
+        postings_start が 0 の場合はセッション全体を登録し直す。それ以外は
+        登録済みのメッセージの続きとして追加する。
+
+        Args:
+            path: セッションファイルのパス
+            signature: ファイルシグネチャ
+            message_count: パース後のメッセージ数
+            postings_start: postings に含まれる最初のメッセージ番号
+            postings: 語 -> その語を含むメッセージ番号
+
+        Returns:
+            登録できた場合 True。登録済みの内容と続きにならない場合や
+            データベースに書き込めなかった場合は False
+        """
+        session = self._sessions.get(path)
+        if self._conn is None or (
+            postings_start
+            and (session is None or session.message_count != postings_start)
+        ):
+            return False
+
+        # 語 -> メッセージ番号をメッセージ -> 語に組み替える
+        documents: defaultdict[int, list[str]] = defaultdict(list)
+        for term, indices in postings.items():
+            for index in indices:
+                documents[index].append(term)
+
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO sessions"
+                        " (path, mtime_ns, size, inode, message_count)"
+                        " VALUES (?, ?, ?, ?, ?)"
+                        " ON CONFLICT (path) DO UPDATE SET"
+                        " mtime_ns = excluded.mtime_ns, size = excluded.size,"
+                        " inode = excluded.inode,"
+                        " message_count = excluded.message_count",
+                        (path, *signature, message_count),
+                    )
+                    number = self._conn.execute(
+                        "SELECT number FROM sessions WHERE path = ?", (path,)
+                    ).fetchone()[0]
+                    if not postings_start:
+                        self._delete_messages(number)
+                    base = number << _MESSAGE_BITS
+                    self._conn.executemany(
+                        "INSERT INTO messages (rowid, terms) VALUES (?, ?)",
+                        (
+                            (base | index, " ".join(terms))
+                            for index, terms in documents.items()
+                        ),
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to update search index {self.db_path}: {e}")
+                return False
+
+            self._sessions[path] = _IndexedSession(
+                number, signature, message_count, 0
+            )
+            self._paths[number] = path
+            if self._fuzzy is not None:
+                for term in postings:
+                    self._fuzzy.add(term)
+            self.version += 1
+        return True
+
+    def remove(self, paths: Iterable[str]) -> None:
+        """セッションを削除する。
+
+        Args:
+            paths: 削除するセッションファイルのパス
+        """
+        if self._conn is None:
+            return
+        with self._lock:
+            for path in paths:
+                session = self._sessions.get(path)
+                if session is None:
+                    continue
+                try:
+                    with self._conn:
+                        self._delete_messages(session.number)
+                        self._conn.execute(
+                            "DELETE FROM sessions WHERE number = ?", (session.number,)
+                        )
+                except sqlite3.Error as e:
+                    logger.warning(
+                        f"Failed to update search index {self.db_path}: {e}"
+                    )
+                    continue
+                del self._sessions[path]
+                del self._paths[session.number]
+                self.version += 1
+
+    def retain(self, live_paths: set[str]) -> None:
+        """存在しないセッションを削除する。
+
+        Args:
+            live_paths: 現存するセッションファイルのパス
+        """
+        self.remove([path for path in self._sessions if path not in live_paths])
+
+    def _delete_messages(self, number: int) -> None:
+        """セッションのメッセージを削除する（ロック取得済み・トランザクション内で呼ぶ）。
+
+        Args:
+            number: セッション番号
+        """
+        base = number << _MESSAGE_BITS
+        self._conn.execute(
+            "DELETE FROM messages WHERE rowid BETWEEN ? AND ?",
+            (base, base | _MESSAGE_MASK),
+        )
+
+    def compact(self) -> None:
+        """何もしない（削除した行の整理は FTS5 が自動で行う）。"""
+
+    def search(self, query: str) -> Optional[dict[str, list[int]]]:
+        """すべての語を含むメッセージを検索する。
+
+        Args:
+            query: 検索語
+
+        Returns:
+            ファイルパス -> 一致したメッセージ番号（昇順）。
+            検索語に索引できる語が含まれない場合 None
+        """
+        terms = _query_terms(query)
+        if not terms:
+            return None
+        if self._conn is None:
+            return {}
+
+        hits: dict[str, list[int]] = {}
+        with self._lock:
+            try:
+                groups = [self._expand(term, prefix) for term, prefix in terms]
+                if not all(groups):
+                    return {}
+                rows = self._conn.execute(
+                    "SELECT rowid FROM messages WHERE messages MATCH ?"
+                    " ORDER BY rowid",
+                    (" AND ".join(groups),),
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to search {self.db_path}: {e}")
+                return {}
+            paths = self._paths
+            for (packed,) in rows:
+                path = paths.get(packed >> _MESSAGE_BITS)
+                if path is not None:
+                    hits.setdefault(path, []).append(packed & _MESSAGE_MASK)
+        return hits
+
+    def scores(self, query: str) -> dict[str, float]:
+        """検索語との関連度を、メッセージごとの FTS5 の BM25 の合計で求める。
+
+        Args:
+            query: 検索語
+
+        Returns:
+            ファイルパス -> 点数（いずれかの語を含むセッションだけ）
+        """
+        terms = _query_terms(query)
+        if not terms or self._conn is None:
+            return {}
+
+        scores: defaultdict[str, float] = defaultdict(float)
+        with self._lock:
+            try:
+                groups = [
+                    group
+                    for group in (self._expand(term, prefix) for term, prefix in terms)
+                    if group
+                ]
+                if not groups:
+                    return {}
+                # bm25() は一致の度合いが高いほど小さい負の値を返す
+                rows = self._conn.execute(
+                    "SELECT rowid, bm25(messages) FROM messages WHERE messages MATCH ?",
+                    (" OR ".join(groups),),
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to search {self.db_path}: {e}")
+                return {}
+            paths = self._paths
+            for packed, rank in rows:
+                path = paths.get(packed >> _MESSAGE_BITS)
+                if path is not None:
+                    scores[path] -= rank
+        return dict(scores)
+
+    def is_fuzzy(self, query: str) -> bool:
+        """検索語に、綴りの近い語で代用する語が含まれるかどうかを判定する。
+
+        Args:
+            query: 検索語
+
+        Returns:
+            該当する語がなく綴りの近い語で代用する語がある場合 True
+        """
+        if self._conn is None:
+            return False
+        with self._lock:
+            try:
+                return any(
+                    _fuzzy_limit(term) and not self._has_term(term, prefix)
+                    for term, prefix in _query_terms(query)
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to search {self.db_path}: {e}")
+                return True
+
+    def _has_term(self, term: str, prefix: bool) -> bool:
+        """検索語の語に該当する語があるかどうか（ロック取得済みで呼ぶ）。
+
+        Args:
+            term: 検索語の語
+            prefix: 前方一致かどうか
+
+        Returns:
+            該当する語がある場合 True
+
+        Raises:
+            sqlite3.Error: 語彙を読めない場合
+        """
+        if prefix:
+            upper = term[:-1] + chr(ord(term[-1]) + 1)
+            row = self._conn.execute(
+                "SELECT 1 FROM temp.vocabulary WHERE term >= ? AND term < ? LIMIT 1",
+                (term, upper),
+            ).fetchone()
+        else:
+            row = self._conn.execute(
+                "SELECT 1 FROM temp.vocabulary WHERE term = ?", (term,)
+            ).fetchone()
+        return row is not None
+
+    def _expand(self, term: str, prefix: bool) -> str:
+        """検索語の語を FTS5 の検索式にする（ロック取得済みで呼ぶ）。
+
+        該当する語がなければ綴りの近い語の OR にする。
+
+        Args:
+            term: 検索語の語
+            prefix: 前方一致かどうか
+
+        Returns:
+            検索式（該当する語がない場合は空文字列）
+
+        Raises:
+            sqlite3.Error: 語彙を読めない場合
+        """
+        # 語は英数字・漢字・かな・ハングルだけなので引用符で囲めばそのまま使える
+        if self._has_term(term, prefix):
+            return f'"{term}"*' if prefix else f'"{term}"'
+        candidates = self._fuzzy_candidates(term, prefix)
+        if not candidates:
+            return ""
+        return "(" + " OR ".join(f'"{candidate}"' for candidate, _ in candidates) + ")"
+
+    def _fuzzy_candidates(self, term: str, prefix: bool) -> list[tuple[str, int]]:
+        """綴りの近い登録済みの語を探す（ロック取得済みで呼ぶ）。
+
+        Args:
+            term: 検索語の語
+            prefix: 前方一致かどうか
+
+        Returns:
+            (語, 編集距離) のリスト
+
+        Raises:
+            sqlite3.Error: 語彙を読めない場合
+        """
+        if not _fuzzy_limit(term):
+            return []
+        if self._fuzzy is None:
+            self._fuzzy = _TermTrigrams(
+                term for (term,) in self._conn.execute(
+                    "SELECT term FROM temp.vocabulary"
+                )
+            )
+        return self._fuzzy.candidates(term, prefix)
+
+    def highlight_terms(self, query: str) -> list[tuple[str, bool]]:
+        """本文中で強調表示する語を返す。
+
+        該当する語がない語は、検索で代用した綴りの近い語に置き換える。
+
+        Args:
+            query: 検索語
+
+        Returns:
+            match_offsets() に渡す (語, 前方一致かどうか) のリスト
+        """
+        terms = _query_terms(query)
+        if self._conn is None:
+            return terms
+
+        highlighted: list[tuple[str, bool]] = []
+        with self._lock:
+            try:
+                for term, prefix in terms:
+                    if not _fuzzy_limit(term) or self._has_term(term, prefix):
+                        highlighted.append((term, prefix))
+                    else:
+                        highlighted.extend(
+                            (candidate, False)
+                            for candidate, _ in self._fuzzy_candidates(term, prefix)
+                        )
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to search {self.db_path}: {e}")
+                return terms
+        return highlighted
+
+    def load(self) -> None:
+        """データベースを開き、登録済みのセッションを読み込む。
+
+        開けない・形式が異なる場合はファイルを作り直す。
+        """
+        for attempt in range(2):
+            try:
+                conn = self._connect()
+                sessions: dict[str, _IndexedSession] = {}
+                for number, path, mtime_ns, size, inode, message_count in (
+                    conn.execute(
+                        "SELECT number, path, mtime_ns, size, inode, message_count"
+                        " FROM sessions"
+                    )
+                ):
+                    sessions[path] = _IndexedSession(
+                        number, (mtime_ns, size, inode), message_count, 0
+                    )
+                break
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to open search index {self.db_path}: {e}")
+                if attempt:
+                    return
+                for suffix in ("", "-wal", "-shm"):
+                    try:
+                        os.remove(f"{self.db_path}{suffix}")
+                    except OSError:
+                        pass
+
+        with self._lock:
+            self._conn = conn
+            self._fuzzy = None
+            self.version += 1
+            self._sessions = sessions
+            self._paths = {
+                session.number: path for path, session in sessions.items()
+            }
+
+    def _connect(self) -> sqlite3.Connection:
+        """データベースに接続し、必要ならテーブルを作成する。
+
+        Returns:
+            読み込みスレッドとUIスレッドで共有する接続
+
+        Raises:
+            sqlite3.Error: 開けない・壊れている場合
+        """
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SEARCH_STORE_VERSION:
+                with conn:
+                    conn.execute("DROP TABLE IF EXISTS sessions")
+                    conn.execute("DROP TABLE IF EXISTS messages")
+                    conn.execute(
+                        "CREATE TABLE sessions ("
+                        " number INTEGER PRIMARY KEY,"
+                        " path TEXT NOT NULL UNIQUE,"
+                        " mtime_ns INTEGER NOT NULL,"
+                        " size INTEGER NOT NULL,"
+                        " inode INTEGER NOT NULL,"
+                        " message_count INTEGER NOT NULL)"
+                    )
+                    # 語は tokenize() で分割・正規化済みなので空白で区切るだけにする
+                    conn.execute(
+                        "CREATE VIRTUAL TABLE messages USING fts5("
+                        " terms, tokenize = 'unicode61 remove_diacritics 0')"
+                    )
+                    conn.execute(f"PRAGMA user_version = {SEARCH_STORE_VERSION}")
+            # 前方一致・綴り間違いの候補探しで語彙を引く
+            conn.execute(
+                "CREATE VIRTUAL TABLE temp.vocabulary"
+                " USING fts5vocab(main, messages, row)"
+            )
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def save(self) -> None:
+        """保存時刻を記録する（変更は add()・remove() の時点でコミット済み）。"""
+        self.last_saved = time.monotonic()
+
+    def close(self) -> None:
+        """データベースを閉じる。"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+SearchIndex = Union[FullTextIndex, SqliteSearchIndex]
+
+
+def create_search_index(store: str) -> SearchIndex:
+    """保存先に応じた全文検索インデックスを作成する。
+
+    "sqlite" を指定しても FTS5 が使えない環境ではメモリ上のインデックスにする。
+
+    Args:
+        store: "memory"（メモリ上の転置インデックス）または "sqlite"
+
+    Returns:
+        全文検索インデックス
+    """
+    cache_dir = get_cache_dir()
+    if store == "sqlite":
+        if sqlite_fts5_available():
+            return SqliteSearchIndex(cache_dir / SEARCH_STORE_FILENAME)
+        logger.warning("SQLite FTS5 is not available; using the in-memory index")
+    return FullTextIndex(cache_dir / SEARCH_INDEX_FILENAME)
+
+
+# ============================================================================
+# プロジェクト走査
+# ============================================================================
+
+class ManifestEntry(NamedTuple):
+    """走査で見つかったセッションファイル。"""
+
+    path: str
+    project_dir: str
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @property
+    def signature(self) -> tuple[int, int, int]:
+        """file_signature() と同じ形式のシグネチャを返す。"""
+        return (self.mtime_ns, self.size, self.inode)
+
+
+def decode_project_name(dir_name: str) -> str:
+    """プロジェクトディレクトリ名から元のパスを推定する（フォールバック用）。
+
+    Args:
+        dir_name: プロジェクトディレクトリ名
+
+    Returns:
+        推定したプロジェクトパス
+    """
+    return dir_name.replace("--", ":/", 1).replace("-", "/")
+
+
+def _is_within(real_path: str, real_base: str) -> bool:
+    """解決済みのパスが解決済みの基準ディレクトリ内にあるかを判定する。
+
+    Args:
+        real_path: 検証するパス（解決済み）
+        real_base: 基準となるディレクトリ（解決済み）
+
+    Returns:
+        基準ディレクトリ内にある場合 True
+    """
+    # is_safe_path() と同じく文字列の前方一致で比較する
+    return real_path.startswith(real_base)
+
+
+def _manifest_entry(
+    path: str, project_dir: str, st: os.stat_result, inode: int
+) -> ManifestEntry:
+    """stat の結果からマニフェストのエントリを作る。
+
+    Args:
+        path: セッションファイルのパス
+        project_dir: プロジェクトディレクトリのパス
+        st: os.stat() の結果
+        inode: inode 番号
+
+    Returns:
+        マニフェストのエントリ
+    """
+    return ManifestEntry(path, project_dir, st.st_size, st.st_mtime_ns, inode)
+
+
+def scan_projects(
+    projects_dir: Path, cancel_event: Optional[threading.Event] = None
+) -> list[ManifestEntry]:
+    """全プロジェクトのセッションファイルを1回の走査で列挙する。
+
+    os.scandir() の DirEntry が持つ種別と stat の結果を使い、ファイルごとの
+    追加のシステムコールを避ける。パスの検証は基準ディレクトリを1回だけ解決し、
+    シンボリックリンク以外は解決済みの親の直下にあることから安全と判断する。
+    シンボリックリンクだけはリンク先を解決して前方一致で確認する。
+
+    Args:
+        projects_dir: プロジェクトディレクトリ
+        cancel_event: 設定されると走査を打ち切るイベント
+
+    Returns:
+        走査順のセッションファイルのリスト（打ち切った場合は途中まで）
+    """
+    manifest: list[ManifestEntry] = []
+    try:
+        real_root = os.path.realpath(projects_dir)
+        project_entries = list(os.scandir(projects_dir))
+    except (OSError, ValueError):
+        return manifest
+
+    for project_entry in project_entries:
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        try:
+            if not project_entry.is_dir():
+                continue
+
+            # セキュリティチェック（リンクでなければ解決済みの親の直下にある）
+            if project_entry.is_symlink():
+                real_project = os.path.realpath(project_entry.path)
+                if not _is_within(real_project, real_root):
+                    continue
+            else:
+                real_project = os.path.join(real_root, project_entry.name)
+
+            file_entries = list(os.scandir(project_entry.path))
+        except (OSError, ValueError):
+            continue
+
+        for entry in file_entries:
+            if not entry.name.endswith(".jsonl"):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                if entry.is_symlink() and not _is_within(
+                    os.path.realpath(entry.path), real_project
+                ):
+                    continue
+                st = entry.stat()
+                # Windows の DirEntry.stat() は inode を含まないため個別に取得する
+                inode = st.st_ino or entry.inode()
+            except (OSError, ValueError):
+                continue
+            manifest.append(_manifest_entry(entry.path, project_entry.path, st, inode))
+
+    return manifest
+
+
+def scan_session_file(projects_dir: Path, path: str) -> Optional[ManifestEntry]:
+    """プロジェクト直下の1つのセッションファイルを確認する。
+
+    Args:
+        projects_dir: プロジェクトディレクトリ
+        path: セッションファイルのパス
+
+    Returns:
+        マニフェストのエントリ。読み込み対象でない場合 None
+    """
+    session_file = Path(path)
+    project_dir = session_file.parent
+    if project_dir.parent != projects_dir or session_file.suffix != ".jsonl":
+        return None
+
+    # セキュリティチェック
+    if not (
+        is_safe_path(projects_dir, project_dir)
+        and is_safe_path(project_dir, session_file)
+    ):
+        return None
+
+    try:
+        st = session_file.stat()
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return _manifest_entry(path, str(project_dir), st, st.st_ino)
+
+
+# ============================================================================
+# バックグラウンド読み込み
+# ============================================================================
+
+# 読み込みスレッドからUIへ結果を送る間隔（秒）と最大件数
+_LOAD_BATCH_INTERVAL = 0.1
+_LOAD_BATCH_SIZE = 200
+
+# 変更されたファイルだけを読み込んだ後に全文検索インデックスを保存する最短間隔（秒）
+_SEARCH_INDEX_SAVE_INTERVAL = 300.0
+
+
+class LoadBatch(NamedTuple):
+    """読み込みスレッドからUIスレッドへ送る途中結果。
+
+    sessions はファイルパスをキーとし、メッセージのないファイルや削除された
+    ファイルは None になる。done が True のバッチが最後で、全体の読み込みでは
+    live_paths に走査順の全ファイルパスが入る。指定ファイルだけの更新や
+    読み込みに失敗した場合の live_paths は None になる。
+    """
+
+    generation: int
+    sessions: dict[str, Optional[SessionRecord]]
+    done_bytes: int
+    total_bytes: int
+    done: bool = False
+    live_paths: Optional[tuple[str, ...]] = None
+
+
+class SessionLoader:
+    """セッションをバックグラウンドスレッドで読み込む。
+
+    結果は LoadBatch としてキューに積まれ、UIスレッドが poll() で受け取る。
+    新しい読み込みを開始すると実行中の読み込みはキャンセルされ、
+    古い世代のバッチは poll() で破棄される。
+    """
+
+    def __init__(
+        self,
+        projects_dir: Path,
+        session_index: SessionIndex,
+        search_index: SearchIndex,
+        workers: Optional[int] = None,
+        index_terms: bool = True,
+    ) -> None:
+        """ローダーを初期化する。
+
+        Args:
+            projects_dir: Claude Codeのプロジェクトディレクトリ
+            session_index: パース結果の永続インデックス
+            search_index: 読み込んだセッションを登録する全文検索インデックス
+            workers: パースに使うワーカー数（None で自動）
+            index_terms: 全文検索インデックスを更新するかどうか（False の場合は
+                パース時に語を集めず、登録は次に更新する読み込みに持ち越す）
+        """
+        self.projects_dir = projects_dir
+        self.session_index = session_index
+        self.search_index = search_index
+        self.workers = workers
+        self.index_terms = index_terms
+        self.generation = 0
+        self._queue: queue.Queue[LoadBatch] = queue.Queue()
+        # 完了を通知した後も全文検索インデックスの補完を続けるため、
+        # 最新のスレッドのイベントは完了後も保持する
+        self._cancel_event: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loading = False
+        # キャンセルされたスレッドと新しいスレッドがインデックスを同時に触らないようにする
+        self._index_lock = threading.Lock()
+        # 以下は _index_lock を取得したスレッドだけが触る
+        self._session_index_loaded = False
+        self._search_index_loaded = False
+        # 全文検索インデックスへの登録が済んでいないセッションファイルのパス
+        self._unindexed: set[str] = set()
+        # パースで集めた語（読み込み完了の通知後に全文検索インデックスへ登録する）
+        self._parsed_terms: list[tuple[ParseJob, ParseResult]] = []
+
+    @property
+    def is_loading(self) -> bool:
+        """読み込み中かどうか。"""
+        return self._loading
+
+    def start(self, paths: Optional[Iterable[str]] = None) -> int:
+        """読み込みを開始する。実行中の読み込みはキャンセルする。
+
+        Args:
+            paths: 読み込み直すセッションファイルのパス（None で全体を走査）
+
+        Returns:
+            今回の読み込みの世代番号
+        """
+        self.cancel()
+        self.generation += 1
+        cancel_event = threading.Event()
+        self._cancel_event = cancel_event
+        self._loading = True
+
+        thread = threading.Thread(
+            target=self._run,
+            args=(self.generation, cancel_event, paths),
+            name=f"SessionLoader-{self.generation}",
+            daemon=True,
+        )
+        thread.start()
+        self._thread = thread
+        return self.generation
+
+    def cancel(self) -> None:
+        """実行中の読み込みをキャンセルする。"""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+        self._loading = False
+
+    def join(self) -> None:
+        """最新の読み込みスレッドが終わるまで待つ。
+
+        読み込み完了の通知後に行う全文検索インデックスの更新も待つ。
+        """
+        if self._thread is not None:
+            self._thread.join()
+
+    def poll(self, timeout: float = 0.0) -> list[LoadBatch]:
+        """届いている現在の世代のバッチを取り出す。
+
+        Args:
+            timeout: バッチが届いていない場合に待つ最大の秒数
+
+        Returns:
+            バッチのリスト（古い世代のものは除外）
+        """
+        batches: list[LoadBatch] = []
+        while True:
+            try:
+                if timeout > 0 and not batches:
+                    batch = self._queue.get(timeout=timeout)
+                else:
+                    batch = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if batch.generation != self.generation:
+                continue
+            batches.append(batch)
+            if batch.done:
+                self._loading = False
+        return batches
+
+    def _run(
+        self,
+        generation: int,
+        cancel_event: threading.Event,
+        paths: Optional[Iterable[str]],
+    ) -> None:
+        """読み込みスレッドの本体。
+
+        Args:
+            generation: 世代番号
+            cancel_event: キャンセル通知用のイベント
+            paths: 読み込み直すセッションファイルのパス（None で全体を走査）
+        """
+        with self._index_lock:
+            if cancel_event.is_set():
+                return
+            # キャンセルされた読み込みで登録できなかった語は本文から登録し直す
+            self._unindexed.update(job.file_path for job, _ in self._parsed_terms)
+            self._parsed_terms = []
+            try:
+                self._load_session_index()
+                if paths is None:
+                    self._load(generation, cancel_event)
+                else:
+                    self._load_paths(generation, cancel_event, paths)
+            except Exception as e:
+                logger.warning(f"Failed to load sessions: {e}")
+                self._queue.put(LoadBatch(generation, {}, 0, 0, done=True))
+
+    def _load(self, generation: int, cancel_event: threading.Event) -> None:
+        """全プロジェクトを走査し、結果を順次キューに送る。
+
+        Args:
+            generation: 世代番号
+            cancel_event: キャンセル通知用のイベント
+        """
+        manifest = scan_projects(self.projects_dir, cancel_event)
+        if cancel_event.is_set():
+            return
+
+        live_paths = [entry.path for entry in manifest]
+        cached: dict[str, Optional[SessionRecord]] = {}
+        jobs: list[ParseJob] = []
+        for entry in manifest:
+            self._plan(entry, cached, jobs)
+
+        # インデックスにあるセッションは先にまとめて表示する
+        total_bytes = sum(job.signature[1] for job in jobs)
+        self._queue.put(LoadBatch(generation, cached, 0, total_bytes))
+
+        pending = self._parse(generation, cancel_event, jobs, total_bytes)
+        if cancel_event.is_set():
+            # パース済みの分は次回に再利用できるよう保存だけしておく
+            self.session_index.save()
+            return
+
+        # 削除されたファイルのエントリを除去して保存
+        live_set = set(live_paths)
+        self.session_index.prune(live_set)
+        self.session_index.save()
+
+        self._queue.put(
+            LoadBatch(
+                generation,
+                pending,
+                total_bytes,
+                total_bytes,
+                done=True,
+                live_paths=tuple(live_paths),
+            )
+        )
+
+        if not self.index_terms:
+            return
+        self._load_search_index()
+        self.search_index.retain(live_set)
+        self._unindexed &= live_set
+        self._update_search_index(cancel_event, save=True)
+
+    def _load_paths(
+        self,
+        generation: int,
+        cancel_event: threading.Event,
+        paths: Iterable[str],
+    ) -> None:
+        """指定したセッションファイルだけを読み込み直し、結果をキューに送る。
+
+        存在しなくなったファイルは None として送り、インデックスから削除する。
+
+        Args:
+            generation: 世代番号
+            cancel_event: キャンセル通知用のイベント
+            paths: 読み込み直すセッションファイルのパス
+        """
+        sessions: dict[str, Optional[SessionRecord]] = {}
+        jobs: list[ParseJob] = []
+        removed: list[str] = []
+
+        for path in sorted(set(paths)):
+            entry = scan_session_file(self.projects_dir, path)
+            if entry is None:
+                sessions[path] = None
+                removed.append(path)
+            else:
+                self._plan(entry, sessions, jobs)
+
+        total_bytes = sum(job.signature[1] for job in jobs)
+        sessions.update(self._parse(generation, cancel_event, jobs, total_bytes))
+        if cancel_event.is_set():
+            self.session_index.save()
+            return
+
+        self.session_index.remove(removed)
+        self.session_index.save()
+
+        self._queue.put(
+            LoadBatch(generation, sessions, total_bytes, total_bytes, done=True)
+        )
+
+        if not self.index_terms:
+            return
+        self._load_search_index()
+        self.search_index.remove(removed)
+        self._unindexed.difference_update(removed)
+        self._update_search_index(
+            cancel_event,
+            save=time.monotonic() - self.search_index.last_saved
+            >= _SEARCH_INDEX_SAVE_INTERVAL,
+        )
+
+    def _plan(
+        self,
+        entry: ManifestEntry,
+        cached: dict[str, Optional[SessionRecord]],
+        jobs: list[ParseJob],
+    ) -> None:
+        """セッションファイルをインデックスの結果かパース要求に振り分ける。
+
+        Args:
+            entry: 走査で見つかったセッションファイル
+            cached: インデックスの結果を追加する辞書
+            jobs: パース要求を追加するリスト
+        """
+        session_file = Path(entry.path)
+        signature = entry.signature
+
+        # 変更のないファイルはインデックスの結果を使う
+        hit, session_info = self.session_index.lookup(session_file, signature)
+        if hit:
+            cached[entry.path] = session_info
+            if not (
+                self._search_index_loaded
+                and self.search_index.is_current(entry.path, signature)
+            ):
+                self._unindexed.add(entry.path)
+            return
+
+        # プロジェクト名をデコード（フォールバック用）
+        project_name_fallback = decode_project_name(
+            os.path.basename(entry.project_dir)
+        )
+        jobs.append(
+            ParseJob(
+                entry.path,
+                project_name_fallback,
+                signature,
+                self.session_index.resume_state(session_file, project_name_fallback),
+                self.index_terms,
+            )
+        )
+
+    def _load_session_index(self) -> None:
+        """初回だけセッションインデックスをファイルから読み込む。
+
+        セッション数に比例して時間がかかるため、UIスレッドで読み込んで起動を
+        遅らせないよう、読み込みスレッドの最初に呼ぶ。
+        """
+        if not self._session_index_loaded:
+            self.session_index.load()
+            self._session_index_loaded = True
+
+    def _load_search_index(self) -> None:
+        """初回だけ全文検索インデックスをファイルから読み込む。
+
+        セッションリストの表示を遅らせないよう、読み込み完了の通知後に呼ぶ。
+        """
+        if not self._search_index_loaded:
+            self.search_index.load()
+            self._search_index_loaded = True
+
+    def _update_search_index(self, cancel_event: threading.Event, save: bool) -> None:
+        """全文検索インデックスに未登録のセッションを登録し、整理・保存する。
+
+        パースしたファイルは集めた語を登録する。パースせずにセッションインデックスの
+        結果を使ったファイルのうち、全文検索インデックスにない・内容が古いものは
+        本文を読み直して登録する。セッションリストの表示を遅らせないよう読み込み完了の
+        通知後に行い、キャンセルされた分は次回に持ち越す。
+
+        Args:
+            cancel_event: キャンセル通知用のイベント
+            save: インデックスファイルに保存するかどうか
+        """
+        parsed_terms = self._parsed_terms
+        self._parsed_terms = []
+        for i, (job, result) in enumerate(parsed_terms):
+            if cancel_event.is_set():
+                # 登録できなかった分は次回に本文から登録する
+                self._unindexed.update(job.file_path for job, _ in parsed_terms[i:])
+                return
+            if not self.search_index.add(
+                job.file_path,
+                job.signature,
+                result.state["message_count"],
+                result.postings_start,
+                result.postings,
+            ):
+                self._unindexed.add(job.file_path)
+        del parsed_terms
+
+        for path in sorted(self._unindexed):
+            if cancel_event.is_set():
+                return
+            self._unindexed.discard(path)
+
+            file_path = Path(path)
+            entry = self.session_index.get(file_path)
+            if entry is None or self.search_index.is_current(
+                path, tuple(entry["signature"])
+            ):
+                continue
+            try:
+                with open_session_reader(file_path, entry) as reader:
+                    postings: dict[str, list[int]] = {}
+                    for index in range(len(reader)):
+                        msg = reader.message(index)
+                        if msg is None:
+                            continue
+                        for term in tokenize(msg.content):
+                            postings.setdefault(term, []).append(index)
+                    message_count = len(reader)
+            except Exception as e:
+                logger.warning(f"Error reading {file_path}: {e}")
+                continue
+            self.search_index.add(
+                path, tuple(entry["signature"]), message_count, 0, postings
+            )
+
+        self.search_index.compact()
+        if save:
+            self.search_index.save()
+
+    def _parse(
+        self,
+        generation: int,
+        cancel_event: threading.Event,
+        jobs: list[ParseJob],
+        total_bytes: int,
+    ) -> dict[str, Optional[SessionRecord]]:
+        """変更されたファイルをパースし、途中結果を順次キューに送る。
+
+        追記されたファイルは追記分のみを、可能なら並列にパースする。
+
+        Args:
+            generation: 世代番号
+            cancel_event: キャンセル通知用のイベント
+            jobs: パース要求
+            total_bytes: パース対象の合計バイト数
+
+        Returns:
+            まだキューに送っていない結果
+        """
+        pending: dict[str, Optional[SessionRecord]] = {}
+        done_bytes = 0
+        last_sent = time.monotonic()
+        results = iter_parse_jobs(jobs, self.workers)
+        try:
+            for job, result in results:
+                if cancel_event.is_set():
+                    break
+                done_bytes += job.signature[1]
+                if result is None:
+                    continue
+
+                file_path = Path(job.file_path)
+                state = result.state
+                self.session_index.update(file_path, job.signature, state)
+                if self.index_terms:
+                    self._parsed_terms.append((job, result))
+                pending[job.file_path] = SessionParser.from_state(
+                    file_path, state
+                ).to_session()
+
+                now = time.monotonic()
+                if (
+                    len(pending) >= _LOAD_BATCH_SIZE
+                    or now - last_sent >= _LOAD_BATCH_INTERVAL
+                ):
+                    self._queue.put(
+                        LoadBatch(generation, pending, done_bytes, total_bytes)
+                    )
+                    pending = {}
+                    last_sent = now
+        finally:
+            results.close()
+        return pending
+
+
+# ============================================================================
+# 変更検出
+# ============================================================================
+
+# ポーリング方式でプロジェクトディレクトリと最近のファイルを確認する間隔（秒）
+_WATCH_POLL_INTERVAL = 2.0
+
+# ポーリング方式で全ファイルを確認する間隔（秒）
+_WATCH_FULL_SCAN_INTERVAL = 60.0
+
+# 追記されやすいファイルとして毎回確認する、最終更新からの経過時間（秒）と件数の上限
+_WATCH_HOT_SECONDS = 3600
+_WATCH_HOT_LIMIT = 100
+
+# 通知を受けてから書き込みが落ち着くのを待つ時間（秒）
+_WATCH_SETTLE_DELAY = 0.2
+
+# inotify の取りこぼしに備えて全ファイルを確認する間隔（秒）
+_INOTIFY_RESCAN_INTERVAL = 600.0
+
+# inotify のイベントマスク（<sys/inotify.h>）
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+
+_IN_PROJECTS_MASK = (
+    _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_ONLYDIR
+)
+_IN_PROJECT_MASK = _IN_PROJECTS_MASK | _IN_MODIFY | _IN_CLOSE_WRITE
+
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class FileEvent(NamedTuple):
+    """セッションファイルの変更通知。
+
+    kind は "created"、"modified"、"deleted" のいずれか。
+    """
+
+    kind: str
+    path: str
+
+
+class _Inotify:
+    """Linux の inotify を ctypes で使う最小限のラッパー。"""
+
+    def __init__(self) -> None:
+        """inotify インスタンスを作成する。
+
+        Raises:
+            OSError: inotify を使えない場合
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        import ctypes
+
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            self._init1 = libc.inotify_init1
+            self._add_watch = libc.inotify_add_watch
+            self._rm_watch = libc.inotify_rm_watch
+        except (OSError, AttributeError) as e:
+            raise OSError(f"inotify is not available: {e}") from e
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self._get_errno = ctypes.get_errno
+
+        self.fd = self._init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = self._get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    def add_watch(self, path: str, mask: int) -> int:
+        """ディレクトリの監視を追加する。
+
+        Args:
+            path: 監視するディレクトリのパス
+            mask: 監視するイベントのマスク
+
+        Returns:
+            監視ディスクリプタ
+
+        Raises:
+            OSError: 監視を追加できない場合
+        """
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = self._get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        """監視を解除する。
+
+        Args:
+            wd: 監視ディスクリプタ
+        """
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self) -> list[tuple[int, int, str]]:
+        """届いているイベントをすべて読み出す。
+
+        Returns:
+            (監視ディスクリプタ, マスク, ファイル名) のリスト
+        """
+        events = []
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+            pos = 0
+            while pos + _INOTIFY_EVENT.size <= len(buf):
+                wd, mask, _cookie, length = _INOTIFY_EVENT.unpack_from(buf, pos)
+                pos += _INOTIFY_EVENT.size
+                name = os.fsdecode(buf[pos : pos + length].rstrip(b"\0"))
+                pos += length
+                events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        """inotify インスタンスを閉じる。"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class SessionWatcher:
+    """セッションファイルの作成・更新・削除を検出する監視スレッド。
+
+    Linux では inotify で変更を待ち受け、それ以外の環境や inotify を使えない
+    場合は os.scandir() によるポーリングで検出する。ポーリングではプロジェクト
+    ディレクトリの更新日時と最近更新されたファイルだけを頻繁に確認し、全ファイルの
+    確認は間隔を空けて行う。検出した変更は poll() でまとめて受け取る。
+    """
+
+    def __init__(self, projects_dir: Path, use_inotify: bool = True) -> None:
+        """監視を初期化する。
+
+        Args:
+            projects_dir: プロジェクトディレクトリ
+            use_inotify: 利用できる場合に inotify を使うかどうか
+        """
+        self.projects_dir = projects_dir
+        self.use_inotify = use_inotify
+        self._root = str(projects_dir)
+        self._queue: queue.Queue[list[FileEvent]] = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # ディレクトリごとの {ファイルパス: (更新日時, サイズ)}
+        self._snapshot: dict[str, dict[str, tuple[int, int]]] = {}
+        self._dir_mtimes: dict[str, int] = {}
+        # 最近更新されたファイル {ファイルパス: 更新日時}
+        self._hot: dict[str, int] = {}
+
+        self._inotify: Optional[_Inotify] = None
+        self._watches: dict[int, str] = {}
+        self._root_wd = -1
+
+    @property
+    def backend(self) -> str:
+        """使用中の検出方式（"inotify" または "polling"）を返す。"""
+        return "inotify" if self._inotify is not None else "polling"
+
+    def start(self) -> None:
+        """監視を開始する。
+
+        比較の基準となる現在のファイル一覧はこのメソッド内で取得するため、
+        呼び出し以降の変更はすべて通知される。
+        """
+        if self._thread is not None:
+            return
+
+        if self.use_inotify:
+            try:
+                self._inotify = _Inotify()
+                self._root_wd = self._inotify.add_watch(
+                    self._root, _IN_PROJECTS_MASK
+                )
+            except OSError as e:
+                logger.info(f"Falling back to polling for file changes: {e}")
+                self._close_inotify()
+
+        # 監視を追加してから一覧を取ることで、その間の変更も取りこぼさない
+        self._full_scan()
+        if self._inotify is not None and not self._sync_watches():
+            self._close_inotify()
+
+        self._thread = threading.Thread(
+            target=self._run, name="session-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """監視を停止する。"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def poll(self) -> list[FileEvent]:
+        """検出済みの変更を取り出す（UIスレッドから呼ぶ）。
+
+        Returns:
+            検出された順の変更通知
+        """
+        events: list[FileEvent] = []
+        while True:
+            try:
+                events.extend(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _run(self) -> None:
+        """監視スレッドの本体。"""
+        try:
+            if self._inotify is not None:
+                self._run_inotify()
+                self._close_inotify()
+            self._run_polling()
+        except Exception as e:
+            logger.warning(f"Session watcher stopped: {e}")
+        finally:
+            self._close_inotify()
+
+    def _run_polling(self) -> None:
+        """ポーリングで変更を検出する。"""
+        last_full_scan = time.monotonic()
+        while not self._stop_event.wait(_WATCH_POLL_INTERVAL):
+            now = time.monotonic()
+            if now - last_full_scan >= _WATCH_FULL_SCAN_INTERVAL:
+                events = self._full_scan()
+                last_full_scan = now
+            else:
+                events = self._quick_scan()
+            if events:
+                self._queue.put(events)
+
+    def _run_inotify(self) -> None:
+        """inotify で変更を検出する。
+
+        プロジェクトディレクトリ自体が削除された場合などは戻り、ポーリングで
+        監視を続ける。
+        """
+        inotify = self._inotify
+        assert inotify is not None
+        last_full_scan = time.monotonic()
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([inotify.fd], [], [], 1.0)
+            if not readable:
+                if time.monotonic() - last_full_scan >= _INOTIFY_RESCAN_INTERVAL:
+                    events = self._full_scan()
+                    last_full_scan = time.monotonic()
+                    if events:
+                        self._queue.put(events)
+                    if not self._sync_watches():
+                        return
+                continue
+
+            # 書き込みが続く間の通知をまとめて処理する
+            if self._stop_event.wait(_WATCH_SETTLE_DELAY):
+                return
+
+            dirty_dirs: set[str] = set()
+            dirty_files: set[str] = set()
+            overflow = False
+            for wd, mask, name in inotify.read_events():
+                if mask & _IN_Q_OVERFLOW:
+                    overflow = True
+                elif wd == self._root_wd:
+                    if mask & _IN_IGNORED:
+                        self._close_inotify()
+                        return
+                    if mask & _IN_ISDIR:
+                        dirty_dirs.add(os.path.join(self._root, name))
+                elif mask & _IN_IGNORED:
+                    self._watches.pop(wd, None)
+                elif wd in self._watches and name.endswith(".jsonl"):
+                    dirty_files.add(os.path.join(self._watches[wd], name))
+
+            if overflow:
+                # キューがあふれた場合は通知が欠けているため全体を確認し直す
+                events = self._full_scan()
+                last_full_scan = time.monotonic()
+            else:
+                events = self._rescan_dirs(dirty_dirs)
+                for path in sorted(dirty_files):
+                    events.extend(self._restat(path))
+            if events:
+                self._queue.put(events)
+            if not self._sync_watches():
+                return
+
+    def _sync_watches(self) -> bool:
+        """既知のプロジェクトディレクトリと inotify の監視対象を一致させる。
+
+        Returns:
+            監視を続けられる場合 True（上限に達した場合などは False）
+        """
+        inotify = self._inotify
+        if inotify is None:
+            return False
+
+        watched = {path: wd for wd, path in self._watches.items()}
+        for path, wd in watched.items():
+            if path not in self._snapshot:
+                inotify.rm_watch(wd)
+                self._watches.pop(wd, None)
+
+        added = False
+        for path in self._snapshot.keys() - watched.keys():
+            try:
+                self._watches[inotify.add_watch(path, _IN_PROJECT_MASK)] = path
+            except OSError as e:
+                if not os.path.isdir(path):
+                    continue
+                logger.info(f"Falling back to polling for file changes: {e}")
+                return False
+            added = True
+
+        # 監視を追加したディレクトリは、追加前の変更を確認しておく
+        if added:
+            events = []
+            for path in self._snapshot.keys() - watched.keys():
+                events.extend(self._diff_dir(path, self._scan_dir(path)))
+            if events:
+                self._queue.put(events)
+        return True
+
+    def _close_inotify(self) -> None:
+        """inotify を閉じてポーリングに切り替える。"""
+        if self._inotify is not None:
+            self._inotify.close()
+        self._inotify = None
+        self._watches = {}
+        self._root_wd = -1
+
+    def _list_dirs(self) -> dict[str, int]:
+        """プロジェクトディレクトリの一覧を取得する。
+
+        Returns:
+            {ディレクトリのパス: 更新日時}
+        """
+        dirs: dict[str, int] = {}
+        try:
+            with os.scandir(self._root) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            dirs[entry.path] = entry.stat().st_mtime_ns
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return dirs
+
+    def _scan_dir(self, dir_path: str) -> dict[str, tuple[int, int]]:
+        """プロジェクトディレクトリ内のセッションファイルの一覧を取得する。
+
+        Args:
+            dir_path: プロジェクトディレクトリのパス
+
+        Returns:
+            {ファイルパス: (更新日時, サイズ)}
+        """
+        files: dict[str, tuple[int, int]] = {}
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if not entry.name.endswith(".jsonl"):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    files[entry.path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+        return files
+
+    def _full_scan(self) -> list[FileEvent]:
+        """全ファイルを確認して前回との差分を求める。
+
+        Returns:
+            変更通知
+        """
+        dirs = self._list_dirs()
+        events: list[FileEvent] = []
+        for dir_path in sorted(self._snapshot.keys() - dirs.keys()):
+            events.extend(self._diff_dir(dir_path, None))
+        for dir_path in dirs:
+            events.extend(self._diff_dir(dir_path, self._scan_dir(dir_path)))
+        self._dir_mtimes = dirs
+        return events
+
+    def _quick_scan(self) -> list[FileEvent]:
+        """更新日時の変わったディレクトリと最近更新されたファイルだけを確認する。
+
+        ファイルの作成・削除はディレクトリの更新日時で、追記は最近更新された
+        ファイルの stat で検出する。
+
+        Returns:
+            変更通知
+        """
+        dirs = self._list_dirs()
+        events: list[FileEvent] = []
+        for dir_path in sorted(self._dir_mtimes.keys() - dirs.keys()):
+            events.extend(self._diff_dir(dir_path, None))
+        for dir_path, mtime in dirs.items():
+            if self._dir_mtimes.get(dir_path) != mtime:
+                events.extend(self._diff_dir(dir_path, self._scan_dir(dir_path)))
+        self._dir_mtimes = dirs
+
+        # まとめてコピーされた場合などは新しいものから上限件数だけを確認する
+        if len(self._hot) > _WATCH_HOT_LIMIT:
+            newest = sorted(self._hot.items(), key=lambda x: x[1], reverse=True)
+            self._hot = dict(newest[:_WATCH_HOT_LIMIT])
+        for path in list(self._hot):
+            events.extend(self._restat(path))
+        return events
+
+    def _rescan_dirs(self, dir_paths: set[str]) -> list[FileEvent]:
+        """指定したプロジェクトディレクトリを確認し直す。
+
+        Args:
+            dir_paths: プロジェクトディレクトリのパス
+
+        Returns:
+            変更通知
+        """
+        events: list[FileEvent] = []
+        for dir_path in sorted(dir_paths):
+            if os.path.isdir(dir_path):
+                events.extend(self._diff_dir(dir_path, self._scan_dir(dir_path)))
+            else:
+                events.extend(self._diff_dir(dir_path, None))
+        return events
+
+    def _diff_dir(
+        self, dir_path: str, files: Optional[dict[str, tuple[int, int]]]
+    ) -> list[FileEvent]:
+        """ディレクトリ内のファイル一覧を前回と比較し、記録を更新する。
+
+        Args:
+            dir_path: プロジェクトディレクトリのパス
+            files: 現在のファイル一覧（ディレクトリが削除された場合 None）
+
+        Returns:
+            変更通知
+        """
+        old = self._snapshot.get(dir_path, {})
+        if files is None:
+            self._snapshot.pop(dir_path, None)
+            files = {}
+        else:
+            self._snapshot[dir_path] = files
+
+        events = []
+        hot_since = time.time_ns() - _WATCH_HOT_SECONDS * 1_000_000_000
+        for path, signature in files.items():
+            old_signature = old.get(path)
+            if old_signature is None:
+                events.append(FileEvent("created", path))
+            elif old_signature != signature:
+                events.append(FileEvent("modified", path))
+            if signature[0] >= hot_since:
+                self._hot[path] = signature[0]
+        for path in old.keys() - files.keys():
+            events.append(FileEvent("deleted", path))
+            self._hot.pop(path, None)
+        return events
+
+    def _restat(self, path: str) -> list[FileEvent]:
+        """1つのファイルを確認し直す。
+
+        Args:
+            path: セッションファイルのパス
+
+        Returns:
+            変更通知
+        """
+        files = self._snapshot.get(os.path.dirname(path))
+        if files is None:
+            # 未知のディレクトリはディレクトリの通知で扱う
+            self._hot.pop(path, None)
+            return []
+
+        try:
+            st = os.stat(path)
+            signature: Optional[tuple[int, int]] = (
+                (st.st_mtime_ns, st.st_size) if stat.S_ISREG(st.st_mode) else None
+            )
+        except OSError:
+            signature = None
+
+        old_signature = files.get(path)
+        if signature is None:
+            self._hot.pop(path, None)
+            if old_signature is None:
+                return []
+            del files[path]
+            return [FileEvent("deleted", path)]
+
+        hot_since = time.time_ns() - _WATCH_HOT_SECONDS * 1_000_000_000
+        if signature[0] >= hot_since:
+            self._hot[path] = signature[0]
+        else:
+            self._hot.pop(path, None)
+
+        files[path] = signature
+        if old_signature is None:
+            return [FileEvent("created", path)]
+        if old_signature != signature:
+            return [FileEvent("modified", path)]
+        return []
+
+
+# ============================================================================
+# プロンプト数の集計
+# ============================================================================
+
+# 集計の単位（PromptHistogram.counts の添字）。時間・日・週・月と、曜日×時間
+# （曜日と時刻ごとの通算）
+ROLLUP_HOUR = 0
+ROLLUP_DAY = 1
+ROLLUP_WEEK = 2
+ROLLUP_MONTH = 3
+ROLLUP_HOUR_OF_WEEK = 4
+_ROLLUP_LEVELS = 5
+
+# 棒グラフの表示範囲 -> (集計の単位, 棒の数)
+CHART_VIEW_30_DAYS = "30d"
+CHART_VIEW_90_DAYS = "90d"
+CHART_VIEW_YEAR = "1y"
+CHART_VIEW_HEATMAP = "heatmap"
+CHART_VIEWS = {
+    CHART_VIEW_30_DAYS: (ROLLUP_DAY, 30),
+    CHART_VIEW_90_DAYS: (ROLLUP_WEEK, 13),
+    CHART_VIEW_YEAR: (ROLLUP_MONTH, 12),
+    CHART_VIEW_HEATMAP: (ROLLUP_HOUR_OF_WEEK, 7 * 24),
+}
+
+# ローカルの時間番号 -> 各単位の番号（_rollup_keys() のキャッシュ）
+_rollup_key_cache: dict[int, tuple[int, int, int, int, int]] = {}
+
+
+def _rollup_keys(hour: int) -> tuple[int, int, int, int, int]:
+    """ローカルの時間番号から、集計の単位ごとの番号を求める。
+
+    日の番号は 1970-01-01 からの日数、週の番号はその週の月曜日の日の番号、
+    月の番号は 年 * 12 + 月 - 1、曜日×時間の番号は月曜0時を 0 とする
+    0〜167 の数。
+
+    Args:
+        hour: ローカルの時間番号（_local_hour()）
+
+    Returns:
+        ROLLUP_HOUR〜ROLLUP_HOUR_OF_WEEK の順の番号
+    """
+    keys = _rollup_key_cache.get(hour)
+    if keys is None:
+        day, hour_of_day = divmod(hour, 24)
+        weekday = (day + 3) % 7  # 1970-01-01 は木曜日
+        date = datetime(1970, 1, 1) + timedelta(days=day)
+        keys = _rollup_key_cache[hour] = (
+            hour,
+            day,
+            day - weekday,
+            date.year * 12 + date.month - 1,
+            weekday * 24 + hour_of_day,
+        )
+    return keys
+
+
+def _add_rollup(
+    levels: tuple[dict[int, int], ...], hour_counts: dict[int, int], sign: int
+) -> None:
+    """時間別のプロンプト数を、各単位の集計に足す（sign が -1 なら引く）。
+
+    Args:
+        levels: 集計の単位ごとの 番号 -> プロンプト数（変更する）
+        hour_counts: ローカルの時間番号 -> プロンプト数
+        sign: 1 または -1
+    """
+    for hour, count in hour_counts.items():
+        count *= sign
+        for counts, key in zip(levels, _rollup_keys(hour)):
+            value = counts.get(key, 0) + count
+            if value:
+                counts[key] = value
+            else:
+                del counts[key]
+
+
+class PromptHistogram:
+    """複数のセッションのプロンプト数（Userメッセージ数）の集計。
+
+    読み込み時に求めたセッションごとの時間別集計（SessionRecord.prompt_counts）を
+    時間・日・週・月・曜日×時間の単位にまとめて持ち、セッション単位で足し引き
+    して更新する。セッションの追加・削除や絞り込みのたびにメッセージを数え
+    直さず、グラフの描画は表示する棒の数の参照で済む。
+    """
+
+    __slots__ = ("counts", "normal_counts")
+
+    def __init__(self, sessions: Iterable[SessionRecord] = ()) -> None:
+        """集計を作成する。
+
+        Args:
+            sessions: 集計するセッション
+        """
+        # 集計の単位ごとの 番号 -> プロンプト数（スラッシュコマンドを含む / 除く）
+        self.counts: tuple[dict[int, int], ...] = tuple(
+            {} for _ in range(_ROLLUP_LEVELS)
+        )
+        self.normal_counts: tuple[dict[int, int], ...] = tuple(
+            {} for _ in range(_ROLLUP_LEVELS)
+        )
+        self.add(sessions)
+
+    def add(self, sessions: Iterable[SessionRecord], sign: int = 1) -> None:
+        """セッションのプロンプト数を足す（sign が -1 なら引く）。
+
+        Args:
+            sessions: 足すセッション
+            sign: 1 または -1
+        """
+        for session in sessions:
+            _add_rollup(self.counts, session.prompt_counts, sign)
+            _add_rollup(self.normal_counts, session.normal_prompt_counts, sign)
+
+    def copy(self) -> PromptHistogram:
+        """集計の複製を返す。"""
+        histogram = PromptHistogram()
+        histogram.counts = tuple(counts.copy() for counts in self.counts)
+        histogram.normal_counts = tuple(counts.copy() for counts in self.normal_counts)
+        return histogram
+
+    def view(self, view: str, exclude_slash: bool) -> list[tuple[int, int]]:
+        """棒グラフの表示範囲のプロンプト数を取り出す。
+
+        Args:
+            view: 表示範囲（CHART_VIEWS のキー）
+            exclude_slash: スラッシュコマンドを除くかどうか
+
+        Returns:
+            (集計の単位での番号, プロンプト数) のリスト。曜日×時間は月曜0時から、
+            それ以外は現在を含む最後の棒までの古い順
+        """
+        level, num_bars = CHART_VIEWS[view]
+        counts = (self.normal_counts if exclude_slash else self.counts)[level]
+        if level == ROLLUP_HOUR_OF_WEEK:
+            keys = range(num_bars)
+        else:
+            now = _rollup_keys(_local_hour(int(time.time() * 1000)))[level]
+            step = 7 if level == ROLLUP_WEEK else 1
+            keys = range(now - (num_bars - 1) * step, now + 1, step)
+        return [(key, counts.get(key, 0)) for key in keys]
+
+
+def rollup_label(level: int, key: int) -> str:
+    """集計の単位での番号を日時の表示文字列にする。
+
+    Args:
+        level: 集計の単位
+        key: 集計の単位での番号
+
+    Returns:
+        日・週の場合 "YYYY-MM-DD"（週は月曜日）、月の場合 "YYYY-MM"、
+        曜日×時間の場合 "曜日 HH:00"
+    """
+    if level == ROLLUP_HOUR_OF_WEEK:
+        weekday, hour = divmod(key, 24)
+        return f"{get_text('chart_weekdays').split(',')[weekday]} {hour:02d}:00"
+    if level == ROLLUP_MONTH:
+        year, month = divmod(key, 12)
+        return f"{year:04d}-{month + 1:02d}"
+    return (datetime(1970, 1, 1) + timedelta(days=key)).strftime("%Y-%m-%d")
+
+
+# ヒートマップに目盛りを付ける時刻
+_HEATMAP_HOUR_LABELS = (0, 6, 12, 18)
+
+
+def _heatmap_color(ratio: float) -> str:
+    """ヒートマップの升目の色を返す。
+
+    Args:
+        ratio: 最大値に対するプロンプト数の割合（0〜1）
+
+    Returns:
+        色（0 は灰色、それ以外は割合が大きいほど濃い青）
+    """
+    if ratio <= 0:
+        return "#e0e0e0"
+    light, dark = (0xC6, 0xDC, 0xF2), (0x1F, 0x5F, 0xA8)
+    r, g, b = (round(a + (b - a) * ratio) for a, b in zip(light, dark))
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+class ChartLayout(NamedTuple):
+    """描画した棒・升目の配置（マウス位置の棒を求める用）。
+
+    棒グラフは1行、ヒートマップは columns 列の格子として扱う。
+    """
+
+    left: float
+    top: float
+    column_step: float
+    row_step: float
+    cell_width: float
+    cell_height: float
+    columns: int
+    keys: list[int]
+    counts: list[int]
+    labels: list[str]
+
+    def hit(self, x: float, y: float) -> Optional[int]:
+        """座標にある棒・升目の番号を返す。
+
+        Args:
+            x: キャンバス上のX座標
+            y: キャンバス上のY座標
+
+        Returns:
+            棒・升目の番号（棒の間や範囲外の場合 None）
+        """
+        column = math.floor((x - self.left) / self.column_step)
+        row = math.floor((y - self.top) / self.row_step)
+        if not (0 <= column < self.columns and row >= 0):
+            return None
+        if (
+            x - self.left - column * self.column_step > self.cell_width
+            or y - self.top - row * self.row_step > self.cell_height
+        ):
+            return None
+        index = row * self.columns + column
+        return index if index < len(self.keys) else None
+
+
+# ============================================================================
+# セッションの絞り込み
+# ============================================================================
+
+# セッションリストの並び順
+SORT_NEWEST = "newest"
+SORT_RELEVANCE = "relevance"
+
+# 関連度順で、検索語が最初のメッセージ・プロジェクト名にある場合に加える点数
+# （BM25 の1語分の点数と同程度）
+_FIRST_PROMPT_BOOST = 3.0
+_PROJECT_NAME_BOOST = 2.0
+
+
+# 表ごとにメモ化する絞り込み結果の件数
+_FILTER_MEMO_SIZE = 16
+
+# 行ごとの 0/1 のバイト列とビットマップの2進表記を相互に変換する表
+_SELECTOR_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_DIGITS_TO_SELECTOR = bytes.maketrans(b"01", b"\x00\x01")
+
+
+class SessionFilter(NamedTuple):
+    """セッションリストの絞り込み条件と並び順。"""
+
+    query: str
+    exclude_system: bool
+    exclude_slash: bool
+    order: str = SORT_NEWEST
+
+
+class FilterResult(NamedTuple):
+    """絞り込みの結果。
+
+    versions は絞り込みを始めた時点の (セッション表の世代, 全文検索インデックスの版)。
+    histogram は棒グラフ用の、絞り込んだセッションのプロンプト数の集計。
+    """
+
+    conditions: SessionFilter
+    versions: tuple[int, int]
+    sessions: list[SessionRecord]
+    histogram: Optional[PromptHistogram] = None
+
+
+def _mask_from_selector(selector: Union[bytes, bytearray]) -> int:
+    """行ごとの 0/1 のバイト列をビットマップ（行番号のビットが立った int）にする。
+
+    Args:
+        selector: 行ごとに 0 または 1 のバイト列
+
+    Returns:
+        ビットマップ
+    """
+    if not selector:
+        return 0
+    return int(selector[::-1].translate(_SELECTOR_TO_DIGITS), 2)
+
+
+def _selector_from_mask(mask: int, length: int) -> bytes:
+    """ビットマップを行ごとの 0/1 のバイト列にする（itertools.compress() 用）。
+
+    Args:
+        mask: ビットマップ
+        length: 行数
+
+    Returns:
+        行ごとに 0 または 1 のバイト列
+    """
+    if not length:
+        return b""
+    return f"{mask:0{length}b}"[::-1].encode("ascii").translate(_DIGITS_TO_SELECTOR)
+
+
+class SessionTable:
+    """セッションリストを列ごとに保持し、絞り込みを列単位の演算で行う表。
+
+    行は新しい順のセッションで、フラグとプロジェクトごとの所属は行番号を
+    ビット位置とするビットマップとして作成時に求めておく。最初のメッセージは
+    小文字にした1つの文字列につなげ、部分一致を str.find() で探す。
+
+    作成した表は変更せず、セッションリストが変わるたびに作り直す（絞り込み
+    スレッドから参照しても安全）。絞り込み結果は表ごとにメモ化し、全文検索
+    インデックスの版が変わったら捨てる。全セッションの日別プロンプト数は、
+    作り直す前の表の集計に変わったセッションの分だけを足し引きして求める。
+    """
+
+    _generations = itertools.count(1)
+
+    def __init__(
+        self,
+        sessions: list[SessionRecord],
+        previous: Optional["SessionTable"] = None,
+    ) -> None:
+        """表を作成する。
+
+        Args:
+            sessions: セッションリスト（新しい順）
+            previous: 作り直す前の表（日別プロンプト数の差分更新に使う）
+        """
+        # 作り直すたびに増える世代番号（絞り込み結果が古くないかの判定用）
+        self.generation = next(self._generations)
+        self.records = sessions
+        self.rows = {str(s.file_path): row for row, s in enumerate(sessions)}
+
+        count = len(sessions)
+        self.all_mask = (1 << count) - 1
+        flags = bytes(s.flags for s in sessions)
+        self.human_mask = _mask_from_selector(
+            flags.translate(bytes(f & 1 for f in range(256)))
+        )
+        self.normal_mask = _mask_from_selector(
+            flags.translate(bytes(f >> 1 & 1 for f in range(256)))
+        )
+
+        project_rows: defaultdict[str, list[int]] = defaultdict(list)
+        for row, session in enumerate(sessions):
+            project_rows[session.project_name].append(row)
+        self.project_masks: dict[str, int] = {}
+        for project_name, rows in project_rows.items():
+            selector = bytearray(count)
+            for row in rows:
+                selector[row] = 1
+            self.project_masks[project_name] = _mask_from_selector(selector)
+        self._project_keys = [(name.lower(), name) for name in self.project_masks]
+
+        # 区切りの "\0" は検索語に含まれないため、行をまたいで一致することはない
+        messages = [s.first_message.lower() for s in sessions]
+        self._messages = "\0".join(messages)
+        self._message_starts = list(
+            itertools.accumulate((len(m) + 1 for m in messages), initial=0)
+        )
+
+        self.histogram = self._build_histogram(previous)
+
+        self._lock = threading.Lock()
+        self._results: dict[SessionFilter, list[SessionRecord]] = {}
+        self._results_version: Optional[int] = None
+
+    def __len__(self) -> int:
+        """セッション数を返す。"""
+        return len(self.records)
+
+    def filter(
+        self,
+        conditions: SessionFilter,
+        search_index: Optional[SearchIndex],
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Optional[list[SessionRecord]]:
+        """条件に一致するセッションを取り出す。
+
+        Args:
+            conditions: 絞り込み条件（query は小文字化済み）
+            search_index: 本文の検索に使う全文検索インデックス（None の場合は
+                本文を検索せず、関連度順も新しい順にする）
+            cancel_event: キャンセル通知用のイベント
+
+        Returns:
+            一致したセッション（キャンセルされた場合 None）。関連度順の場合は
+            rank_sessions() の順、それ以外は表の順序。メモ化した結果を返すことが
+            あるため変更しないこと
+        """
+        version = search_index.version if search_index is not None else None
+        with self._lock:
+            if self._results_version != version:
+                self._results.clear()
+                self._results_version = version
+            cached = self._results.get(conditions)
+        if cached is not None:
+            return cached
+
+        mask = self.all_mask
+        if conditions.exclude_system:
+            mask &= self.human_mask
+        if conditions.exclude_slash:
+            mask &= self.normal_mask
+
+        # プロジェクト名と最初のメッセージに加え、全メッセージの本文も検索する
+        query = conditions.query
+        if query and mask:
+            query_mask = self._project_mask(query) | self._message_mask(query)
+            if search_index is not None:
+                query_mask |= self._hit_mask(search_index.search(query) or {})
+            mask &= query_mask
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+
+        result = list(
+            itertools.compress(self.records, _selector_from_mask(mask, len(self)))
+        )
+        if query and conditions.order == SORT_RELEVANCE and search_index is not None:
+            result = rank_sessions(result, query, search_index)
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+
+        with self._lock:
+            if self._results_version == version:
+                if len(self._results) >= _FILTER_MEMO_SIZE:
+                    del self._results[next(iter(self._results))]
+                self._results[conditions] = result
+        return result
+
+    def histogram_of(self, sessions: list[SessionRecord]) -> PromptHistogram:
+        """表のセッションの一部（絞り込み結果）の日別プロンプト数を求める。
+
+        残ったセッションを足すか、表全体の集計から除かれたセッションを引くかの
+        少ない方で求める。
+
+        Args:
+            sessions: 表のセッションの一部
+
+        Returns:
+            日別プロンプト数の集計（表全体の場合は表の集計そのもの。変更しないこと）
+        """
+        if len(sessions) == len(self):
+            return self.histogram
+        if len(sessions) * 2 <= len(self):
+            return PromptHistogram(sessions)
+
+        kept = set(map(id, sessions))
+        histogram = self.histogram.copy()
+        histogram.add((s for s in self.records if id(s) not in kept), -1)
+        return histogram
+
+    def _build_histogram(self, previous: Optional["SessionTable"]) -> PromptHistogram:
+        """全セッションの日別プロンプト数を求める。
+
+        Args:
+            previous: 作り直す前の表
+
+        Returns:
+            日別プロンプト数の集計
+        """
+        if previous is None:
+            return PromptHistogram(self.records)
+
+        # 同じファイルでもセッション情報が作り直されていれば入れ替わったとみなす
+        def changed(
+            records: list[SessionRecord],
+            other_rows: dict[str, int],
+            other_records: list[SessionRecord],
+        ) -> list[SessionRecord]:
+            result = []
+            for session in records:
+                row = other_rows.get(str(session.file_path))
+                if row is None or other_records[row] is not session:
+                    result.append(session)
+            return result
+
+        added = changed(self.records, previous.rows, previous.records)
+        removed = changed(previous.records, self.rows, self.records)
+        if len(added) + len(removed) >= len(self):
+            return PromptHistogram(self.records)
+
+        histogram = previous.histogram.copy()
+        histogram.add(removed, -1)
+        histogram.add(added)
+        return histogram
+
+    def _project_mask(self, query: str) -> int:
+        """プロジェクト名に検索語を含む行のビットマップを求める。
+
+        Args:
+            query: 検索語（小文字化済み）
+
+        Returns:
+            ビットマップ
+        """
+        mask = 0
+        for key, project_name in self._project_keys:
+            if query in key:
+                mask |= self.project_masks[project_name]
+        return mask
+
+    def _message_mask(self, query: str) -> int:
+        """最初のメッセージに検索語を含む行のビットマップを求める。
+
+        Args:
+            query: 検索語（小文字化済み）
+
+        Returns:
+            ビットマップ
+        """
+        selector = bytearray(len(self))
+        messages = self._messages
+        starts = self._message_starts
+        pos = messages.find(query)
+        while pos >= 0:
+            row = bisect.bisect_right(starts, pos) - 1
+            selector[row] = 1
+            pos = messages.find(query, starts[row + 1])
+        return _mask_from_selector(selector)
+
+    def _hit_mask(self, hits: dict[str, list[int]]) -> int:
+        """全文検索で一致したセッションの行のビットマップを求める。
+
+        Args:
+            hits: 全文検索の結果（ファイルパス -> メッセージ番号）
+
+        Returns:
+            ビットマップ
+        """
+        selector = bytearray(len(self))
+        rows = self.rows
+        for path in hits:
+            row = rows.get(path)
+            if row is not None:
+                selector[row] = 1
+        return _mask_from_selector(selector)
+
+
+def rank_sessions(
+    sessions: list[SessionRecord], query: str, search_index: SearchIndex
+) -> list[SessionRecord]:
+    """セッションを検索語との関連度の高い順に並べる。
+
+    本文の BM25 の点数に、検索語が最初のメッセージ・プロジェクト名にある場合の
+    点数を加える。同点の場合は新しい順にする。
+
+    Args:
+        sessions: 対象のセッション
+        query: 検索語（小文字化済み）
+        search_index: 本文の点数の計算に使う全文検索インデックス
+
+    Returns:
+        並べ替えたセッション
+    """
+    scores = search_index.scores(query)
+    needles = [term for term, _ in _query_terms(query)] or [query]
+
+    def relevance(session: SessionRecord) -> tuple[float, int]:
+        score = scores.get(str(session.file_path), 0.0)
+        first_message = _normalize_for_search(session.first_message)
+        project_name = _normalize_for_search(session.project_name)
+        for needle in needles:
+            if needle in first_message:
+                score += _FIRST_PROMPT_BOOST / len(needles)
+            if needle in project_name:
+                score += _PROJECT_NAME_BOOST / len(needles)
+        return score, session.timestamp
+
+    return sorted(sessions, key=relevance, reverse=True)
+
+
+class SessionSearcher:
+    """セッションリストの絞り込みをバックグラウンドスレッドで行う。
+
+    新しい絞り込みを開始すると実行中のものはキャンセルされ、古い世代の結果は
+    poll() で破棄される。UIスレッドは入力中も待たされない。
+    """
+
+    def __init__(self, search_index: SearchIndex) -> None:
+        """絞り込みスレッドの管理を初期化する。
+
+        Args:
+            search_index: 本文の検索に使う全文検索インデックス
+        """
+        self.search_index = search_index
+        self.generation = 0
+        self._queue: queue.Queue[tuple[int, Optional[FilterResult]]] = queue.Queue()
+        self._cancel_event: Optional[threading.Event] = None
+
+    @property
+    def is_searching(self) -> bool:
+        """絞り込み中かどうか。"""
+        return self._cancel_event is not None
+
+    def start(
+        self,
+        conditions: SessionFilter,
+        table: SessionTable,
+        versions: tuple[int, int],
+    ) -> int:
+        """絞り込みを開始する。実行中の絞り込みはキャンセルする。
+
+        Args:
+            conditions: 絞り込み条件
+            table: 対象のセッション表
+            versions: セッション表と全文検索インデックスの版（結果の判定用）
+
+        Returns:
+            今回の絞り込みの世代番号
+        """
+        self.cancel()
+        self.generation += 1
+        cancel_event = threading.Event()
+        self._cancel_event = cancel_event
+        thread = threading.Thread(
+            target=self._run,
+            args=(
+                self.generation, cancel_event, conditions, table, versions
+            ),
+            name=f"SessionSearcher-{self.generation}",
+            daemon=True,
+        )
+        thread.start()
+        return self.generation
+
+    def cancel(self) -> None:
+        """実行中の絞り込みをキャンセルする。"""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+
+    def poll(self) -> Optional[FilterResult]:
+        """現在の世代の結果が届いていれば取り出す。
+
+        Returns:
+            絞り込みの結果（未完了・失敗した場合 None）
+        """
+        result: Optional[FilterResult] = None
+        while True:
+            try:
+                generation, filter_result = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.generation:
+                result = filter_result
+                self._cancel_event = None
+        return result
+
+    def _run(
+        self,
+        generation: int,
+        cancel_event: threading.Event,
+        conditions: SessionFilter,
+        table: SessionTable,
+        versions: tuple[int, int],
+    ) -> None:
+        """絞り込みスレッドの本体。
+
+        Args:
+            generation: 世代番号
+            cancel_event: キャンセル通知用のイベント
+            conditions: 絞り込み条件
+            table: 対象のセッション表
+            versions: セッション表と全文検索インデックスの版
+        """
+        result: Optional[FilterResult] = None
+        try:
+            filtered = table.filter(conditions, self.search_index, cancel_event)
+            if filtered is None or cancel_event.is_set():
+                return
+            histogram = table.histogram_of(filtered)
+            result = FilterResult(conditions, versions, filtered, histogram)
+        except Exception as e:
+            logger.warning(f"Failed to filter sessions: {e}")
+        self._queue.put((generation, result))
+
+
+# ============================================================================
+# 仮想スクロールのセッションリスト
+# ============================================================================
+
+# 行の高さを測れない場合（項目がまだない場合）に使う値（ピクセル）
+_LIST_ROW_HEIGHT = 20
+_LIST_HEADING_HEIGHT = 25
+
+# マウスホイール1回でスクロールする行数
+_LIST_WHEEL_ROWS = 3
+
+# 表示値をキャッシュするセッション数の上限（超えたら捨てて作り直す）
+_LIST_CELL_CACHE_SIZE = 4096
+
+
+class VirtualSessionList:
+    """画面に見えている行だけを Treeview に置く、仮想スクロールのセッションリスト。
+
+    Treeview には画面に収まる行数分の項目だけを作る。全行は rows に持ち、
+    スクロールバーは rows の中での表示範囲の位置を示す。表示の更新は画面の
+    行数分で済み、セッション数には依存しない。
+
+    項目の iid はセッションファイルのパスで、表示範囲が変わると今の項目との
+    差分（削除・挿入・移動・値の変わった項目の書き換え）だけを Treeview に
+    反映する。選択と先頭に表示している行もセッションで覚えておき、rows を
+    置き換えても同じセッションがあれば保たれる。
+    """
+
+    def __init__(
+        self,
+        parent: tk.Misc,
+        columns: tuple[str, ...],
+        format_row: Callable[[SessionRecord], tuple[str, ...]],
+        on_select: Callable[[SessionRecord], None],
+    ) -> None:
+        """リストを構築する。
+
+        Args:
+            parent: 親ウィジェット
+            columns: 列名
+            format_row: セッションから各列の表示値を作る関数
+            on_select: ユーザーがセッションを選択したときに呼ぶ関数
+        """
+        self.rows: Sequence[SessionRecord] = ()
+        self.offset = 0  # 表示範囲の先頭の行番号
+        self.selected_index: Optional[int] = None
+        self._format_row = format_row
+        self._on_select = on_select
+        self._page_size = 1
+
+        # 表示範囲の項目の iid（表示順）と、各項目に表示しているセッション
+        self._window_keys: list[str] = []
+        self._shown: dict[str, SessionRecord] = {}
+        # パス -> (セッション, 表示値)
+        self._cells: dict[str, tuple[SessionRecord, tuple[str, ...]]] = {}
+
+        self.tree = ttk.Treeview(
+            parent, columns=columns, show="headings", selectmode="browse"
+        )
+        self.scrollbar = ttk.Scrollbar(
+            parent, orient=tk.VERTICAL, command=self._on_scrollbar
+        )
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", lambda e: self._render())
+        self.tree.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-_LIST_WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(_LIST_WHEEL_ROWS))
+        self.tree.bind("<Up>", lambda e: self._on_key(-1, e))
+        self.tree.bind("<Down>", lambda e: self._on_key(1, e))
+        self.tree.bind("<Prior>", lambda e: self._on_key(-self._page_size, e))
+        self.tree.bind("<Next>", lambda e: self._on_key(self._page_size, e))
+        self.tree.bind("<Home>", lambda e: self._on_key(-len(self.rows), e))
+        self.tree.bind("<End>", lambda e: self._on_key(len(self.rows), e))
+
+    def set_rows(self, rows: Sequence[SessionRecord]) -> None:
+        """表示する行を置き換える。
+
+        先頭に表示していたセッションと選択中のセッションが rows にあれば、
+        その位置を保つ。先頭のセッションがなければ、選択中のセッションが
+        見える位置か、rows の先頭を表示する。
+
+        Args:
+            rows: 表示するセッション
+        """
+        anchor = self.rows[self.offset] if self.offset < len(self.rows) else None
+        selected = self.selected()
+
+        self.rows = rows
+        self.selected_index = self._locate(selected)
+        top = self._locate(anchor)
+        if top is not None:
+            self.offset = top
+        else:
+            self.offset = 0
+            if self.selected_index is not None:
+                self.see(self.selected_index)
+        self._render()
+
+    def selected(self) -> Optional[SessionRecord]:
+        """選択中のセッションを返す。
+
+        Returns:
+            選択中のセッション（選択がない場合 None）
+        """
+        if self.selected_index is None:
+            return None
+        return self.rows[self.selected_index]
+
+    def select(self, index: Optional[int]) -> None:
+        """行を選択し、表示範囲に入るようにスクロールする。on_select は呼ばない。
+
+        Args:
+            index: 行番号（None で選択を解除）
+        """
+        self.selected_index = index
+        if index is not None:
+            self.see(index)
+        self._render()
+
+    def see(self, index: int) -> None:
+        """行が表示範囲に入るようにスクロール位置を変える。
+
+        Args:
+            index: 行番号
+        """
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self._page_size:
+            self.offset = index - self._page_size + 1
+
+    def scroll(self, rows: int) -> None:
+        """表示範囲をずらす。
+
+        Args:
+            rows: ずらす行数（負の数で上へ）
+        """
+        self.offset += rows
+        self._render()
+
+    def row_at(self, y: int) -> Optional[int]:
+        """ウィジェット内の y 座標にある行の行番号を返す。
+
+        Args:
+            y: y 座標
+
+        Returns:
+            行番号（行がない場合 None）
+        """
+        iid = self.tree.identify_row(y)
+        if iid not in self._shown:
+            return None
+        return self.offset + self._window_keys.index(iid)
+
+    def _locate(self, session: Optional[SessionRecord]) -> Optional[int]:
+        """セッション（または同じファイルの新しいセッション情報）の行番号を探す。
+
+        Args:
+            session: セッション情報
+
+        Returns:
+            行番号（rows にない場合 None）
+        """
+        if session is None:
+            return None
+        rows = self.rows
+        try:
+            # 読み込み直していなければ同じオブジェクトが残っている
+            return rows.index(session)
+        except ValueError:
+            pass
+        session_id = session.session_id
+        file_path = session.file_path
+        for index, row in enumerate(rows):
+            if row.session_id == session_id and row.file_path == file_path:
+                return index
+        return None
+
+    def _cells_of(self, key: str, session: SessionRecord) -> tuple[str, ...]:
+        """セッションの表示値を返す（セッション情報が変わるまでキャッシュする）。
+
+        Args:
+            key: 項目の iid
+            session: セッション情報
+
+        Returns:
+            各列の表示値
+        """
+        cached = self._cells.get(key)
+        if cached is not None and cached[0] is session:
+            return cached[1]
+        if len(self._cells) >= _LIST_CELL_CACHE_SIZE:
+            self._cells.clear()
+        values = self._format_row(session)
+        self._cells[key] = (session, values)
+        return values
+
+    def _render(self) -> None:
+        """表示範囲の行と今の Treeview の項目との差分を反映する。"""
+        self._page_size = self._measure_page_size()
+        rows = self.rows
+        self.offset = max(0, min(self.offset, len(rows) - self._page_size))
+        window = rows[self.offset : self.offset + self._page_size]
+        keys = [str(session.file_path) for session in window]
+
+        tree = self.tree
+        shown = self._shown
+        wanted = set(keys)
+        stale = [key for key in self._window_keys if key not in wanted]
+        if stale:
+            tree.delete(*stale)
+            for key in stale:
+                del shown[key]
+        order = [key for key in self._window_keys if key in wanted]
+
+        for position, (key, session) in enumerate(zip(keys, window)):
+            if key not in shown:
+                tree.insert(
+                    "", position, iid=key, values=self._cells_of(key, session)
+                )
+                order.insert(position, key)
+            else:
+                if order[position] != key:
+                    tree.move(key, "", position)
+                    order.remove(key)
+                    order.insert(position, key)
+                if shown[key] is not session:
+                    tree.item(key, values=self._cells_of(key, session))
+            shown[key] = session
+        self._window_keys = keys
+
+        # 選択を付け直す（選択イベントは _on_tree_select で selected_index と
+        # 同じ行なら無視される）
+        index = self.selected_index
+        if index is not None and self.offset <= index < self.offset + len(keys):
+            key = keys[index - self.offset]
+            if tuple(tree.selection()) != (key,):
+                tree.selection_set(key)
+        elif tree.selection():
+            tree.selection_remove(*tree.selection())
+
+        if rows:
+            self.scrollbar.set(
+                self.offset / len(rows), (self.offset + len(keys)) / len(rows)
+            )
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _measure_page_size(self) -> int:
+        """画面に収まる行数を求める。
+
+        Returns:
+            行数（1以上）
+        """
+        top, row_height = _LIST_HEADING_HEIGHT, _LIST_ROW_HEIGHT
+        if self._window_keys:
+            bbox = self.tree.bbox(self._window_keys[0])
+            if bbox:
+                top, row_height = bbox[1], max(1, bbox[3])
+        return max(1, (self.tree.winfo_height() - top) // row_height)
+
+    def _on_tree_select(self, event: tk.Event) -> None:
+        """Treeview の選択が変わったときの処理。
+
+        Args:
+            event: イベントオブジェクト
+        """
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self._shown:
+            return
+        index = self.offset + self._window_keys.index(selection[0])
+        if index == self.selected_index:
+            return
+        self.selected_index = index
+        self._on_select(self.rows[index])
+
+    def _on_key(self, step: int, event: tk.Event) -> str:
+        """カーソルキーなどで選択を移動する。
+
+        Treeview 標準の移動は表示範囲の項目の中に限られるため、表示範囲の外へも
+        移動できるようにこちらで処理する。
+
+        Args:
+            step: 移動する行数
+            event: イベントオブジェクト
+
+        Returns:
+            標準の処理を止める "break"
+        """
+        if self.rows:
+            current = self.selected_index
+            if current is None:
+                current = self.offset - 1 if step > 0 else self.offset
+            index = max(0, min(current + step, len(self.rows) - 1))
+            if index != self.selected_index:
+                self.select(index)
+                self._on_select(self.rows[index])
+        return "break"
+
+    def _on_mouse_wheel(self, event: tk.Event) -> str:
+        """マウスホイールでスクロールする。
+
+        Args:
+            event: イベントオブジェクト
+
+        Returns:
+            標準の処理を止める "break"
+        """
+        if event.delta:
+            self.scroll(-_LIST_WHEEL_ROWS if event.delta > 0 else _LIST_WHEEL_ROWS)
+        return "break"
+
+    def _on_scrollbar(self, *args: str) -> None:
+        """スクロールバーの操作でスクロールする。
+
+        Args:
+            args: ("moveto", 位置) または ("scroll", 量, "units" / "pages")
+        """
+        if not args:
+            return
+        if args[0] == tk.MOVETO:
+            self.offset = int(float(args[1]) * len(self.rows))
+            self._render()
+        elif args[0] == tk.SCROLL:
+            amount = int(args[1])
+            if len(args) > 2 and args[2] == tk.PAGES:
+                amount *= self._page_size
+            self.scroll(amount)
+
+
+# ============================================================================
+# 起動時間の計測
+# ============================================================================
+
+
+class StartupProfile:
+    """起動の段階ごとにかかった時間を記録し、--startup-profile で出力する。
+
+    main() が始まるまで（インタープリタの起動とモジュールの読み込み）の経過時間は
+    標準ライブラリでは取得できないため、それまでに使った CPU 時間で代用する。
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """計測を始める。
+
+        Args:
+            enabled: report() で結果を出力するかどうか
+        """
+        self.enabled = enabled
+        # {段階の名前: かかった秒数}（記録した順）
+        self._phases: dict[str, float] = {
+            "interpreter and imports (CPU)": time.process_time()
+        }
+        self._last = time.perf_counter()
+        self._first_paint: Optional[float] = None
+        self._reported = False
+
+    def mark(self, phase: str, first_paint: bool = False) -> None:
+        """前回の記録からここまでを1つの段階として記録する。
+
+        同じ名前の段階は最初の1回だけ記録し、出力後の記録は無視する。
+
+        Args:
+            phase: 段階の名前
+            first_paint: ウィンドウが初めて描画された時点かどうか
+        """
+        if self._reported or phase in self._phases:
+            return
+        now = time.perf_counter()
+        self._phases[phase] = now - self._last
+        self._last = now
+        if first_paint:
+            self._first_paint = sum(self._phases.values())
+
+    def report(self, out: Any = None) -> None:
+        """段階ごとの時間と起動からの累計を出力する（有効な場合に1回だけ）。
+
+        Args:
+            out: 出力先（None の場合は標準エラー出力）
+        """
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        out = out if out is not None else sys.stderr
+
+        print(f"{'Startup phase':<34}{'ms':>9}{'total':>9}", file=out)
+        total = 0.0
+        for phase, seconds in self._phases.items():
+            total += seconds
+            print(f"  {phase:<32}{seconds * 1000:>9.1f}{total * 1000:>9.1f}", file=out)
+        if self._first_paint is not None:
+            first_paint_ms = self._first_paint * 1000
+            verdict = "within" if first_paint_ms <= STARTUP_BUDGET_MS else "over"
+            print(
+                f"First paint after {first_paint_ms:.1f} ms "
+                f"({verdict} the {STARTUP_BUDGET_MS} ms budget)",
+                file=out,
+            )
+
+
+# ============================================================================
+# メインアプリケーション
+# ============================================================================
+
+# 基本多言語面の外の文字（絵文字など）
+_ASTRAL_CHAR_RE = re.compile("[\U00010000-\U0010ffff]")
+
+class ClaudeCodeRecall:
+    """Claude Code Recallメインアプリケーションクラス。"""
+
+    def __init__(
+        self,
+        root: tk.Tk,
+        parse_workers: Optional[int] = None,
+        search_store: str = "memory",
+        startup_profile: Optional[StartupProfile] = None,
+    ) -> None:
+        """アプリケーションを初期化する。
+
+        ここではウィンドウの最初の描画に必要なUIだけを構築し、棒グラフ・会話表示の
+        構築とセッションの読み込みは初回の描画後に _finish_startup() で行う。
+
+        Args:
+            root: Tkinterのルートウィンドウ
+            parse_workers: セッションのパースに使うワーカー数（None で自動）
+            search_store: 全文検索インデックスの保存先（"memory" または "sqlite"）
+            startup_profile: 起動時間の計測（None の場合は計測結果を出力しない）
+        """
+        _load_tkinter()
+        self.root = root
+        self.startup_profile = startup_profile or StartupProfile()
+        self.root.title(get_text("app_title"))
+        self.root.geometry(DEFAULT_WINDOW_SIZE)
+
+        # ディレクトリ設定
+        self.projects_dir = get_claude_projects_dir()
+
+        # パース結果の永続インデックス（読み込みスレッドが最初に読み込む）と
+        # バックグラウンドローダー
+        self.session_index = SessionIndex(get_cache_dir() / SESSION_INDEX_FILENAME)
+        self.search_index = create_search_index(search_store)
+        self.loader = SessionLoader(
+            self.projects_dir, self.session_index, self.search_index, parse_workers
+        )
+        self._loaded_sessions: dict[str, Optional[SessionRecord]] = {}
+        self._load_started = 0.0
+        self._load_poll_id: Optional[str] = None
+
+        # ファイルの変更検出（変更されたセッションだけを読み込み直す）
+        self.watcher = SessionWatcher(self.projects_dir)
+        self._pending_changes: set[str] = set()
+
+        # データ（self.sessions を置き換えるたびに列形式の表を作り直す）
+        self.session_table = SessionTable([])
+        self.current_session: Optional[SessionRecord] = None
+
+        # セッションリストに表示中のセッション（行の iid の順）と、その絞り込み結果
+        self._displayed_sessions: list[SessionRecord] = []
+        self._filtered: Optional[FilterResult] = None
+
+        # 入力中の検索はバックグラウンドで絞り込む
+        self.searcher = SessionSearcher(self.search_index)
+        self._search_after_id: Optional[str] = None
+        self._search_poll_id: Optional[str] = None
+
+        # 表示中の会話のリーダー（本文は表示時に必要な行だけ読み込む）
+        self._conversation_reader: Optional[SessionReader] = None
+        self._conversation_key: Optional[tuple[Path, tuple[int, int, int]]] = None
+
+        # 会話中の検索語の一致箇所（メッセージ番号と本文中の範囲）と選択中の位置
+        self._search_highlights: Optional[
+            tuple[tuple[str, int], dict[str, list[int]], list[tuple[str, bool]]]
+        ] = None
+        self._search_hits: list[tuple[int, int, int]] = []
+        self._search_hit_index = -1
+        self._hit_messages: set[int] = set()
+        self._highlight_terms: list[tuple[str, bool]] = []
+
+        # 会話表示で描画済みのメッセージ番号の範囲と、その中で実際に描画した
+        # メッセージ（全メッセージ数と合わせてスクロールバーの位置を求める）
+        self._conversation_total = 0
+        self._conversation_window = (0, 0)
+        self._rendered_messages: set[int] = set()
+        self._conversation_fill_id: Optional[str] = None
+
+        # フィルター設定
+        self.filter_system_sessions = tk.BooleanVar(value=True)
+        self.filter_slash_commands = tk.BooleanVar(value=True)
+        self.sort_order = tk.StringVar(value=SORT_NEWEST)
+
+        # 棒グラフ関連
+        self.chart_canvas: Optional[tk.Canvas] = None
+        self.chart_view = tk.StringVar(value=CHART_VIEW_30_DAYS)
+        # 集計の単位での番号 -> canvas item id
+        self.chart_bars: dict[int, int] = {}
+        self.selected_bucket: Optional[int] = None
+
+        # 棒グラフのキャンバス項目（表示範囲を切り替えたときだけ作り直し、
+        # 描き直すたびには位置と色を更新する）
+        self._chart_items_view: Optional[str] = None
+        self._chart_bar_ids: list[int] = []
+        self._chart_label_ids: list[int] = []
+        self._chart_axis_ids: list[int] = []
+        self._chart_tooltip_ids: Optional[tuple[int, int]] = None
+        # 棒ごとの強調しない場合の色と、マウス位置の棒を求めるための配置
+        self._chart_colors: dict[int, str] = {}
+        self._chart_layout: Optional[ChartLayout] = None
+        self._chart_hover: Optional[int] = None
+        self._chart_redraw_id: Optional[str] = None
+
+        # 最終更新日時
+        self.last_updated: Optional[datetime] = None
+
+        # ログ設定
+        logging.basicConfig(level=logging.WARNING)
+        self.logger = logging.getLogger(__name__)
+
+        # UI構築（検索とセッションリストだけ）
+        self._setup_ui()
+        self.startup_profile.mark("main window widgets")
+
+        # 初回の描画を待ってから残りを行う。描画が通知されない場合（最小化して
+        # 起動したなど）も一定時間後には始める
+        self._first_paint_binding: Optional[str] = self.root.bind(
+            "<Expose>", self._on_first_paint
+        )
+        self._first_paint_timeout_id: Optional[str] = self.root.after(
+            FIRST_PAINT_TIMEOUT_MS, self._finish_startup
+        )
+
+    @property
+    def sessions(self) -> list[SessionRecord]:
+        """読み込み済みの全セッション（新しい順）。変更せず置き換えること。"""
+        return self.session_table.records
+
+    @sessions.setter
+    def sessions(self, sessions: list[SessionRecord]) -> None:
+        self.session_table = SessionTable(sessions, self.session_table)
+
+    def _setup_ui(self) -> None:
+        """初回の描画までに必要なUI（検索とセッションリスト）を構築する。"""
+        # メインのPanedWindow（左右分割）
+        self.paned = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
+        self.paned.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self._setup_left_panel()
+
+    def _on_first_paint(self, event: tk.Event) -> None:
+        """ウィンドウが初めて描画されたときの処理。
+
+        Args:
+            event: イベントオブジェクト
+        """
+        self.startup_profile.mark("first paint", first_paint=True)
+        self._end_first_paint_wait()
+        # 描画中の他のウィジェットの再描画を先に済ませる
+        self.root.after_idle(self._finish_startup)
+
+    def _end_first_paint_wait(self) -> None:
+        """初回の描画の待ち受けと、その待ち時間の上限のタイマーを解除する。"""
+        if self._first_paint_binding is not None:
+            self.root.unbind("<Expose>", self._first_paint_binding)
+            self._first_paint_binding = None
+        if self._first_paint_timeout_id is not None:
+            self.root.after_cancel(self._first_paint_timeout_id)
+            self._first_paint_timeout_id = None
+
+    def _finish_startup(self) -> None:
+        """初回の描画後に棒グラフと会話表示を構築し、セッションの読み込みを始める。"""
+        self._end_first_paint_wait()
+
+        # 左パネル下部の棒グラフと右パネルの会話表示
+        self._setup_chart_panel(self.left_frame)
+        self._setup_right_panel()
+        self._setup_text_context_menu()
+        self.startup_profile.mark("chart and conversation panels")
+
+        # 変更の監視を読み込みより先に始め、読み込み中の変更も取りこぼさない
+        self.watcher.start()
+        self.startup_profile.mark(f"file watcher ({self.watcher.backend})")
+
+        # セッション読み込み（バックグラウンドで実行し、mainloop中に順次表示）
+        self._load_all_sessions()
+
+        # 変更通知の確認タイマー開始
+        self._schedule_watch_poll()
+
+    def _setup_left_panel(self) -> None:
+        """左パネルのセッションリストを構築する。
+
+        下部の棒グラフは初回の描画後に _setup_chart_panel() で追加する。
+        """
+        left_frame = ttk.Frame(self.paned)
+        self.paned.add(left_frame, weight=1)
+        self.left_frame = left_frame
+
+        # 上部フレーム（セッションリスト）- 3/4
+        top_frame = ttk.Frame(left_frame)
+        top_frame.pack(fill=tk.BOTH, expand=True)
+
+        # 検索バー
+        search_frame = ttk.Frame(top_frame)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+
+        ttk.Label(search_frame, text=get_text("search")).pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *_: self._schedule_search())
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+
+        # フィルターオプション
+        filter_frame = ttk.Frame(top_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+
+        ttk.Checkbutton(
+            filter_frame,
+            text=get_text("filter_system"),
+            variable=self.filter_system_sessions,
+            command=self._filter_sessions,
+        ).pack(side=tk.LEFT)
+
+        ttk.Checkbutton(
+            filter_frame,
+            text=get_text("filter_slash"),
+            variable=self.filter_slash_commands,
+            command=self._on_slash_filter_change,
+        ).pack(side=tk.LEFT, padx=(10, 0))
+
+        # 並び順（検索語があるときだけ関連度順が効く）
+        for value, key in (
+            (SORT_RELEVANCE, "sort_relevance"),
+            (SORT_NEWEST, "sort_newest"),
+        ):
+            ttk.Radiobutton(
+                filter_frame,
+                text=get_text(key),
+                value=value,
+                variable=self.sort_order,
+                command=self._start_search,
+            ).pack(side=tk.RIGHT)
+        ttk.Label(filter_frame, text=get_text("sort_order")).pack(
+            side=tk.RIGHT, padx=(10, 5)
+        )
+
+        # セッション数・最終更新日時表示
+        status_frame = ttk.Frame(top_frame)
+        status_frame.pack(fill=tk.X)
+
+        self.count_label = ttk.Label(status_frame, text="")
+        self.count_label.pack(side=tk.LEFT)
+
+        self.updated_label = ttk.Label(status_frame, text="", foreground="#666666")
+        self.updated_label.pack(side=tk.RIGHT)
+
+        # 読み込み進捗（読み込み中のみ表示）
+        self.progress_bar = ttk.Progressbar(
+            status_frame, length=100, mode="determinate", maximum=100
+        )
+        self.progress_label = ttk.Label(status_frame, text="", foreground="#666666")
+        self.progress_label.pack(side=tk.RIGHT, padx=(5, 0))
+
+        # セッションリスト（見えている行だけを Treeview に置く）
+        list_frame = ttk.Frame(top_frame)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+
+        columns = ("project", "date", "first_message")
+        self.session_list = VirtualSessionList(
+            list_frame, columns, self._format_session_row, self._on_session_select
+        )
+        tree = self.session_list.tree
+
+        tree.heading("project", text=get_text("col_project"))
+        tree.heading("date", text=get_text("col_date"))
+        tree.heading("first_message", text=get_text("col_first_message"))
+
+        tree.column("project", width=150, minwidth=100)
+        tree.column("date", width=130, minwidth=100)
+        tree.column("first_message", width=200, minwidth=100)
+
+        # 右クリックメニュー（セッションリスト用）
+        self.session_context_menu = tk.Menu(self.root, tearoff=0)
+        self.session_context_menu.add_command(
+            label=get_text("menu_resume"), command=self._resume_selected_session
+        )
+        self.session_context_menu.add_separator()
+        self.session_context_menu.add_command(
+            label=get_text("menu_delete"), command=self._delete_selected_session
+        )
+        tree.bind("<Button-3>", self._on_session_right_click)
+
+    def _setup_chart_panel(self, parent: ttk.Frame) -> None:
+        """棒グラフパネルを構築する。
+
+        Args:
+            parent: 親フレーム
+        """
+        chart_frame = ttk.LabelFrame(parent, text=get_text("chart_title"))
+        chart_frame.pack(fill=tk.BOTH, pady=(5, 0), ipady=5)
+
+        # 表示範囲の切り替え
+        view_frame = ttk.Frame(chart_frame)
+        view_frame.pack(fill=tk.X, padx=5)
+        for value, key in (
+            (CHART_VIEW_30_DAYS, "chart_view_30d"),
+            (CHART_VIEW_90_DAYS, "chart_view_90d"),
+            (CHART_VIEW_YEAR, "chart_view_1y"),
+            (CHART_VIEW_HEATMAP, "chart_view_heatmap"),
+        ):
+            ttk.Radiobutton(
+                view_frame,
+                text=get_text(key),
+                value=value,
+                variable=self.chart_view,
+                command=self._on_chart_view_change,
+            ).pack(side=tk.LEFT, padx=(0, 10))
+
+        # Canvas for chart (height fixed to ~1/4 of typical window)
+        self.chart_canvas = tk.Canvas(
+            chart_frame,
+            height=120,
+            bg="#f8f8f8",
+            highlightthickness=0,
+        )
+        self.chart_canvas.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        # 大きさの変更はまとめて1回だけ描き直す。ツールチップはキャンバス全体の
+        # マウス移動から対象の棒を求めて表示する
+        self.chart_canvas.bind("<Configure>", lambda e: self._schedule_chart_redraw())
+        self.chart_canvas.bind("<Motion>", self._on_chart_motion)
+        self.chart_canvas.bind("<Leave>", lambda e: self._hide_chart_tooltip())
+
+    def _get_chart_counts(self) -> list[tuple[int, int]]:
+        """表示中のセッションの、棒グラフの表示範囲のプロンプト数を取得する。
+
+        集計は絞り込み結果ごとに保持し、再描画のたびには表示する棒の数だけ
+        取り出す。
+
+        Returns:
+            (集計の単位での番号, プロンプト数) のリスト
+        """
+        if self._filtered is None:
+            self._get_filtered_sessions()
+        result = self._filtered
+        assert result is not None
+
+        if result.histogram is None:
+            if result.versions[0] == self.session_table.generation:
+                histogram = self.session_table.histogram_of(result.sessions)
+            else:
+                histogram = PromptHistogram(result.sessions)
+            result = self._filtered = result._replace(histogram=histogram)
+        assert result.histogram is not None
+        return result.histogram.view(
+            self.chart_view.get(), result.conditions.exclude_slash
+        )
+
+    def _on_chart_view_change(self) -> None:
+        """棒グラフの表示範囲を切り替えたときの処理。"""
+        self._hide_chart_tooltip()
+        self.selected_bucket = self._chart_bucket(self.current_session)
+        self._draw_chart()
+
+    def _chart_bucket(self, session: Optional[SessionRecord]) -> Optional[int]:
+        """セッションが含まれる棒（集計の単位での番号）を求める。
+
+        Args:
+            session: セッション情報
+
+        Returns:
+            現在の表示範囲の集計の単位での番号（日時が不明な場合 None）
+        """
+        if session is None or not session.timestamp:
+            return None
+        level = CHART_VIEWS[self.chart_view.get()][0]
+        return _rollup_keys(_local_hour(session.timestamp))[level]
+
+    def _schedule_chart_redraw(self) -> None:
+        """棒グラフの描き直しを予約する。
+
+        ウィンドウのドラッグ中などに続けて呼ばれた場合は、最後の呼び出しから
+        CHART_REDRAW_DELAY_MS 経ってから1回だけ描き直す。
+        """
+        if self._chart_redraw_id is not None:
+            self.root.after_cancel(self._chart_redraw_id)
+        self._chart_redraw_id = self.root.after(
+            CHART_REDRAW_DELAY_MS, self._draw_chart
+        )
+
+    def _draw_chart(self) -> None:
+        """棒グラフ（曜日×時刻の場合はヒートマップ）を描画する。
+
+        キャンバス項目は表示範囲を切り替えたときだけ作り直し、それ以外は
+        位置・色・文字だけを更新する。
+        """
+        if self._chart_redraw_id is not None:
+            self.root.after_cancel(self._chart_redraw_id)
+            self._chart_redraw_id = None
+        if self.chart_canvas is None:
+            return
+
+        counts = self._get_chart_counts()
+        if not counts:
+            return
+
+        # Canvas dimensions
+        canvas_width = self.chart_canvas.winfo_width()
+        canvas_height = self.chart_canvas.winfo_height()
+
+        if canvas_width <= 1 or canvas_height <= 1:
+            return
+
+        # Chart margins
+        margin_left = 30
+        margin_right = 10
+        margin_top = 10
+        margin_bottom = 25
+
+        chart_width = canvas_width - margin_left - margin_right
+        chart_height = canvas_height - margin_top - margin_bottom
+
+        if chart_width <= 0 or chart_height <= 0:
+            return
+
+        view = self.chart_view.get()
+        if view != self._chart_items_view:
+            self._create_chart_items(view, len(counts))
+
+        self.chart_bars = {}
+        self._chart_colors = {}
+        area = (margin_left, margin_top, chart_width, chart_height)
+        if view == CHART_VIEW_HEATMAP:
+            self._draw_heatmap(counts, *area)
+        else:
+            self._draw_bars(counts, *area)
+
+        # 表示中のツールチップは新しい数で出し直す
+        if self._chart_hover is not None:
+            self._hide_chart_tooltip()
+
+    def _create_chart_items(self, view: str, num_cells: int) -> None:
+        """表示範囲に合わせて棒グラフのキャンバス項目を作り直す。
+
+        Args:
+            view: 表示範囲（CHART_VIEWS のキー）
+            num_cells: 棒・升目の数
+        """
+        assert self.chart_canvas is not None
+        canvas = self.chart_canvas
+        for item_id in (
+            self._chart_bar_ids + self._chart_label_ids + self._chart_axis_ids
+        ):
+            canvas.delete(item_id)
+
+        self._chart_bar_ids = [
+            canvas.create_rectangle(0, 0, 0, 0, outline="") for _ in range(num_cells)
+        ]
+        if view == CHART_VIEW_HEATMAP:
+            # 棒ごとの日付の代わりに、曜日と時刻の目盛りを置く
+            self._chart_label_ids = []
+            self._chart_axis_ids = [
+                canvas.create_text(0, 0, anchor="e", font=("", 7), fill="#666666")
+                for _ in range(7)
+            ] + [
+                canvas.create_text(0, 0, font=("", 7), fill="#666666")
+                for _ in _HEATMAP_HOUR_LABELS
+            ]
+        else:
+            self._chart_label_ids = [
+                canvas.create_text(0, 0, font=("", 7), fill="#666666")
+                for _ in range(num_cells)
+            ]
+            self._chart_axis_ids = [
+                canvas.create_text(0, 0, anchor="e", font=("", 8), fill="#666666"),
+                canvas.create_text(
+                    0, 0, text="0", anchor="e", font=("", 8), fill="#666666"
+                ),
+            ]
+        self._chart_items_view = view
+        self._chart_layout = None
+
+    def _draw_bars(
+        self,
+        counts: list[tuple[int, int]],
+        left: float,
+        top: float,
+        width: float,
+        height: float,
+    ) -> None:
+        """棒グラフの棒と目盛りを更新する。
+
+        Args:
+            counts: (集計の単位での番号, プロンプト数) のリスト
+            left: グラフ領域の左端
+            top: グラフ領域の上端
+            width: グラフ領域の幅
+            height: グラフ領域の高さ
+        """
+        assert self.chart_canvas is not None
+        canvas = self.chart_canvas
+        level = CHART_VIEWS[self.chart_view.get()][0]
+
+        num_bars = len(counts)
+        max_count = max(max(count for _, count in counts), 1)
+
+        # Bar dimensions
+        bar_width = max(2, (width - num_bars) / num_bars)
+        gap = 1
+
+        # Y-axis scale
+        max_label_id, zero_label_id = self._chart_axis_ids
+        canvas.coords(max_label_id, left - 5, top)
+        canvas.itemconfig(max_label_id, text=str(max_count))
+        canvas.coords(zero_label_id, left - 5, top + height)
+
+        # Bars and X-axis labels (show only a few dates)
+        labels = []
+        label_interval = max(1, num_bars // 5)
+        y2 = top + height
+        for i, (key, count) in enumerate(counts):
+            bar_height = (count / max_count) * height
+
+            x1 = left + i * (bar_width + gap)
+            x2 = x1 + bar_width
+            y1 = y2 - bar_height
+
+            color = "#4a90d9" if count > 0 else "#e0e0e0"
+            self._update_chart_cell(i, key, color, x1, y1, x2, y2)
+
+            label = rollup_label(level, key)
+            label_id = self._chart_label_ids[i]
+            canvas.coords(label_id, x1 + bar_width / 2, y2 + 12)
+            if i % label_interval == 0 or i == num_bars - 1:
+                # 日・週は "MM-DD" だけ、月は "YYYY-MM" を表示する
+                text = label if level == ROLLUP_MONTH else label[5:]
+                canvas.itemconfig(label_id, text=text)
+            else:
+                canvas.itemconfig(label_id, text="")
+            if level == ROLLUP_WEEK:
+                label = get_text("chart_week", date=label)
+            labels.append(label)
+
+        self._chart_layout = ChartLayout(
+            left,
+            top,
+            bar_width + gap,
+            height,
+            bar_width,
+            height,
+            num_bars,
+            [key for key, _ in counts],
+            [count for _, count in counts],
+            labels,
+        )
+
+    def _draw_heatmap(
+        self,
+        counts: list[tuple[int, int]],
+        left: float,
+        top: float,
+        width: float,
+        height: float,
+    ) -> None:
+        """曜日×時刻のヒートマップの升目と目盛りを更新する。
+
+        Args:
+            counts: (曜日×時間の番号, プロンプト数) のリスト（月曜0時から順）
+            left: グラフ領域の左端
+            top: グラフ領域の上端
+            width: グラフ領域の幅
+            height: グラフ領域の高さ
+        """
+        assert self.chart_canvas is not None
+        canvas = self.chart_canvas
+
+        gap = 1
+        cell_width = max(1, width / 24 - gap)
+        cell_height = max(1, height / 7 - gap)
+        max_count = max(max(count for _, count in counts), 1)
+
+        # 曜日（行）と時刻（列）の目盛り
+        weekday_ids = self._chart_axis_ids[:7]
+        hour_ids = self._chart_axis_ids[7:]
+        weekdays = get_text("chart_weekdays").split(",")
+        for row, label_id in enumerate(weekday_ids):
+            y = top + row * (cell_height + gap) + cell_height / 2
+            canvas.coords(label_id, left - 5, y)
+            canvas.itemconfig(label_id, text=weekdays[row])
+        for hour, label_id in zip(_HEATMAP_HOUR_LABELS, hour_ids):
+            x = left + hour * (cell_width + gap) + cell_width / 2
+            canvas.coords(label_id, x, top + 7 * (cell_height + gap) + 8)
+            canvas.itemconfig(label_id, text=str(hour))
+
+        labels = []
+        for i, (key, count) in enumerate(counts):
+            row, column = divmod(i, 24)
+            x1 = left + column * (cell_width + gap)
+            y1 = top + row * (cell_height + gap)
+            color = _heatmap_color(count / max_count)
+            self._update_chart_cell(
+                i, key, color, x1, y1, x1 + cell_width, y1 + cell_height
+            )
+            labels.append(rollup_label(ROLLUP_HOUR_OF_WEEK, key))
+
+        self._chart_layout = ChartLayout(
+            left,
+            top,
+            cell_width + gap,
+            cell_height + gap,
+            cell_width,
+            cell_height,
+            24,
+            [key for key, _ in counts],
+            [count for _, count in counts],
+            labels,
+        )
+
+    def _update_chart_cell(
+        self, index: int, key: int, color: str, *coords: float
+    ) -> None:
+        """棒・升目の位置と色を更新する（選択中のセッションの棒は強調する）。
+
+        Args:
+            index: 棒・升目の番号
+            key: 集計の単位での番号
+            color: 強調しない場合の色
+            coords: 左上と右下の座標
+        """
+        assert self.chart_canvas is not None
+        item_id = self._chart_bar_ids[index]
+        self.chart_canvas.coords(item_id, *coords)
+        fill = "#ff6600" if key == self.selected_bucket else color
+        self.chart_canvas.itemconfig(item_id, fill=fill)
+        self.chart_bars[key] = item_id
+        self._chart_colors[key] = color
+
+    def _on_chart_motion(self, event: tk.Event) -> None:
+        """棒グラフ上でマウスが動いたときに、その位置の棒のツールチップを表示する。
+
+        Args:
+            event: イベントオブジェクト
+        """
+        layout = self._chart_layout
+        if layout is None:
+            return
+
+        index = layout.hit(event.x, event.y)
+        key = None if index is None else layout.keys[index]
+        if key == self._chart_hover:
+            return
+        if index is None:
+            self._hide_chart_tooltip()
+        else:
+            self._show_chart_tooltip(event, layout.labels[index], layout.counts[index])
+            self._chart_hover = key
+
+    def _show_chart_tooltip(self, event: tk.Event, label: str, count: int) -> None:
+        """棒グラフのツールチップを表示する。
+
+        Args:
+            event: イベントオブジェクト
+            label: 棒・升目の日時の表示文字列
+            count: プロンプト数
+        """
+        if self.chart_canvas is None:
+            return
+        canvas = self.chart_canvas
+
+        if self._chart_tooltip_ids is None:
+            self._chart_tooltip_ids = (
+                canvas.create_rectangle(
+                    0, 0, 0, 0, fill="#333333", outline="", tags="tooltip"
+                ),
+                canvas.create_text(0, 0, fill="white", font=("", 8), tags="tooltip"),
+            )
+        bbox_id, text_id = self._chart_tooltip_ids
+
+        text = f"{label}: {get_text('chart_prompts', count=count)}"
+        x = event.x
+        y = event.y - 20
+
+        canvas.coords(text_id, x, y)
+        canvas.itemconfig(text_id, text=text)
+        canvas.itemconfig("tooltip", state=tk.NORMAL)
+        canvas.tag_raise("tooltip")
+
+        # Adjust background size to text
+        bbox = canvas.bbox(text_id)
+        if bbox:
+            canvas.coords(
+                bbox_id,
+                bbox[0] - 5, bbox[1] - 3, bbox[2] + 5, bbox[3] + 3
+            )
+
+    def _hide_chart_tooltip(self) -> None:
+        """棒グラフのツールチップを非表示にする。"""
+        self._chart_hover = None
+        if self.chart_canvas is not None:
+            self.chart_canvas.itemconfig("tooltip", state=tk.HIDDEN)
+
+    def _update_chart_highlight(self, session: Optional[SessionRecord]) -> None:
+        """選択されたセッションに対応する棒をハイライトする。
+
+        Args:
+            session: 選択されたセッション（Noneの場合はハイライト解除）
+        """
+        if self.chart_canvas is None:
+            return
+
+        new_bucket = self._chart_bucket(session)
+
+        # Update only if selection changed
+        if new_bucket == self.selected_bucket:
+            return
+
+        old_bucket = self.selected_bucket
+        self.selected_bucket = new_bucket
+
+        # Update bar colors
+        for key in (old_bucket, new_bucket):
+            if key is not None and key in self.chart_bars:
+                fill = "#ff6600" if key == new_bucket else self._chart_colors[key]
+                self.chart_canvas.itemconfig(self.chart_bars[key], fill=fill)
+
+    def _setup_right_panel(self) -> None:
+        """右パネル（会話表示）を構築する。"""
+        right_frame = ttk.Frame(self.paned)
+        self.paned.add(right_frame, weight=2)
+
+        header_frame = ttk.Frame(right_frame)
+        header_frame.pack(fill=tk.X, pady=(0, 5))
+
+        # セッション情報
+        self.session_info_label = ttk.Label(
+            header_frame, text=get_text("select_session"), font=("", 10, "bold")
+        )
+        self.session_info_label.pack(side=tk.LEFT, anchor=tk.W)
+
+        # 検索語の一致箇所の移動（一致がある場合だけ表示する）
+        self.search_hit_frame = ttk.Frame(header_frame)
+        ttk.Button(
+            self.search_hit_frame,
+            text="▼",
+            width=2,
+            command=lambda: self._goto_search_hit(1),
+        ).pack(side=tk.RIGHT)
+        ttk.Button(
+            self.search_hit_frame,
+            text="▲",
+            width=2,
+            command=lambda: self._goto_search_hit(-1),
+        ).pack(side=tk.RIGHT)
+        self.search_hit_label = ttk.Label(self.search_hit_frame)
+        self.search_hit_label.pack(side=tk.RIGHT, padx=(0, 5))
+
+        # 会話表示（Text）
+        text_frame = ttk.Frame(right_frame)
+        text_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.conversation_text = tk.Text(
+            text_frame,
+            wrap=tk.WORD,
+            font=("Consolas", 10),
             state=tk.DISABLED,
             padx=10,
             pady=10,
         )
 
-        text_scrollbar = ttk.Scrollbar(
-            text_frame, orient=tk.VERTICAL, command=self.conversation_text.yview
+        # スクロールバーは描画済みの範囲ではなく全メッセージの中での位置を示す
+        self.conversation_scrollbar = ttk.Scrollbar(
+            text_frame, orient=tk.VERTICAL, command=self._on_conversation_scrollbar
+        )
+        self.conversation_text.configure(yscrollcommand=self._on_conversation_yview)
+
+        # Tcl 8.6 は基本多言語面の外の文字をサロゲートペアの2文字と数えるため、
+        # 本文中の位置から Text のインデックスを作るときに補正する
+        self._astral_char_width = int(
+            self.conversation_text.tk.call("string", "length", "\U0001f600")
         )
-        self.conversation_text.configure(yscrollcommand=text_scrollbar.set)
 
         self.conversation_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        text_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.conversation_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         # タグ設定（色分け）
         self.conversation_text.tag_configure(
@@ -905,6 +6709,14 @@ class ClaudeCodeRecall:
             "timestamp", foreground="#666666", font=("Consolas", 9)
         )
         self.conversation_text.tag_configure("separator", foreground="#cccccc")
+        self.conversation_text.tag_configure("search_hit", background="#fff176")
+        self.conversation_text.tag_configure(
+            "search_hit_current", background="#ff9800"
+        )
+        self.conversation_text.tag_raise("search_hit_current", "search_hit")
+
+        self.root.bind("<F3>", lambda e: self._goto_search_hit(1))
+        self.root.bind("<Shift-F3>", lambda e: self._goto_search_hit(-1))
 
     def _setup_text_context_menu(self) -> None:
         """テキスト表示エリアの右クリックメニューを設定する。"""
@@ -937,472 +6749,1014 @@ class ClaudeCodeRecall:
         except tk.TclError:
             pass
 
-    def _schedule_auto_reload(self) -> None:
-        """自動再読み込みタイマーをスケジュールする。"""
-        # 10分 = 600,000ミリ秒
-        self.root.after(600000, self._auto_reload)
+    def _schedule_watch_poll(self) -> None:
+        """変更通知の確認タイマーをスケジュールする。"""
+        self.root.after(WATCH_POLL_INTERVAL_MS, self._poll_watcher)
 
-    def _auto_reload(self) -> None:
-        """自動再読み込みを実行する。"""
-        # 現在の選択状態を保存
-        selection = self.session_tree.selection()
-        selected_session_id: Optional[str] = None
-        if selection and self.current_session:
-            selected_session_id = self.current_session.get("session_id")
+    def _poll_watcher(self) -> None:
+        """監視スレッドが検出した変更を受け取り、該当するセッションを読み込み直す。"""
+        for event in self.watcher.poll():
+            self._pending_changes.add(event.path)
+        self._apply_pending_changes()
 
-        # セッションを再読み込み
-        self._load_all_sessions()
+        # 次のタイマーをスケジュール
+        self._schedule_watch_poll()
 
-        # 選択状態を復元
-        if selected_session_id:
-            filtered = self._get_filtered_sessions()
-            for idx, session in enumerate(filtered):
-                if session.get("session_id") == selected_session_id:
-                    self.session_tree.selection_set(str(idx))
-                    self.session_tree.see(str(idx))
-                    break
+    def _apply_pending_changes(self) -> None:
+        """保留中の変更があれば、変更されたファイルだけを読み込み直す。
 
-        # 次のタイマーをスケジュール
-        self._schedule_auto_reload()
+        読み込み中は完了を待ち、_finish_load() から改めて呼び出される。
+        """
+        if not self._pending_changes or self.loader.is_loading:
+            return
+
+        paths = self._pending_changes
+        self._pending_changes = set()
+        self.loader.start(paths)
+        self._loaded_sessions = {}
+
+        if self._load_poll_id is None:
+            self._load_poll_id = self.root.after(
+                LOAD_POLL_INTERVAL_MS, self._poll_load
+            )
 
     def _load_all_sessions(self) -> None:
-        """全プロジェクトのセッションを読み込む。"""
-        self.sessions = []
+        """全プロジェクトのセッションをバックグラウンドで読み込む。
+
+        実行中の読み込みはキャンセルされる。結果は _poll_load() で
+        少しずつ受け取り、セッションリストと棒グラフに順次反映する。
+        """
+        self.loader.start()
+        self._load_started = time.monotonic()
+        self._loaded_sessions = {}
+        self._update_load_progress(0, 0)
+
+        if self._load_poll_id is None:
+            self._load_poll_id = self.root.after(
+                LOAD_POLL_INTERVAL_MS, self._poll_load
+            )
+
+    def _poll_load(self) -> None:
+        """読み込みスレッドから届いた結果を反映する。"""
+        self._load_poll_id = None
+
+        batches = self.loader.poll()
+        for batch in batches:
+            self._loaded_sessions.update(batch.sessions)
+            if batch.done:
+                self._finish_load(batch.live_paths)
+                return
+
+        if batches:
+            last = batches[-1]
+            self._merge_loaded_sessions()
+            self._update_load_progress(last.done_bytes, last.total_bytes)
+            self.startup_profile.mark("first sessions shown")
+
+        if self.loader.is_loading:
+            self._load_poll_id = self.root.after(
+                LOAD_POLL_INTERVAL_MS, self._poll_load
+            )
+
+    def _merge_loaded_sessions(self) -> None:
+        """読み込み途中の結果を現在のセッションリストにマージして表示する。"""
+        by_path = {str(s.file_path): s for s in self.sessions}
+        for path, session_info in self._loaded_sessions.items():
+            if session_info:
+                by_path[path] = session_info
+            else:
+                by_path.pop(path, None)
+
+        self.sessions = sorted(
+            by_path.values(), key=lambda x: x.timestamp, reverse=True
+        )
+        self._refresh_sessions_keep_selection()
+
+    def _finish_load(self, live_paths: Optional[tuple[str, ...]]) -> None:
+        """読み込み完了時の処理。
+
+        Args:
+            live_paths: 走査順の全セッションファイルパス（指定ファイルだけの
+                更新の場合 None）
+        """
+        if live_paths is None:
+            changes = self._loaded_sessions
+            self._loaded_sessions = {}
+            self._apply_session_changes(changes)
+            self._apply_pending_changes()
+            return
+
+        # 走査順に並べてから日時で安定ソート（新しい順）し、逐次読み込みと同じ
+        # 順序にする
+        self.sessions = sorted(
+            (
+                session_info
+                for session_info in (self._loaded_sessions.get(p) for p in live_paths)
+                if session_info
+            ),
+            key=lambda x: x.timestamp,
+            reverse=True,
+        )
+        self._loaded_sessions = {}
         self.last_updated = datetime.now()
 
-        if not self.projects_dir.exists():
-            self._filter_sessions()
+        self._update_load_progress(None, None)
+        self._refresh_sessions_keep_selection()
+        self.startup_profile.mark("all sessions loaded")
+        self.startup_profile.report()
+        self._apply_pending_changes()
+
+    def _apply_session_changes(
+        self, changes: dict[str, Optional[SessionRecord]]
+    ) -> None:
+        """変更されたセッションだけをリスト・棒グラフ・会話表示に反映する。
+
+        Args:
+            changes: ファイルパスをキーとする新しいセッション情報（削除は None）
+        """
+        if not changes:
             return
 
-        for project_dir in self.projects_dir.iterdir():
-            if not project_dir.is_dir():
-                continue
+        by_path = {str(s.file_path): s for s in self.sessions}
+        for path, session_info in changes.items():
+            if session_info:
+                by_path[path] = session_info
+            else:
+                by_path.pop(path, None)
+        self.sessions = sorted(
+            by_path.values(), key=lambda x: x.timestamp, reverse=True
+        )
+        self.last_updated = datetime.now()
 
-            # セキュリティチェック
-            if not is_safe_path(self.projects_dir, project_dir):
-                continue
+        # リストには差分だけが反映され、選択とスクロール位置は保たれる
+        self._filter_sessions()
+
+        current = self.current_session
+        if current is not None and str(current.file_path) in changes:
+            session_info = changes[str(current.file_path)]
+            if session_info is None:
+                self._clear_conversation()
+            else:
+                self._update_conversation(session_info)
+
+    def _refresh_sessions_keep_selection(self) -> None:
+        """選択中のセッションを維持したままリストを再表示する。"""
+        self._filter_sessions()
+
+        # 選択中のセッションが読み込み直されていれば新しい情報に切り替える
+        selected = self.session_list.selected()
+        if selected is not None and selected is not self.current_session:
+            self._on_session_select(selected)
+
+    def _update_load_progress(
+        self, done_bytes: Optional[int], total_bytes: Optional[int]
+    ) -> None:
+        """読み込みの進捗表示を更新する。
+
+        Args:
+            done_bytes: パース済みのバイト数（None の場合は進捗表示を隠す）
+            total_bytes: パース対象の合計バイト数
+        """
+        if done_bytes is None or total_bytes is None:
+            self.progress_bar.pack_forget()
+            self.progress_label.config(text="")
+            return
+
+        if not self.progress_bar.winfo_ismapped():
+            self.progress_bar.pack(side=tk.RIGHT, padx=(5, 0))
+
+        if total_bytes <= 0:
+            self.progress_bar.config(mode="indeterminate")
+            self.progress_bar.start(LOAD_POLL_INTERVAL_MS)
+            self.progress_label.config(text=get_text("loading"))
+            return
+
+        self.progress_bar.stop()
+        self.progress_bar.config(mode="determinate")
+        percent = min(100, int(done_bytes * 100 / total_bytes))
+        self.progress_bar["value"] = percent
+
+        # 経過時間と処理済みバイト数から残り時間を推定する
+        elapsed = time.monotonic() - self._load_started
+        if done_bytes > 0:
+            eta = int(elapsed * (total_bytes - done_bytes) / done_bytes)
+            text = get_text("loading_progress", percent=percent, eta=eta)
+        else:
+            text = get_text("loading")
+        self.progress_label.config(text=text)
+
+    def _populate_session_list(
+        self, sessions: Optional[list[SessionRecord]] = None
+    ) -> None:
+        """セッションリストを表示する。
+
+        Args:
+            sessions: 表示するセッションリスト（Noneの場合は全セッション）
+        """
+        display_sessions = sessions if sessions is not None else self.sessions
+
+        self.session_list.set_rows(display_sessions)
+        self._displayed_sessions = display_sessions
+
+        self._update_session_count(len(display_sessions))
+
+    def _format_session_row(self, session: SessionRecord) -> tuple[str, str, str]:
+        """セッションリストの1行分の表示値を作成する。
+
+        Args:
+            session: セッション情報
+
+        Returns:
+            (プロジェクト名, 日時, 最初のメッセージ)
+        """
+        project = get_short_project_name(session.project_name)
+
+        if session.timestamp:
+            date_str = _local_datetime(session.timestamp).strftime("%Y-%m-%d %H:%M")
+        else:
+            date_str = "-"
+
+        first_msg = truncate_text(session.first_message, 50)
+        return project, date_str, first_msg
+
+    def _update_session_count(self, displayed: int) -> None:
+        """表示件数と最終更新日時の表示を更新する。
+
+        Args:
+            displayed: 表示中のセッション数
+        """
+        self.count_label.config(
+            text=get_text(
+                "session_count",
+                displayed=displayed,
+                total=len(self.sessions),
+            )
+        )
+
+        # 最終更新日時を更新
+        if self.last_updated:
+            time_str = self.last_updated.strftime("%Y-%m-%d %H:%M")
+            self.updated_label.config(text=get_text("last_updated", time=time_str))
+
+    def _filter_sessions(self) -> None:
+        """検索フィルタを適用する。"""
+        filtered = self._get_filtered_sessions()
+        self._populate_session_list(filtered)
+        self._draw_chart()
+        self._refresh_search_highlights()
+
+    def _schedule_search(self) -> None:
+        """検索語の入力が止まってから絞り込みを始めるよう予約する。"""
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self._start_search)
+
+    def _start_search(self) -> None:
+        """現在の検索語での絞り込みをバックグラウンドで始める。"""
+        self._search_after_id = None
+        conditions = self._current_filter()
+
+        previous = self._filtered
+        if (
+            previous is not None
+            and previous.conditions == conditions
+            and previous.versions == self._data_versions()
+        ):
+            self.searcher.cancel()
+            return
 
-            # プロジェクト名をデコード（フォールバック用）
-            project_name_fallback = project_dir.name.replace("--", ":/", 1).replace(
-                "-", "/"
+        self.searcher.start(conditions, self.session_table, self._data_versions())
+        if self._search_poll_id is None:
+            self._search_poll_id = self.root.after(
+                SEARCH_POLL_INTERVAL_MS, self._poll_search
             )
 
-            for session_file in project_dir.glob("*.jsonl"):
-                if not session_file.is_file():
-                    continue
+    def _poll_search(self) -> None:
+        """バックグラウンドの絞り込み結果を確認し、届いていれば表示する。"""
+        self._search_poll_id = None
+        result = self.searcher.poll()
+
+        # 絞り込み中にセッションリストや条件が変わった場合は結果を捨てる
+        # （同期的に表示し直したか、新しい絞り込みが予約されている）
+        if (
+            result is not None
+            and result.versions[0] == self.session_table.generation
+            and result.conditions == self._current_filter()
+        ):
+            self._filtered = result
+            self._populate_session_list(result.sessions)
+            self._draw_chart()
+            self._refresh_search_highlights()
+
+        if self.searcher.is_searching:
+            self._search_poll_id = self.root.after(
+                SEARCH_POLL_INTERVAL_MS, self._poll_search
+            )
 
-                # セキュリティチェック
-                if not is_safe_path(project_dir, session_file):
-                    continue
+    def _data_versions(self) -> tuple[int, int]:
+        """セッション表と全文検索インデックスの現在の版を返す。"""
+        return self.session_table.generation, self.search_index.version
 
-                session_info = self._parse_session_file(
-                    session_file, project_name_fallback
-                )
-                if session_info:
-                    self.sessions.append(session_info)
+    def _current_filter(self) -> SessionFilter:
+        """画面の検索語とフィルター設定から絞り込み条件を作成する。
 
-        # 日時でソート（新しい順）
-        self.sessions.sort(key=lambda x: x["timestamp"], reverse=True)
+        Returns:
+            絞り込み条件
+        """
+        return SessionFilter(
+            self.search_var.get().lower(),
+            self.filter_system_sessions.get(),
+            self.filter_slash_commands.get(),
+            self.sort_order.get(),
+        )
 
+    def _on_slash_filter_change(self) -> None:
+        """スラッシュコマンドフィルター変更時の処理。"""
         self._filter_sessions()
+        if self.current_session:
+            self._display_conversation(self.current_session)
 
-    def _parse_session_file(
-        self, file_path: Path, project_name_fallback: str
-    ) -> Optional[dict[str, Any]]:
-        """セッションファイルをパースして情報を抽出する。
+    def _get_filtered_sessions(self) -> list[SessionRecord]:
+        """現在のフィルター条件でセッションリストを取得する。
+
+        同じ条件・同じセッションリストでの結果はキャッシュを返す。
+
+        Returns:
+            フィルタリングされたセッションリスト
+        """
+        conditions = self._current_filter()
+        versions = self._data_versions()
+        result = self._filtered
+        if (
+            result is not None
+            and result.conditions == conditions
+            and result.versions == versions
+        ):
+            return result.sessions
+
+        filtered = self.session_table.filter(conditions, self.search_index) or []
+        self._filtered = FilterResult(conditions, versions, filtered)
+        return filtered
+
+    def _on_session_select(self, session: SessionRecord) -> None:
+        """セッション選択時の処理。
 
         Args:
-            file_path: セッションファイルのパス
-            project_name_fallback: cwdが取得できない場合のフォールバック名
+            session: 選択されたセッション
+        """
+        if self._is_current_conversation(session):
+            # 再読み込み後の選択復元では内容が同じなら再描画しない
+            self.current_session = session
+        else:
+            self._display_conversation(session)
+        self._update_chart_highlight(session)
+
+    def _is_current_conversation(self, session: SessionRecord) -> bool:
+        """表示中の会話と同じ内容のセッションかどうかを判定する。
+
+        Args:
+            session: セッション情報
+
+        Returns:
+            同じセッションファイルでメッセージ数も変わっていない場合 True
+        """
+        # セッションIDはプロジェクトをまたいで重複しうるため、ファイルで比べる
+        current = self.current_session
+        return (
+            current is not None
+            and current.file_path == session.file_path
+            and current.message_count == session.message_count
+        )
+
+    def _on_session_right_click(self, event: tk.Event) -> None:
+        """セッションリスト右クリック時の処理。
+
+        Args:
+            event: イベントオブジェクト
+        """
+        idx = self.session_list.row_at(event.y)
+        if idx is not None:
+            if idx != self.session_list.selected_index:
+                self.session_list.select(idx)
+                self._on_session_select(self._displayed_sessions[idx])
+            self.session_context_menu.post(event.x_root, event.y_root)
+
+    def _display_conversation(self, session: SessionRecord) -> None:
+        """会話を表示する。
 
-        Returns:
-            セッション情報の辞書、または None
+        最初の画面分だけをすぐに描画し、残りは表示位置に合わせて少しずつ
+        描画する。検索語がある場合は最初の一致箇所の付近から描画する。
+
+        Args:
+            session: セッション情報
         """
-        try:
-            messages: list[dict[str, Any]] = []
-            first_user_message = ""
-            latest_timestamp: Optional[datetime] = None
-            actual_cwd: Optional[str] = None
-
-            with open(file_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
+        self.current_session = session
 
-                    try:
-                        data = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
+        self.session_info_label.config(
+            text=get_text(
+                "project_label",
+                path=session.project_name,
+                session_id=session.session_id,
+            )
+        )
 
-                    # cwdを取得（最初に見つかったものを使用）
-                    if actual_cwd is None and "cwd" in data:
-                        actual_cwd = data["cwd"]
+        reader = self._get_conversation_reader(session)
+        self._conversation_total = len(reader) if reader else 0
+        hit_messages, terms = self._get_search_highlights(session)
+        self._highlight_terms = terms
+        self._hit_messages = set(hit_messages)
+        self._search_hits = self._collect_search_hits(sorted(self._hit_messages))
+        self._search_hit_index = 0
 
-                    # タイムスタンプを取得
-                    latest_timestamp = self._parse_timestamp(
-                        data.get("timestamp"), latest_timestamp
-                    )
+        first_hit = self._search_hits[0][0] if self._search_hits else 0
+        self._render_conversation_window(first_hit)
+        self._update_search_hits(jump=True)
 
-                    # メッセージを抽出
-                    msg_info = self._extract_message(data)
-                    if msg_info:
-                        messages.append(msg_info)
-                        if (
-                            msg_info["type"] == "user"
-                            and not first_user_message
-                            and not msg_info["is_slash_command"]
-                        ):
-                            first_user_message = msg_info["content"][:100].replace(
-                                "\n", " "
-                            )
-
-            if not messages:
-                return None
+    def _update_conversation(self, session: SessionRecord) -> None:
+        """表示中の会話のファイルが更新されたときに表示を更新する。
 
-            # セッション属性を判定
-            is_human_session = self._is_human_session(file_path, first_user_message)
-            has_normal_messages = any(
-                m["type"] == "user" and not m.get("is_slash_command", False)
-                for m in messages
-            )
+        追記だけの場合は、末尾まで描画済みなら追記されたメッセージを末尾に
+        描画し、それ以外の変更は全体を描画し直す。末尾を表示していた場合は
+        追記後も末尾を表示する。
 
-            return {
-                "file_path": file_path,
-                "project_name": actual_cwd or project_name_fallback,
-                "session_id": file_path.stem,
-                "timestamp": latest_timestamp or datetime.min,
-                "first_message": first_user_message
-                or get_text("slash_command_only"),
-                "messages": messages,
-                "is_human_session": is_human_session,
-                "has_normal_messages": has_normal_messages,
-            }
+        Args:
+            session: 更新後のセッション情報
+        """
+        old_reader = self._conversation_reader
+        old_offsets = old_reader.line_offsets if old_reader is not None else None
+
+        reader = self._get_conversation_reader(session)
+        if reader is not None and (
+            reader is old_reader or reader.line_offsets == old_offsets
+        ):
+            # メッセージにならない行（ツールの実行結果など）だけの追記では
+            # 表示位置を変えない
+            self.current_session = session
+            return
+        if (
+            reader is None
+            or old_offsets is None
+            or reader.line_offsets[: len(old_offsets)] != old_offsets
+        ):
+            self._display_conversation(session)
+            return
 
-        except Exception as e:
-            self.logger.warning(f"Error parsing {file_path}: {e}")
-            return None
+        self.current_session = session
+        old_total = self._conversation_total
+        self._conversation_total = len(reader)
+
+        # 追記分はまだ索引されていないことがあるため、本文から直接一致箇所を探す
+        if self._highlight_terms:
+            appended = range(old_total, len(reader))
+            self._hit_messages.update(appended)
+            self._search_hits.extend(self._collect_search_hits(appended))
+            self._hit_messages.intersection_update(
+                index for index, _, _ in self._search_hits
+            )
 
-    def _parse_timestamp(
-        self, ts: Any, current_latest: Optional[datetime]
-    ) -> Optional[datetime]:
-        """タイムスタンプをパースしてローカルタイムゾーンに変換する。
+        start, end = self._conversation_window
+        if end == old_total:
+            at_end = self.conversation_text.yview()[1] >= 1.0
+            self.conversation_text.config(state=tk.NORMAL)
+            self._append_conversation_batch(limit=False)
+            self.conversation_text.config(state=tk.DISABLED)
+            if at_end:
+                self.conversation_text.see(tk.END)
+        else:
+            self._on_conversation_yview(*self.conversation_text.yview())
+        self._update_search_hits(jump=False)
+
+    def _clear_conversation(self) -> None:
+        """会話表示をクリアする。"""
+        self._close_conversation_reader()
+        self.current_session = None
+        self.session_info_label.config(text=get_text("select_session"))
+        self._conversation_total = 0
+        self._hit_messages = set()
+        self._highlight_terms = []
+        self._search_hits = []
+        self._render_conversation_window(0)
+        self._update_search_hits(jump=False)
+
+    def _render_conversation_window(self, first: int, at_end: bool = False) -> None:
+        """会話表示を消し、指定したメッセージから1画面分を描画し直す。
 
         Args:
-            ts: タイムスタンプ値
-            current_latest: 現在の最新タイムスタンプ
-
-        Returns:
-            更新されたタイムスタンプ（ローカルタイムゾーン）
+            first: 最初に描画するメッセージ番号
+            at_end: 最後のメッセージまでを描画して末尾を表示するかどうか
+                （first は無視する）
         """
-        if ts is None:
-            return current_latest
-
-        try:
-            if isinstance(ts, str):
-                # ISO format (UTC) -> local timezone
-                dt_utc = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-                dt = dt_utc.astimezone().replace(tzinfo=None)
-            elif isinstance(ts, (int, float)):
-                # Unix timestamp in milliseconds (UTC) -> local timezone
-                dt_utc = datetime.utcfromtimestamp(ts / 1000)
-                # Convert UTC naive to aware, then to local
-                dt_aware = dt_utc.replace(tzinfo=timezone.utc)
-                dt = dt_aware.astimezone().replace(tzinfo=None)
-            else:
-                return current_latest
+        self._cancel_conversation_fill()
+        text = self.conversation_text
+        text.config(state=tk.NORMAL)
+        text.delete(1.0, tk.END)
+        for index in self._rendered_messages:
+            text.mark_unset(f"msg{index}", f"body{index}")
+        self._rendered_messages = set()
+
+        total = self._conversation_total
+        if at_end:
+            self._conversation_window = (total, total)
+            self._prepend_conversation_batch()
+        else:
+            first = max(0, min(first, total))
+            self._conversation_window = (first, first)
+            self._append_conversation_batch()
+        text.config(state=tk.DISABLED)
 
-            if current_latest is None or dt > current_latest:
-                return dt
-        except (ValueError, OSError):
-            pass
+        if at_end:
+            text.see(tk.END)
+        else:
+            text.see(1.0)
+        self._schedule_conversation_fill()
 
-        return current_latest
+    def _append_conversation_batch(self, limit: bool = True) -> None:
+        """描画済みの範囲の後ろにメッセージを描画する。
 
-    def _extract_message(self, data: dict[str, Any]) -> Optional[dict[str, Any]]:
-        """メッセージデータを抽出する。
+        Args:
+            limit: CONVERSATION_BATCH_* の分だけ描画するかどうか（False の
+                場合は最後のメッセージまで描画する）
+        """
+        start, end = self._conversation_window
+        stop = self._conversation_total
+        if limit:
+            stop = min(stop, end + CONVERSATION_BATCH_MESSAGES)
+
+        chars = 0
+        index = end
+        while index < stop and (not limit or chars < CONVERSATION_BATCH_CHARS):
+            chars += self._render_conversation_message(index, tk.END)
+            index += 1
+        self._conversation_window = (start, index)
+
+    def _prepend_conversation_batch(self) -> None:
+        """描画済みの範囲の前にメッセージを描画する。"""
+        start, end = self._conversation_window
+        reader = self._conversation_reader
+        text = self.conversation_text
+
+        # CONVERSATION_BATCH_* の分だけ前のメッセージを集める
+        batch: list[tuple[int, Optional[MessageRecord]]] = []
+        chars = 0
+        first = start
+        while (
+            first > 0
+            and len(batch) < CONVERSATION_BATCH_MESSAGES
+            and chars < CONVERSATION_BATCH_CHARS
+        ):
+            first -= 1
+            msg = reader.message(first) if reader is not None else None
+            batch.append((first, msg))
+            chars += len(msg.content) if msg is not None else 0
+
+        # 前に足したメッセージの分だけ表示位置がずれないよう、見えている位置を
+        # マークで覚えておき、描画後にそこへ戻す
+        text.mark_set("conversation_view", "@0,0")
+        text.mark_set("conversation_head", "1.0")
+        for index, msg in reversed(batch):
+            self._render_conversation_message(index, "conversation_head", msg)
+        self._conversation_window = (first, end)
+        text.yview("conversation_view")
+
+    def _render_conversation_message(
+        self, index: int, at: str, msg: Optional[MessageRecord] = None
+    ) -> int:
+        """会話のメッセージを1件描画し、位置を示すマークを付ける。
 
         Args:
-            data: JSONデータ
+            index: メッセージ番号
+            at: 挿入位置（tk.END または右重力のマーク）
+            msg: 読み出し済みのメッセージ（None の場合は読み出す）
 
         Returns:
-            メッセージ情報の辞書、または None
+            描画した本文の文字数（描画しなかった場合 0）
         """
-        msg_type = data.get("type")
-        if msg_type not in ("user", "assistant"):
-            return None
+        if msg is None:
+            reader = self._conversation_reader
+            msg = reader.message(index) if reader is not None else None
+        if msg is None or (self.filter_slash_commands.get() and msg.is_slash_command):
+            return 0
+
+        text = self.conversation_text
+        start = text.index("end-1c" if at == tk.END else at)
+        terms = self._highlight_terms if index in self._hit_messages else ()
+        body = self._render_message(msg, terms, at)
+        text.mark_set(f"msg{index}", start)
+        text.mark_set(f"body{index}", body)
+        self._rendered_messages.add(index)
+        return len(msg.content)
+
+    def _trim_conversation_window(self) -> None:
+        """描画済みのメッセージが多すぎる場合に、表示位置から遠い側を消す。
+
+        CONVERSATION_WINDOW_MESSAGES を超えた分のうち、見えていない部分だけを消す。
+        """
+        start, end = self._conversation_window
+        excess = end - start - CONVERSATION_WINDOW_MESSAGES
+        if excess <= 0:
+            return
 
-        message = data.get("message", {})
-        content = ""
-        is_meta = data.get("isMeta", False)
-
-        if isinstance(message, dict):
-            raw_content = message.get("content", "")
-            if isinstance(raw_content, str):
-                content = raw_content
-            elif isinstance(raw_content, list):
-                for item in raw_content:
-                    if isinstance(item, dict) and item.get("type") == "text":
-                        content += item.get("text", "")
-                    elif isinstance(item, str):
-                        content += item
-
-        if not content:
-            return None
+        text = self.conversation_text
+        top, bottom = text.yview()
+        if top + bottom >= 1.0:
+            # 後ろ側を表示している場合は先頭側を消す
+            cut = start + excess
+            mark = self._conversation_mark(cut)
+            if not text.compare("@0,0", ">=", mark):
+                return
+            text.mark_set("conversation_view", "@0,0")
+            text.delete(1.0, mark)
+            text.yview("conversation_view")
+            removed = range(start, cut)
+            self._conversation_window = (cut, end)
+        else:
+            cut = end - excess
+            mark = self._conversation_mark(cut)
+            if not text.compare(f"@0,{text.winfo_height()}", "<", mark):
+                return
+            text.delete(mark, tk.END)
+            removed = range(cut, end)
+            self._conversation_window = (start, cut)
 
-        # スラッシュコマンドかどうかを判定
-        content_stripped = content.strip()
-        is_slash_command = (
-            is_meta
-            or content_stripped.startswith("<command-name>")
-            or content_stripped.startswith("<local-command-stdout>")
-            or content_stripped.startswith("<local-command-caveat>")
-        )
+        for index in removed:
+            if index in self._rendered_messages:
+                self._rendered_messages.discard(index)
+                text.mark_unset(f"msg{index}", f"body{index}")
 
-        return {
-            "type": msg_type,
-            "content": content,
-            "timestamp": data.get("timestamp"),
-            "is_meta": is_meta,
-            "is_slash_command": is_slash_command,
-        }
+    def _conversation_mark(self, index: int) -> str:
+        """メッセージの先頭の位置を Text のインデックスで返す。
 
-    def _is_human_session(self, file_path: Path, first_message: str) -> bool:
-        """人間が開始したセッションかどうかを判定する。
+        描画していないメッセージ（スラッシュコマンドなど）の場合は、その後で
+        最初に描画したメッセージの先頭、なければ末尾を返す。
 
         Args:
-            file_path: セッションファイルのパス
-            first_message: 最初のユーザーメッセージ
+            index: 描画済みの範囲内のメッセージ番号
 
         Returns:
-            人間が開始したセッションの場合 True
+            Text のインデックス
         """
-        # agent-で始まるファイル名はサブエージェントセッション
-        if file_path.stem.startswith("agent-"):
-            return False
-
-        # 最初のメッセージが"Warmup"のものはウォームアップセッション
-        if first_message.strip().lower() == "warmup":
-            return False
+        for candidate in range(index, self._conversation_window[1]):
+            if candidate in self._rendered_messages:
+                return f"msg{candidate}"
+        return "end-1c"
+
+    def _schedule_conversation_fill(self) -> None:
+        """会話表示の続きの描画を予約する。"""
+        if self._conversation_fill_id is None:
+            self._conversation_fill_id = self.root.after(
+                CONVERSATION_FILL_INTERVAL_MS, self._fill_conversation
+            )
 
-        return True
+    def _cancel_conversation_fill(self) -> None:
+        """予約した会話表示の続きの描画を取り消す。"""
+        if self._conversation_fill_id is not None:
+            self.root.after_cancel(self._conversation_fill_id)
+            self._conversation_fill_id = None
 
-    def _populate_session_list(
-        self, sessions: Optional[list[dict[str, Any]]] = None
-    ) -> None:
-        """セッションリストを表示する。
+    def _fill_conversation(self) -> None:
+        """会話表示の続きを1回分描画する。
 
-        Args:
-            sessions: 表示するセッションリスト（Noneの場合は全セッション）
+        表示位置が描画済みの範囲の端に近ければその側に描画する。それ以外は
+        CONVERSATION_WINDOW_MESSAGES に達するまで後ろ側に描画しておく。
         """
-        self.session_tree.delete(*self.session_tree.get_children())
+        self._conversation_fill_id = None
+        start, end = self._conversation_window
+        total = self._conversation_total
+        top, bottom = self.conversation_text.yview()
 
-        display_sessions = sessions if sessions is not None else self.sessions
+        self.conversation_text.config(state=tk.NORMAL)
+        if bottom >= 1.0 - CONVERSATION_FILL_EDGE and end < total:
+            self._append_conversation_batch()
+        elif top <= CONVERSATION_FILL_EDGE and start > 0:
+            self._prepend_conversation_batch()
+        elif end < total and end - start < CONVERSATION_WINDOW_MESSAGES:
+            self._append_conversation_batch()
+        else:
+            self.conversation_text.config(state=tk.DISABLED)
+            return
+        self._trim_conversation_window()
+        self.conversation_text.config(state=tk.DISABLED)
 
-        for idx, session in enumerate(display_sessions):
-            project = get_short_project_name(session["project_name"])
+        self._show_current_search_hit()
+        self._schedule_conversation_fill()
 
-            if session["timestamp"] != datetime.min:
-                date_str = session["timestamp"].strftime("%Y-%m-%d %H:%M")
-            else:
-                date_str = "-"
+    def _on_conversation_yview(self, first: str, last: str) -> None:
+        """会話表示のスクロール位置が変わったときの処理。
 
-            first_msg = truncate_text(session["first_message"], 50)
+        スクロールバーには描画済みの範囲ではなく、全メッセージの中での位置を
+        表示する。描画済みの範囲の端に近づいたら続きの描画を予約する。
 
-            self.session_tree.insert(
-                "", tk.END, iid=str(idx), values=(project, date_str, first_msg)
+        Args:
+            first: 描画済みの範囲の中で見えている先頭の位置（0〜1）
+            last: 描画済みの範囲の中で見えている末尾の位置（0〜1）
+        """
+        start, end = self._conversation_window
+        total = self._conversation_total
+        top, bottom = float(first), float(last)
+        if total:
+            self.conversation_scrollbar.set(
+                (start + top * (end - start)) / total,
+                (start + bottom * (end - start)) / total,
             )
+        else:
+            self.conversation_scrollbar.set(0.0, 1.0)
 
-        self.count_label.config(
-            text=get_text(
-                "session_count",
-                displayed=len(display_sessions),
-                total=len(self.sessions),
-            )
-        )
+        if (top <= CONVERSATION_FILL_EDGE and start > 0) or (
+            bottom >= 1.0 - CONVERSATION_FILL_EDGE and end < total
+        ):
+            self._schedule_conversation_fill()
 
-        # 最終更新日時を更新
-        if self.last_updated:
-            time_str = self.last_updated.strftime("%Y-%m-%d %H:%M")
-            self.updated_label.config(text=get_text("last_updated", time=time_str))
+    def _on_conversation_scrollbar(self, *args: str) -> None:
+        """会話表示のスクロールバーの操作でスクロールする。
 
-    def _filter_sessions(self) -> None:
-        """検索フィルタを適用する。"""
-        filtered = self._get_filtered_sessions()
-        self._populate_session_list(filtered)
-        self._draw_chart()
+        描画済みの範囲の外へ移動した場合は、途中のメッセージを描画せずに
+        移動先から描画し直す。
 
-    def _on_slash_filter_change(self) -> None:
-        """スラッシュコマンドフィルター変更時の処理。"""
-        self._filter_sessions()
-        if self.current_session:
-            self._display_conversation(self.current_session)
+        Args:
+            args: ("moveto", 位置) または ("scroll", 量, "units" / "pages")
+        """
+        if not args:
+            return
+        if args[0] != tk.MOVETO:
+            self.conversation_text.yview(*args)
+            return
 
-    def _get_filtered_sessions(self) -> list[dict[str, Any]]:
-        """現在のフィルター条件でセッションリストを取得する。
+        total = self._conversation_total
+        start, end = self._conversation_window
+        fraction = min(1.0, max(0.0, float(args[1])))
+        target = fraction * total
+        if start <= target <= end and (start < target or start == 0):
+            if end > start:
+                self.conversation_text.yview_moveto((target - start) / (end - start))
+        elif fraction >= 1.0:
+            self._render_conversation_window(total, at_end=True)
+        else:
+            self._render_conversation_window(int(target))
+
+    def _collect_search_hits(
+        self, indices: Iterable[int]
+    ) -> list[tuple[int, int, int]]:
+        """メッセージの本文から検索語の一致箇所を探す。
+
+        Args:
+            indices: 探すメッセージ番号（昇順）
 
         Returns:
-            フィルタリングされたセッションリスト
+            (メッセージ番号, Text での本文中の開始位置, 終了位置) のリスト
         """
-        query = self.search_var.get().lower()
-        exclude_system = self.filter_system_sessions.get()
-        exclude_slash = self.filter_slash_commands.get()
+        terms = self._highlight_terms
+        reader = self._conversation_reader
+        if not terms or reader is None:
+            return []
 
-        filtered = self.sessions
+        exclude_slash = self.filter_slash_commands.get()
+        hits = []
+        for index in indices:
+            msg = reader.message(index)
+            if msg is None or (exclude_slash and msg.is_slash_command):
+                continue
+            spans = self._text_spans(msg.content, match_offsets(msg.content, terms))
+            hits.extend((index, start, end) for start, end in spans)
+        return hits
 
-        if exclude_system:
-            filtered = [s for s in filtered if s.get("is_human_session", True)]
+    def _text_spans(
+        self, content: str, spans: list[tuple[int, int]]
+    ) -> list[tuple[int, int]]:
+        """本文中の範囲を、会話表示の Text での文字位置に変換する。
 
-        if exclude_slash:
-            filtered = [s for s in filtered if s.get("has_normal_messages", True)]
+        Args:
+            content: 本文
+            spans: match_offsets() が返した (開始位置, 終了位置) のリスト
 
-        if query:
-            filtered = [
-                s
-                for s in filtered
-                if query in s["project_name"].lower()
-                or query in s["first_message"].lower()
-            ]
+        Returns:
+            本文の先頭からの Text での (開始位置, 終了位置) のリスト
+        """
+        extra = self._astral_char_width - 1
+        if not spans or extra <= 0 or content.isascii():
+            return spans
+        astral = [match.start() for match in _ASTRAL_CHAR_RE.finditer(content)]
+        if not astral:
+            return spans
+        return [
+            (
+                start + bisect.bisect_left(astral, start) * extra,
+                end + bisect.bisect_left(astral, end) * extra,
+            )
+            for start, end in spans
+        ]
 
-        return filtered
+    def _get_search_highlights(
+        self, session: SessionRecord
+    ) -> tuple[Container[int], list[tuple[str, bool]]]:
+        """会話の中で検索語に一致したメッセージと、強調表示する語を取得する。
 
-    def _on_session_select(self, event: tk.Event) -> None:
-        """セッション選択時の処理。
+        一致したメッセージは全文検索インデックスから引き、検索語と索引の版が
+        変わらない間は結果を使い回す。
 
         Args:
-            event: イベントオブジェクト
+            session: 表示するセッション
+
+        Returns:
+            (一致したメッセージ番号, match_offsets() に渡す語) のタプル。
+            検索語がない場合はどちらも空
         """
-        selection = self.session_tree.selection()
-        if not selection:
+        query = self.search_var.get().strip().lower()
+        if not query:
+            self._search_highlights = None
+            return (), []
+
+        key = (query, self.search_index.version)
+        if self._search_highlights is None or self._search_highlights[0] != key:
+            self._search_highlights = (
+                key,
+                self.search_index.search(query) or {},
+                self.search_index.highlight_terms(query),
+            )
+        _, hits, terms = self._search_highlights
+        return set(hits.get(str(session.file_path), ())), terms
+
+    def _refresh_search_highlights(self) -> None:
+        """検索語が変わった場合に、表示中の会話を強調表示し直す。"""
+        if self.current_session is None:
             return
 
-        try:
-            idx = int(selection[0])
-            filtered = self._get_filtered_sessions()
-            if idx < len(filtered):
-                session = filtered[idx]
-                self._display_conversation(session)
-                self._update_chart_highlight(session)
-        except (ValueError, IndexError):
-            pass
+        query = self.search_var.get().strip().lower()
+        highlighted = (
+            self._search_highlights[0][0] if self._search_highlights else ""
+        )
+        if query != highlighted:
+            self._display_conversation(self.current_session)
 
-    def _on_session_right_click(self, event: tk.Event) -> None:
-        """セッションリスト右クリック時の処理。
+    def _update_search_hits(self, jump: bool) -> None:
+        """一致箇所の移動用の表示を更新する。
 
         Args:
-            event: イベントオブジェクト
+            jump: 最初の一致箇所へ移動するかどうか
         """
-        item = self.session_tree.identify_row(event.y)
-        if item:
-            self.session_tree.selection_set(item)
-            self.session_context_menu.post(event.x_root, event.y_root)
+        if not self._search_hits:
+            self._search_hit_index = -1
+            self.search_hit_frame.pack_forget()
+            return
 
-    def _display_conversation(self, session: dict[str, Any]) -> None:
-        """会話を表示する。
+        self.search_hit_frame.pack(side=tk.RIGHT)
+        if jump or not 0 <= self._search_hit_index < len(self._search_hits):
+            self._search_hit_index = 0
+            self._goto_search_hit(0)
+        else:
+            self._goto_search_hit(0, scroll=False)
+
+    def _goto_search_hit(self, step: int, scroll: bool = True) -> None:
+        """前後の一致箇所へ移動する。
+
+        一致箇所のメッセージが描画されていなければ、その付近から描画し直す。
 
         Args:
-            session: セッション情報
+            step: 移動する数（1 で次、-1 で前、0 で現在の一致箇所）
+            scroll: 一致箇所が見えるようにスクロールするかどうか
         """
-        self.current_session = session
+        if not self._search_hits:
+            return
 
-        self.session_info_label.config(
-            text=get_text(
-                "project_label",
-                path=session["project_name"],
-                session_id=session["session_id"],
-            )
+        self._search_hit_index = (self._search_hit_index + step) % len(
+            self._search_hits
+        )
+        index, start, _ = self._search_hits[self._search_hit_index]
+        if scroll and index not in self._rendered_messages:
+            self._render_conversation_window(index)
+        self._show_current_search_hit()
+        if scroll and index in self._rendered_messages:
+            self.conversation_text.see(f"body{index}+{start}c")
+        self.search_hit_label.config(
+            text=f"{self._search_hit_index + 1} / {len(self._search_hits)}"
         )
 
-        self.conversation_text.config(state=tk.NORMAL)
-        self.conversation_text.delete(1.0, tk.END)
-
-        exclude_slash = self.filter_slash_commands.get()
+    def _show_current_search_hit(self) -> None:
+        """選択中の一致箇所が描画されていれば強調表示する。"""
+        self.conversation_text.tag_remove("search_hit_current", 1.0, tk.END)
+        if not 0 <= self._search_hit_index < len(self._search_hits):
+            return
+        index, start, end = self._search_hits[self._search_hit_index]
+        if index in self._rendered_messages:
+            self.conversation_text.tag_add(
+                "search_hit_current", f"body{index}+{start}c", f"body{index}+{end}c"
+            )
 
-        for msg in session["messages"]:
-            if exclude_slash and msg.get("is_slash_command", False):
-                continue
+    def _get_conversation_reader(
+        self, session: SessionRecord
+    ) -> Optional[SessionReader]:
+        """表示するセッションのリーダーを取得する。
 
-            self._render_message(msg)
+        本文はセッション一覧には常駐させず、表示中のセッション1件分だけ
+        ファイルをマップしておき、必要なメッセージをその都度読み出す。
 
-        self.conversation_text.config(state=tk.DISABLED)
-        self.conversation_text.see(1.0)
+        Args:
+            session: セッション情報
 
-    def _render_message(self, msg: dict[str, Any]) -> None:
+        Returns:
+            セッションリーダー、または読み込めない場合 None
+        """
+        # メッセージ数が同じままの追記や書き換えも検出できるよう、ファイルの
+        # シグネチャで判定する
+        file_path = session.file_path
+        try:
+            key = (file_path, file_signature(os.stat(file_path)))
+        except OSError as e:
+            logger.warning(f"Error reading {file_path}: {e}")
+            self._close_conversation_reader()
+            return None
+        if key != self._conversation_key:
+            self._close_conversation_reader()
+            try:
+                self._conversation_reader = open_session_reader(
+                    file_path, self.session_index.get(file_path)
+                )
+            except Exception as e:
+                logger.warning(f"Error reading {file_path}: {e}")
+                return None
+            self._conversation_key = key
+        return self._conversation_reader
+
+    def _close_conversation_reader(self) -> None:
+        """表示中の会話のリーダーを閉じる。"""
+        if self._conversation_reader is not None:
+            self._conversation_reader.close()
+        self._conversation_reader = None
+        self._conversation_key = None
+
+    def _render_message(
+        self,
+        msg: MessageRecord,
+        terms: Sequence[tuple[str, bool]] = (),
+        at: str = "end",
+    ) -> str:
         """メッセージを描画する。
 
         Args:
             msg: メッセージ情報
+            terms: 本文中で強調表示する語（match_offsets() の引数）
+            at: 挿入位置（tk.END または右重力のマーク）
+
+        Returns:
+            本文の先頭の Text のインデックス
         """
-        msg_type = msg["type"]
-        content = msg["content"]
-        timestamp = msg.get("timestamp", "")
+        msg_type = msg.type
+        content = msg.content
+        timestamp = msg.timestamp
 
         # タイムスタンプをフォーマット
         ts_str = self._format_timestamp(timestamp)
 
         # ロール表示
         if msg_type == "user":
-            self.conversation_text.insert(tk.END, get_text("user_label"), "user")
+            self.conversation_text.insert(at, get_text("user_label"), "user")
         else:
             self.conversation_text.insert(
-                tk.END, get_text("assistant_label"), "assistant"
+                at, get_text("assistant_label"), "assistant"
             )
 
         if ts_str:
-            self.conversation_text.insert(tk.END, f"  [{ts_str}]", "timestamp")
+            self.conversation_text.insert(at, f"  [{ts_str}]", "timestamp")
 
-        self.conversation_text.insert(tk.END, "\n")
+        self.conversation_text.insert(at, "\n")
 
         # 内容表示
         tag = "user" if msg_type == "user" else "assistant"
-        self.conversation_text.insert(tk.END, content + "\n", tag)
+        content_start = self.conversation_text.index("end-1c" if at == tk.END else at)
+        self.conversation_text.insert(at, content + "\n", tag)
+        spans = match_offsets(content, terms) if terms else []
+        for start, end in self._text_spans(content, spans):
+            self.conversation_text.tag_add(
+                "search_hit",
+                f"{content_start}+{start}c",
+                f"{content_start}+{end}c",
+            )
 
         # 区切り線
-        self.conversation_text.insert(tk.END, "─" * 80 + "\n\n", "separator")
+        self.conversation_text.insert(at, "─" * 80 + "\n\n", "separator")
+        return content_start
 
-    def _format_timestamp(self, timestamp: Any) -> str:
+    def _format_timestamp(self, timestamp: int) -> str:
         """タイムスタンプをローカルタイムゾーンで文字列にフォーマットする。
 
         Args:
-            timestamp: タイムスタンプ値
+            timestamp: エポックミリ秒（不明な場合 0）
 
         Returns:
             フォーマットされた文字列（ローカルタイムゾーン）
         """
         if not timestamp:
             return ""
-
-        try:
-            if isinstance(timestamp, str):
-                # ISO format (UTC) -> local timezone
-                dt_utc = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-                dt = dt_utc.astimezone().replace(tzinfo=None)
-            elif isinstance(timestamp, (int, float)):
-                # Unix timestamp in milliseconds (UTC) -> local timezone
-                dt_utc = datetime.utcfromtimestamp(timestamp / 1000)
-                dt_aware = dt_utc.replace(tzinfo=timezone.utc)
-                dt = dt_aware.astimezone().replace(tzinfo=None)
-            else:
-                return ""
-            return dt.strftime("%Y-%m-%d %H:%M:%S")
-        except (ValueError, OSError):
-            return str(timestamp) if timestamp else ""
+        return _local_datetime(timestamp).strftime("%Y-%m-%d %H:%M:%S")
 
     def _resume_selected_session(self) -> None:
         """選択されたセッションを再開する。"""
-        selection = self.session_tree.selection()
-        if not selection:
+        session = self.session_list.selected()
+        if session is None:
             return
 
         try:
-            idx = int(selection[0])
-            filtered = self._get_filtered_sessions()
-            if idx >= len(filtered):
-                return
-
-            session = filtered[idx]
-            session_id = session["session_id"]
-            project_path = session["project_name"]
+            session_id = session.session_id
+            project_path = session.project_name
 
             # プラットフォームに応じた処理
             if sys.platform == "win32":
@@ -1429,6 +7783,9 @@ class ClaudeCodeRecall:
             f'pause'
         )
 
+        import subprocess
+        import tempfile
+
         with tempfile.NamedTemporaryFile(
             mode="w", suffix=".bat", delete=False, encoding="cp932"
         ) as f:
@@ -1448,6 +7805,8 @@ class ClaudeCodeRecall:
             f'cd "{project_path}" && claude --resume {session_id}; exec bash'
         )
 
+        import subprocess
+
         # 一般的なターミナルエミュレータを試す
         terminals = [
             ["gnome-terminal", "--", "bash", "-c", script_content],
@@ -1466,19 +7825,15 @@ class ClaudeCodeRecall:
 
     def _delete_selected_session(self) -> None:
         """選択されたセッションを削除する。"""
-        selection = self.session_tree.selection()
-        if not selection:
+        import shutil
+
+        session = self.session_list.selected()
+        if session is None:
             return
 
         try:
-            idx = int(selection[0])
-            filtered = self._get_filtered_sessions()
-            if idx >= len(filtered):
-                return
-
-            session = filtered[idx]
-            file_path: Path = session["file_path"]
-            first_msg = truncate_text(session["first_message"], 50)
+            file_path: Path = session.file_path
+            first_msg = truncate_text(session.first_message, 50)
 
             # セキュリティチェック
             if not is_safe_path(self.projects_dir, file_path):
@@ -1489,7 +7844,7 @@ class ClaudeCodeRecall:
                 get_text("confirm_delete_title"),
                 get_text(
                     "confirm_delete_message",
-                    project=session["project_name"],
+                    project=session.project_name,
                     message=first_msg,
                 ),
             )
@@ -1497,6 +7852,16 @@ class ClaudeCodeRecall:
             if not result:
                 return
 
+            # 表示中のセッションを削除する場合、マップしたままのファイルは削除
+            # できない環境があるため先にリーダーを閉じる（他のセッションの削除では
+            # 表示中の会話のリーダーを残す）
+            is_current = (
+                self.current_session is not None
+                and self.current_session.file_path == file_path
+            )
+            if is_current:
+                self._close_conversation_reader()
+
             # ファイルを削除
             if file_path.exists():
                 file_path.unlink()
@@ -1509,16 +7874,13 @@ class ClaudeCodeRecall:
 
             # セッションリストから削除
             self.sessions = [
-                s for s in self.sessions if s["file_path"] != file_path
+                s for s in self.sessions if s.file_path != file_path
             ]
+            self._loaded_sessions.pop(str(file_path), None)
 
             # 現在表示中のセッションが削除された場合はクリア
-            if self.current_session and self.current_session["file_path"] == file_path:
-                self.current_session = None
-                self.session_info_label.config(text=get_text("select_session"))
-                self.conversation_text.config(state=tk.NORMAL)
-                self.conversation_text.delete(1.0, tk.END)
-                self.conversation_text.config(state=tk.DISABLED)
+            if is_current:
+                self._clear_conversation()
 
             self._filter_sessions()
 
@@ -1532,20 +7894,411 @@ class ClaudeCodeRecall:
             )
 
 
+# ============================================================================
+# コマンドラインモード
+# ============================================================================
+
+# コマンドラインモードの出力形式
+OUTPUT_TEXT = "text"
+OUTPUT_JSONL = "jsonl"
+
+
+def _iso_timestamp(epoch_ms: int) -> Optional[str]:
+    """エポックミリ秒をローカル時刻の ISO 8601 形式にする。
+
+    Args:
+        epoch_ms: エポックミリ秒（不明な場合 0）
+
+    Returns:
+        "YYYY-MM-DDTHH:MM:SS" 形式の文字列（不明な場合 None）
+    """
+    if not epoch_ms:
+        return None
+    return _local_datetime(epoch_ms).isoformat(timespec="seconds")
+
+
+class CommandLine:
+    """GUI を使わずにセッションを一覧・検索・表示するコマンドラインモード。
+
+    GUI と同じローダー・インデックス・絞り込みを使い、tkinter は読み込まない。
+    一覧と検索の結果は、セッションを読み込んだ順にその都度出力する（全体の
+    読み込みを待たないため、新しい順には並ばない）。
+    """
+
+    def __init__(self, args: argparse.Namespace, out: Any = None) -> None:
+        """コマンドラインモードを初期化する。
+
+        Args:
+            args: parse_args() の結果（command はサブコマンド名）
+            out: 出力先（None の場合は標準出力）
+        """
+        self.args = args
+        self.out = out if out is not None else sys.stdout
+        self.projects_dir = get_claude_projects_dir()
+        # セッションインデックスは読み込みスレッドが最初に読み込む
+        self.session_index = SessionIndex(get_cache_dir() / SESSION_INDEX_FILENAME)
+        self.search_index = create_search_index(args.search_store)
+        # 全文検索インデックスを使うのは search だけのため、他のコマンドでは
+        # パース時の語の収集と索引の更新を省く
+        self.loader = SessionLoader(
+            self.projects_dir,
+            self.session_index,
+            self.search_index,
+            args.workers,
+            index_terms=args.command == "search",
+        )
+
+    def run(self) -> int:
+        """サブコマンドを実行する。
+
+        Returns:
+            終了コード
+        """
+        commands = {
+            "list": self.list_sessions,
+            "search": self.search_sessions,
+            "show": self.show_session,
+            "stats": self.show_stats,
+        }
+        try:
+            return commands[self.args.command]()
+        finally:
+            self.loader.cancel()
+            self.loader.join()
+
+    def list_sessions(self) -> int:
+        """絞り込み条件に一致するセッションを読み込んだ順に出力する。
+
+        Returns:
+            終了コード
+        """
+        conditions = self._conditions("")
+        for sessions in self._load_batches():
+            for session in SessionTable(sessions).filter(conditions, None) or []:
+                self._write_session(session)
+        return 0
+
+    def search_sessions(self) -> int:
+        """検索語に一致するセッションを出力する。
+
+        プロジェクト名・最初のメッセージに一致するものは読み込んだ順にその都度
+        出力し、本文だけに一致するものは全文検索インデックスの更新後に出力する。
+        関連度順の場合は全体を並べ替えてから出力する。
+
+        Returns:
+            終了コード
+        """
+        conditions = self._conditions(self.args.query.lower())
+        streaming = conditions.order != SORT_RELEVANCE
+        sessions: list[SessionRecord] = []
+        written: set[str] = set()
+        for batch in self._load_batches():
+            sessions.extend(batch)
+            if not streaming:
+                continue
+            for session in SessionTable(batch).filter(conditions, None) or []:
+                self._write_session(session)
+                written.add(str(session.file_path))
+
+        self.loader.join()
+        sessions.sort(key=lambda x: x.timestamp, reverse=True)
+        for session in SessionTable(sessions).filter(
+            conditions, self.search_index
+        ) or []:
+            if str(session.file_path) not in written:
+                self._write_session(session)
+        return 0
+
+    def show_session(self) -> int:
+        """セッションの会話を出力する。
+
+        Returns:
+            終了コード（セッションが見つからない・読み込めない場合 1）
+        """
+        session_id = self.args.session_id
+        matches = [
+            entry
+            for entry in scan_projects(self.projects_dir)
+            if Path(entry.path).stem.startswith(session_id)
+        ]
+        exact = [e for e in matches if Path(e.path).stem == session_id]
+        if exact:
+            matches = exact
+        if len(matches) != 1:
+            reason = "not found" if not matches else "is ambiguous"
+            print(f"Session {session_id} {reason}", file=sys.stderr)
+            return 1
+
+        file_path = Path(matches[0].path)
+        self.session_index.load()
+        try:
+            reader = open_session_reader(file_path, self.session_index.get(file_path))
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}", file=sys.stderr)
+            return 1
+
+        with closing(reader):
+            for index in range(len(reader)):
+                msg = reader.message(index)
+                if msg is None or (self.args.exclude_slash and msg.is_slash_command):
+                    continue
+                if self.args.format == OUTPUT_JSONL:
+                    self._write_json(
+                        {
+                            "index": index,
+                            "type": msg.type,
+                            "timestamp": _iso_timestamp(msg.timestamp),
+                            "slash_command": msg.is_slash_command,
+                            "content": msg.content,
+                        }
+                    )
+                else:
+                    label = get_text(
+                        "user_label" if msg.type == "user" else "assistant_label"
+                    )
+                    timestamp = _iso_timestamp(msg.timestamp)
+                    header = f"{label}  [{timestamp}]" if timestamp else label
+                    self._write_line(f"{header}\n{msg.content}\n")
+        return 0
+
+    def show_stats(self) -> int:
+        """絞り込み条件に一致するセッションのプロンプト数を集計して出力する。
+
+        Returns:
+            終了コード
+        """
+        conditions = self._conditions("")
+        sessions: list[SessionRecord] = []
+        for batch in self._load_batches():
+            sessions.extend(batch)
+
+        table = SessionTable(sessions)
+        filtered = table.filter(conditions, None) or []
+        histogram = table.histogram_of(filtered)
+        level = CHART_VIEWS[self.args.view][0]
+        for key, count in histogram.view(self.args.view, conditions.exclude_slash):
+            label = rollup_label(level, key)
+            if self.args.format == OUTPUT_JSONL:
+                self._write_json({"bucket": label, "prompts": count})
+            else:
+                self._write_line(f"{label:<12}{count:>8}")
+        return 0
+
+    def _conditions(self, query: str) -> SessionFilter:
+        """コマンドライン引数から絞り込み条件を作成する。
+
+        Args:
+            query: 検索語（小文字化済み）
+
+        Returns:
+            絞り込み条件
+        """
+        return SessionFilter(
+            query,
+            self.args.exclude_system,
+            self.args.exclude_slash,
+            getattr(self.args, "order", SORT_NEWEST),
+        )
+
+    def _load_batches(self) -> Iterator[list[SessionRecord]]:
+        """全セッションを読み込み、届いた順にまとめて返す。
+
+        Yields:
+            読み込んだセッション（インデックスにあったものが最初にまとめて届く）
+        """
+        self.loader.start()
+        while True:
+            for batch in self.loader.poll(timeout=LOAD_POLL_INTERVAL_MS / 1000):
+                sessions = [s for s in batch.sessions.values() if s]
+                if sessions:
+                    yield sessions
+                if batch.done:
+                    return
+
+    def _write_session(self, session: SessionRecord) -> None:
+        """セッションの1行を出力する。
+
+        Args:
+            session: セッション情報
+        """
+        if self.args.format == OUTPUT_JSONL:
+            self._write_json(
+                {
+                    "session_id": session.session_id,
+                    "project": session.project_name,
+                    "timestamp": _iso_timestamp(session.timestamp),
+                    "first_message": session.first_message,
+                    "message_count": session.message_count,
+                    "file_path": str(session.file_path),
+                }
+            )
+            return
+
+        if session.timestamp:
+            date_str = _local_datetime(session.timestamp).strftime("%Y-%m-%d %H:%M")
+        else:
+            date_str = "-"
+        project = truncate_text(get_short_project_name(session.project_name), 30)
+        first_msg = truncate_text(" ".join(session.first_message.split()), 60)
+        self._write_line(
+            f"{date_str:<16}  {session.session_id:<36}  {project:<30}  {first_msg}"
+        )
+
+    def _write_json(self, obj: dict[str, Any]) -> None:
+        """JSON Lines の1行を出力する。
+
+        Args:
+            obj: 出力する辞書
+        """
+        self._write_line(json.dumps(obj, ensure_ascii=False))
+
+    def _write_line(self, line: str) -> None:
+        """1行を出力し、すぐに書き出す。
+
+        Args:
+            line: 出力する文字列（改行を含まない）
+        """
+        self.out.write(line + "\n")
+        self.out.flush()
+
+
 # ============================================================================
 # エントリーポイント
 # ============================================================================
 
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析する。
+
+    Args:
+        argv: 引数リスト（None の場合は sys.argv）
+
+    Returns:
+        解析結果
+    """
+    parser = argparse.ArgumentParser(
+        description=f"{APP_NAME}. Without a command, opens the GUI."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of parallel workers for parsing sessions (default: CPU count)",
+    )
+    parser.add_argument(
+        "--search-store",
+        choices=("memory", "sqlite"),
+        default="memory",
+        help="where to keep the full-text search index: in memory (default) or "
+        "in a SQLite FTS5 database, for histories larger than memory",
+    )
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="print how long each GUI startup phase took to stderr once all "
+        "sessions are loaded",
+    )
+
+    # コマンドラインモードのサブコマンド（フィルターの既定値は GUI と同じ）
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument(
+        "--format",
+        choices=(OUTPUT_TEXT, OUTPUT_JSONL),
+        default=OUTPUT_TEXT,
+        help="output aligned text (default) or JSON Lines",
+    )
+    output.add_argument(
+        "--exclude-slash",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="exclude slash commands (default: on)",
+    )
+    common = argparse.ArgumentParser(add_help=False, parents=[output])
+    common.add_argument(
+        "--exclude-system",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="exclude system sessions (default: on)",
+    )
+
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.add_parser(
+        "list",
+        parents=[common],
+        help="list sessions as they are loaded",
+    )
+    search = commands.add_parser(
+        "search",
+        parents=[common],
+        help="search project names, first messages and message bodies",
+    )
+    search.add_argument("query", help="search words")
+    search.add_argument(
+        "--order",
+        choices=(SORT_NEWEST, SORT_RELEVANCE),
+        default=SORT_NEWEST,
+        help="newest streams matches as they are loaded; relevance waits for "
+        "all sessions and ranks them",
+    )
+    show = commands.add_parser(
+        "show",
+        parents=[output],
+        help="print the conversation of a session",
+    )
+    show.add_argument("session_id", help="session ID (or a unique prefix)")
+    stats = commands.add_parser(
+        "stats",
+        parents=[common],
+        help="print prompt counts like the activity chart",
+    )
+    stats.add_argument(
+        "--view",
+        choices=tuple(CHART_VIEWS),
+        default=CHART_VIEW_30_DAYS,
+        help="30 days by day, 90 days by week, a year by month, or the "
+        "weekday x hour heatmap",
+    )
+    return parser.parse_args(argv)
+
+
 def main() -> None:
     """アプリケーションのエントリーポイント。"""
+    startup_profile = StartupProfile()
+    args = parse_args()
+    startup_profile.enabled = args.startup_profile
+
     # Detect and set system language
     detected_lang = detect_system_language()
     set_language(detected_lang)
+    startup_profile.mark("arguments and language")
 
+    if args.command is not None:
+        try:
+            sys.exit(CommandLine(args).run())
+        except BrokenPipeError:
+            # 出力先（head など）が先に終了した場合は、終了時の書き出しで
+            # 再びエラーにならないよう標準出力を捨てる
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            sys.exit(0)
+
+    _load_tkinter()
+    startup_profile.mark("import tkinter")
     root = tk.Tk()
-    ClaudeCodeRecall(root)
+    startup_profile.mark("root window")
+    ClaudeCodeRecall(
+        root,
+        parse_workers=args.workers,
+        search_store=args.search_store,
+        startup_profile=startup_profile,
+    )
     root.mainloop()
 
 
 if __name__ == "__main__":
+    # freeze_support() が必要なのは実行ファイルに固めた場合だけのため、
+    # そのときだけ multiprocessing を読み込む
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+
+        multiprocessing.freeze_support()
     main()